@@ -0,0 +1,299 @@
+"""
+用假的 SPI 测量 sh1106 驱动每次 show() 的 SPI 流量，并检查屏幕内容是否正确。
+
+FakeSPI 按 SH1106 的指令（页地址 B0-B7、列地址 00-0F/10-1F）模拟控制器的显存，
+统计数据字节、命令字节和 SPI 传输次数。每次 show() 之后把显存与 reference_ram() 比较：
+它逐个像素读 renderbuf（rotate=90/270 时交换行列）得到屏幕应有的内容，
+不经过驱动的 displaybuf 和重映射，重映射出错时也能发现。
+
+场景:
+  整屏    清屏后画几行文字，第一次 show()
+  状态    只改一个两位数的温度（16×8 像素），按页刷新时要重发整页 128 字节
+  旋转    rotate=90/180/270 时同样的操作，显存也必须正确
+  传输    整屏刷新时每页的地址命令合并成一次写入（write_page），与逐条 write_cmd 比较
+          SPI 写入次数、CS 帧数（CS 拉低的次数）和 show() 的耗时
+  重画    像 screen test.py 那样 fill(0) 后整屏重画：不带影子缓冲时每次都发 1 KB，
+          shadow=True 时内容没变就不发，只变了温度时只发温度那几列
+  重映射  rotate=90 时 show() 只重映射要发送的列，与改动前每次整屏逐字节重映射比较耗时；
+          计时用不模拟显存的 NullSPI，只量驱动本身的 CPU 时间
+
+在电脑的 CPython 上运行（使用 one_dragon/emu 里的模拟模块）: python bench_sh1106.py
+"""
+import sys
+
+if sys.implementation.name != 'micropython':
+    here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.insert(0, here + '/../one_dragon/emu')
+
+import time
+import framebuf
+import sh1106
+
+WIDTH = 128
+HEIGHT = 64
+RAM_COLUMNS = 132
+COLUMN_OFFSET = 2
+ROTATIONS = (0, 90, 180, 270)
+
+
+class FakePin:
+    def __init__(self):
+        self.level = 0
+        self.changes = 0
+        self.falls = 0
+
+    def init(self, mode=-1, value=None):
+        if value is not None:
+            self.level = value
+
+    def __call__(self, value=None):
+        if value is None:
+            return self.level
+        if value != self.level:
+            self.changes += 1
+            self.falls += not value
+        self.level = value
+
+    OUT = 1
+
+
+class FakeSPI:
+    """记录传输次数和字节数，并按 SH1106 的指令模拟显存"""
+
+    def __init__(self, dc, pages=HEIGHT // 8):
+        self.dc = dc
+        self.ram = [bytearray(RAM_COLUMNS) for _ in range(pages)]
+        self.page = 0
+        self.column = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.transactions = 0
+        self.data_bytes = 0
+        self.cmd_bytes = 0
+
+    def write(self, buf):
+        self.transactions += 1
+        if self.dc():
+            self.data_bytes += len(buf)
+            row = self.ram[self.page]
+            for b in buf:
+                if self.column < RAM_COLUMNS:
+                    row[self.column] = b
+                self.column += 1
+            return
+        self.cmd_bytes += len(buf)
+        for b in buf:
+            if 0xB0 <= b <= 0xB7:
+                self.page = b & 0x07
+            elif b <= 0x0F:
+                self.column = (self.column & 0xF0) | b
+            elif b <= 0x1F:
+                self.column = (self.column & 0x0F) | ((b & 0x0F) << 4)
+
+    def matches(self, display):
+        """显存的可见部分是否与 reference_ram(display) 一致"""
+        expected = reference_ram(display)
+        for page in range(display.pages):
+            if self.ram[page][COLUMN_OFFSET:COLUMN_OFFSET + display.width] != expected[page]:
+                return False
+        return True
+
+
+def reference_ram(display):
+    """
+    屏幕每页应有的字节（VLSB，bit0 在上），逐个像素从 renderbuf 读出，不用 displaybuf。
+    rotate=90/270 时 renderbuf 是 height×width 的画布，屏幕第 row 行第 col 列是画布上的 (row, col)；
+    180/270 的翻转由 flip() 交给控制器完成，缓冲里的内容不变。
+    """
+    pages = []
+    for page in range(display.pages):
+        row_bytes = bytearray(display.width)
+        for col in range(display.width):
+            value = 0
+            for bit in range(8):
+                row = page * 8 + bit
+                if display.rotate90:
+                    on = framebuf.FrameBuffer.pixel(display, row, col)
+                else:
+                    on = framebuf.FrameBuffer.pixel(display, col, row)
+                if on:
+                    value |= 1 << bit
+            row_bytes[col] = value
+        pages.append(row_bytes)
+    return pages
+
+
+class NullSPI:
+    """只记字节数，用于计时"""
+
+    def __init__(self):
+        self.data_bytes = 0
+
+    def write(self, buf):
+        self.data_bytes += len(buf)
+
+
+class PerCommandSPI(sh1106.SH1106_SPI):
+    """改动前的发送方式：每条命令新建一个 bytearray，单独一个 CS 帧，每次先把 CS 拉高"""
+
+    write_page = sh1106.SH1106.write_page
+
+    def write_cmd(self, cmd):
+        self.cs(1)
+        self.dc(0)
+        self.cs(0)
+        self.spi.write(bytearray([cmd]))
+        self.cs(1)
+
+    def write_data(self, buf):
+        self.cs(1)
+        self.dc(1)
+        self.cs(0)
+        self.spi.write(buf)
+        self.cs(1)
+
+
+def new_display(rotate=0, cls=sh1106.SH1106_SPI, spi=None, shadow=False):
+    dc = FakePin()
+    spi = FakeSPI(dc) if spi is None else spi
+    display = cls(WIDTH, HEIGHT, spi, dc, cs=FakePin(), rotate=rotate, shadow=shadow)
+    return display, spi
+
+
+def now_us():
+    if sys.implementation.name == 'micropython':
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def time_full_refresh(cls, rounds=200, rotate=0):
+    """整屏刷新 rounds 次，返回 (每次 show() 的微秒数, 每次的 SPI 写入次数, 每次的 CS 帧数)"""
+    display, spi = new_display(rotate, cls)
+    draw_status(display, 26)
+    display.show()
+    spi.reset_counters()
+    falls = display.cs.falls
+    start = now_us()
+    for _ in range(rounds):
+        display.show(full_update=True)
+    elapsed = now_us() - start
+    return elapsed / rounds, spi.transactions // rounds, (display.cs.falls - falls) // rounds
+
+
+def legacy_remap(display):
+    """改动前 show() 在 rotate90 时每次执行的整屏重映射"""
+    (w, p, db, rb) = (display.width, display.pages, display.displaybuf, display.renderbuf)
+    for i in range(display.bufsize):
+        db[w * (i % p) + (i // p)] = rb[i]
+
+
+def time_show(rotate, action, rounds=200):
+    """每轮执行 action 再 show()，返回每次 show() 的微秒数（NullSPI，不含 action 的时间）"""
+    display, _ = new_display(rotate, spi=NullSPI())
+    draw_status(display, 26)
+    display.show()
+    elapsed = 0
+    for n in range(rounds):
+        action(display, n)
+        start = now_us()
+        display.show()
+        elapsed += now_us() - start
+    return elapsed / rounds
+
+
+def time_legacy_remap(rounds=200):
+    display, _ = new_display(90, spi=NullSPI())
+    start = now_us()
+    for _ in range(rounds):
+        legacy_remap(display)
+    return (now_us() - start) / rounds
+
+
+def draw_status(display, temperature):
+    display.fill(0)
+    display.text("Haier AC", 0, 0, 1)
+    display.text("cool  fan 2", 0, 16, 1)
+    display.text("set", 0, 32, 1)
+    display.text(str(temperature), 40, 32, 1)
+    display.hline(0, 56, 128, 1)
+
+
+def update_temperature(display, temperature):
+    display.fill_rect(40, 32, 16, 8, 0)
+    display.text(str(temperature), 40, 32, 1)
+
+
+def measure(display, spi, action):
+    """执行 action 后 show()，返回 (数据字节, 命令字节, 传输次数, 按页刷新时的数据字节, 显存是否正确)"""
+    action()
+    page_level = bin(display.pages_to_update).count('1') * display.width
+    spi.reset_counters()
+    display.show()
+    return spi.data_bytes, spi.cmd_bytes, spi.transactions, page_level, spi.matches(display)
+
+
+def report(name, result):
+    data, cmd, transactions, page_level, ok = result
+    print("{:<10} 数据 {:5d} 字节（按页刷新 {:5d}）  命令 {:3d} 字节  传输 {:3d} 次  显存{}".format(
+        name, data, page_level, cmd, transactions, "正确" if ok else "❌ 不一致"))
+    return ok
+
+
+def main():
+    print("实现: {} {}".format(sys.implementation.name, sys.version.split()[0]))
+    failures = 0
+    for rotate in ROTATIONS:
+        display, spi = new_display(rotate)
+        print("\nrotate={}".format(rotate))
+        failures += not report("整屏", measure(display, spi, lambda: draw_status(display, 26)))
+        status = measure(display, spi, lambda: update_temperature(display, 27))
+        failures += not report("状态", status)
+        if status[0] * 4 > status[3]:
+            print("❌ 状态更新的数据量没有降到按页刷新的 1/4 以下")
+            failures += 1
+        failures += not report("无变化", measure(display, spi, lambda: None))
+
+    for rotate in ROTATIONS:
+        print("\n整屏重画 rotate={}".format(rotate))
+        for shadow in (False, True):
+            display, spi = new_display(rotate, shadow=shadow)
+            measure(display, spi, lambda: draw_status(display, 26))
+            same = measure(display, spi, lambda: draw_status(display, 26))
+            failures += not report("相同" + (" 影子" if shadow else ""), same)
+            changed = measure(display, spi, lambda: draw_status(display, 27))
+            failures += not report("改温度" + (" 影子" if shadow else ""), changed)
+            if shadow and (same[0] or changed[0] > 16):
+                print("❌ 带影子缓冲时相同内容不应发送数据，改温度最多发 16 字节")
+                failures += 1
+        display.init_display()
+        failures += not report("复位后", measure(display, spi, lambda: draw_status(display, 27)))
+
+    print("\n整屏刷新（rotate=0）")
+    results = {}
+    for name, cls in (("逐条命令", PerCommandSPI), ("合并命令", sh1106.SH1106_SPI)):
+        results[name] = time_full_refresh(cls)
+        print("{:<8} 每次 {:7.0f} us  SPI 写入 {:3d} 次  CS 帧 {:3d} 个".format(name, *results[name]))
+    if results["合并命令"][2] != HEIGHT // 8 or results["合并命令"][1] != 2 * (HEIGHT // 8):
+        print("❌ 合并命令后每页应该只有一个 CS 帧、两次 SPI 写入")
+        failures += 1
+    print("\n每次 show() 的耗时（NullSPI）")
+    actions = (("整屏", lambda d, n: d.fill(0)),
+               ("状态", lambda d, n: update_temperature(d, 16 + n % 15)))
+    times = {}
+    for name, action in actions:
+        for rotate in (0, 90):
+            times[name, rotate] = time_show(rotate, action)
+        print("{:<6} rotate=0 {:7.0f} us  rotate=90 {:7.0f} us".format(name, times[name, 0], times[name, 90]))
+    legacy = time_legacy_remap()
+    print("改动前 rotate=90 每次 show() 额外的整屏重映射 {:.0f} us".format(legacy))
+    if times["状态", 90] >= legacy:
+        print("❌ 只改温度时 rotate=90 的 show() 不应比改动前的整屏重映射还慢")
+        failures += 1
+
+    print("\n{}".format("✓ 全部通过" if not failures else "❌ {} 项失败".format(failures)))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+在电脑上检查 display_refresh（使用 one_dragon/emu 的模拟模块和 bench_sh1106 的假 SPI）:
+1. 一口气 request() 20 次只刷新一帧，显存与 displaybuf 一致；
+2. 不停地 request()，帧数不超过 max_fps 限制；
+3. 界面不停整屏重画的同时运行一个模拟红外记录轮询的任务，
+   比较它两次运行之间被 SPI 占住的最长时间：直接调用 show() 时要等一整帧，
+   用调度器时最多等 pages_per_step 页，要小于记录时静默检测定时器的周期。
+   SPI 按 1 MHz 计时：每次写入记下 字节数×8 微秒的传输时间，记录任务两次运行之间
+   累计的传输时间就是它被显示刷新挡住的时间（画图本身的耗时不算在内）。
+   这一项只说明 asyncio 任务级别的等待时间，不涉及中断。
+4. 调度器不停刷新（SPI 写入真的按传输时间阻塞）的同时，用 opt_specification.IRReceiver
+   加 EdgeRing 和 StreamDecoder 记录模拟遥控器回放的 IR learn/rawdata/27pwon 原始记录，
+   记下的脉宽和解出的帧都要与直接离线解码原始记录的结果相同。
+
+第 4 项的边沿由 emu_board 的后台线程按虚拟时间触发，中断里的 ticks_us() 固定为边沿发生的时刻，
+模拟的 Pin 也不区分软/硬中断。所以它检查的是：刷新和轮询循环被挡住时，环形数组 + 定时器回调
+这条路径仍然能完整记下并解出每一帧；它不能说明真实 ESP32 上 spi.write 期间的中断延迟，
+那要靠 Pin.irq(hard=True) 在硬件上保证。
+另外 opt_specification 的学习流程（阻塞在 input() 和 utime.sleep_ms 上）目前没有使用 RefreshScheduler，
+这里的记录任务是按它的轮询方式单独写的 asyncio 版本。
+
+用法: python check_display_refresh.py
+"""
+import sys
+
+if sys.implementation.name != 'micropython':
+    here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    sys.path.insert(0, here + '/../one_dragon')
+    sys.path.insert(0, here + '/../one_dragon/emu')
+
+import asyncio
+import utime
+import sh1106
+from bench_sh1106 import FakePin, FakeSPI, WIDTH, HEIGHT, draw_status, update_temperature
+from display_refresh import RefreshScheduler, PAGES_PER_STEP
+
+SPI_BAUD = 1000000
+IDLE_POLL_MS = 5      # opt_specification 静默检测定时器的周期（IDLE_TIMEOUT_MS // 4）
+REDRAWS = 30
+REPLAY_COMMAND = '27pwon'
+REPLAY_PRESS_DELAY_MS = 50
+
+
+class TimedSPI(FakeSPI):
+    """按波特率累计阻塞的 SPI 传输时间；blocking=True 时每次写入真的休眠这么久"""
+
+    busy_us = 0
+    blocking = False
+
+    def write(self, buf):
+        super().write(buf)
+        us = len(buf) * 8 * 1000000 // SPI_BAUD
+        self.busy_us += us
+        if self.blocking:
+            utime.sleep_us(us)
+
+
+def new_display(blocking=False):
+    dc = FakePin()
+    spi = TimedSPI(dc)
+    spi.blocking = blocking
+    display = sh1106.SH1106_SPI(WIDTH, HEIGHT, spi, dc, cs=FakePin())
+    return display, spi
+
+
+async def capture_task(spi, gaps, done):
+    """模拟记录时的轮询循环：记下每两次运行之间 SPI 传输占用了多久"""
+    while not done:
+        start = spi.busy_us
+        await asyncio.sleep(0)
+        gaps.append(spi.busy_us - start)
+
+
+async def redraw_loop(display, refresh, done):
+    """每 5 ms 整屏重画一次；refresh 为 None 时直接 show()"""
+    for n in range(REDRAWS):
+        draw_status(display, 16 + n % 15)
+        if refresh is None:
+            display.show()
+        else:
+            refresh.request()
+        await asyncio.sleep(0.005)
+    if refresh is not None:
+        while display.pages_to_update or refresh.event.is_set():
+            await asyncio.sleep(0.005)
+    done.append(True)
+
+
+async def longest_gap(use_scheduler):
+    display, spi = new_display()
+    refresh = RefreshScheduler(display, max_fps=50) if use_scheduler else None
+    runner = asyncio.create_task(refresh.run()) if refresh else None
+    gaps = []
+    done = []
+    await asyncio.gather(capture_task(spi, gaps, done), redraw_loop(display, refresh, done))
+    if runner:
+        runner.cancel()
+    return max(gaps), spi.matches(display), refresh
+
+
+async def check_coalesce():
+    display, spi = new_display()
+    refresh = RefreshScheduler(display)
+    runner = asyncio.create_task(refresh.run())
+    for n in range(20):
+        draw_status(display, 16 + n % 15)
+        refresh.request()
+    await asyncio.sleep(0.05)
+    runner.cancel()
+    return refresh.frames, spi.matches(display)
+
+
+async def check_rate(max_fps=20, seconds=0.5):
+    display, _ = new_display()
+    refresh = RefreshScheduler(display, max_fps=max_fps)
+    runner = asyncio.create_task(refresh.run())
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    n = 0
+    while loop.time() - start < seconds:
+        update_temperature(display, 16 + n % 15)
+        refresh.request()
+        n += 1
+        await asyncio.sleep(0.001)
+    runner.cancel()
+    return refresh.frames, refresh.requested
+
+
+async def record_all(receiver, count, results):
+    """按 learn_single_ir_code 的方式轮询：开始记录，等到记录结束，取出脉宽和流式解码的结果"""
+    import opt_specification
+    for _ in range(count):
+        receiver.start_recording()
+        while receiver.is_recording():
+            await asyncio.sleep(opt_specification.POLL_INTERVAL_S)
+        results.append((receiver.get_raw_data(), receiver.get_decoded_hex()))
+
+
+async def keep_redrawing(display, refresh, done):
+    n = 0
+    while not done:
+        draw_status(display, 16 + n % 15)
+        refresh.request()
+        n += 1
+        await asyncio.sleep(0.005)
+
+
+async def capture_while_refreshing(captures):
+    """调度器不停刷新的同时，经模拟的 Pin 中断和 EdgeRing 记录 captures，返回每次的 (脉宽, 十六进制)"""
+    from emu_board import board, IRRemote
+    from opt_specification import IRReceiver
+    from ir_ring import EdgeRing
+    from ir_stream import StreamDecoder
+
+    board.configure(1.0)
+    IRRemote(23, captures, press_delay_ms=REPLAY_PRESS_DELAY_MS)
+    display, spi = new_display(blocking=True)
+    refresh = RefreshScheduler(display, max_fps=50)
+    runner = asyncio.create_task(refresh.run())
+    receiver = IRReceiver(23, decoder=StreamDecoder(), ring=EdgeRing())
+    results = []
+    done = []
+    recorder = asyncio.create_task(record_all(receiver, len(captures), results))
+    redrawer = asyncio.create_task(keep_redrawing(display, refresh, done))
+    await recorder
+    done.append(True)
+    await redrawer
+    runner.cancel()
+    return results, refresh, spi.busy_us
+
+
+def check_capture(check):
+    from emu_board import load_captures
+    from ir_stream import decode_durations
+    from haier_codec import to_hex
+
+    here = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    captures = load_captures(here + '/../IR learn/rawdata/' + REPLAY_COMMAND)
+    results, refresh, busy_us = asyncio.run(capture_while_refreshing(captures))
+    print(f"  记录 {REPLAY_COMMAND} {len(captures)} 次期间: 调度器刷新 {refresh.frames} 帧 "
+          f"{refresh.steps} 次发送，SPI 阻塞共 {busy_us // 1000} ms")
+    check(len(results) == len(captures), f"记录到 {len(results)}/{len(captures)} 次")
+    for n, (capture, (durations, hex_code)) in enumerate(zip(captures, results), 1):
+        offline = decode_durations(capture)
+        offline_hex = to_hex(offline) if offline is not None else None
+        same = durations == capture
+        check(same and hex_code == offline_hex,
+              f"{REPLAY_COMMAND}_{n}: 脉宽{'一致' if same else '不一致'}，解码 {hex_code}"
+              f"（离线 {offline_hex}）")
+
+
+def main():
+    failures = 0
+
+    def check(ok, message):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✓' if ok else '❌'} {message}")
+
+    frames, ok = asyncio.run(check_coalesce())
+    check(frames == 1 and ok, f"连续 request() 20 次: 刷新 {frames} 帧，显存{'正确' if ok else '不一致'}")
+
+    frames, requested = asyncio.run(check_rate())
+    check(0 < frames <= 0.5 * 20 + 1, f"0.5 秒内 request() {requested} 次: 刷新 {frames} 帧（上限 20 fps）")
+
+    direct, _, _ = asyncio.run(longest_gap(False))
+    print(f"  直接 show(): 记录任务最长被挡住 {direct} us")
+    scheduled, ok, refresh = asyncio.run(longest_gap(True))
+    chunk_us = PAGES_PER_STEP * (WIDTH + 3) * 8 * 1000000 // SPI_BAUD
+    check(ok, f"调度器: {refresh.frames} 帧 {refresh.steps} 次发送，显存{'正确' if ok else '不一致'}")
+    check(scheduled <= chunk_us < IDLE_POLL_MS * 1000 < direct,
+          f"调度器: 记录任务最长被挡住 {scheduled} us（{PAGES_PER_STEP} 页 {chunk_us} us，"
+          f"静默检测周期 {IDLE_POLL_MS * 1000} us）")
+
+    check_capture(check)
+
+    print(f"{'✓ 全部通过' if not failures else f'❌ {failures} 项失败'}（SPI 按 {SPI_BAUD // 1000} kHz 计时）")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
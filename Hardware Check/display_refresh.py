@@ -0,0 +1,83 @@
+"""
+屏幕刷新调度：用 asyncio 任务代替直接调用 show()，不让一次刷新长时间占住 CPU。
+
+show() 一次发完所有脏页，期间红外学习的轮询循环（以及中断之后才处理的回调）都要等它。
+这里：
+  - request() 只做标记，立即返回；两次刷新之间的多次 request() 合并成一次
+  - 一帧只发开始时的脏页，发送期间又画脏的页放到下一帧，界面不停重画时也能完成每一帧
+  - 每次只发 pages_per_step 页，发完让出（await asyncio.sleep(0)），别的任务可以先运行
+  - 每帧发完后至少等 1000 / max_fps 毫秒才开始下一帧，限制帧率
+
+用法:
+    scheduler = RefreshScheduler(display)
+    asyncio.create_task(scheduler.run())
+    ...画图...
+    scheduler.request()
+"""
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+MAX_FPS = 10          # 状态屏每秒最多刷新这么多帧
+PAGES_PER_STEP = 2    # 每次发送的页数，2 页（256 字节）在 10 MHz SPI 上约 0.2 ms
+
+
+class RefreshScheduler:
+    """sh1106 的刷新调度器，display 需要支持 show(pages=掩码)"""
+
+    def __init__(self, display, max_fps=MAX_FPS, pages_per_step=PAGES_PER_STEP):
+        self.display = display
+        self.frame_ms = 1000 // max_fps
+        self.pages_per_step = pages_per_step
+        self.event = asyncio.Event()
+        self.requested = 0
+        self.frames = 0
+        self.steps = 0
+
+    def request(self):
+        """代替 display.show()：标记需要刷新，由 run() 在下一帧发送"""
+        self.requested += 1
+        self.event.set()
+
+    def next_pages(self, dirty):
+        """从脏页掩码里取出编号最小的 pages_per_step 页"""
+        mask = 0
+        for _ in range(self.pages_per_step):
+            if not dirty:
+                break
+            bit = dirty & -dirty
+            mask |= bit
+            dirty ^= bit
+        return mask
+
+    async def send_frame(self):
+        """分几次发完开始时的所有脏页，每次之间让出；发送期间又被画脏的页留给下一帧"""
+        display = self.display
+        dirty = display.pages_to_update
+        if not dirty:
+            return False
+        while dirty:
+            pages = self.next_pages(dirty)
+            dirty &= ~pages
+            display.show(pages=pages)
+            self.steps += 1
+            await asyncio.sleep(0)
+        self.frames += 1
+        if display.pages_to_update:
+            self.event.set()
+        return True
+
+    async def run(self):
+        while True:
+            await self.event.wait()
+            self.event.clear()
+            if await self.send_frame():
+                await asyncio.sleep(self.frame_ms / 1000)
+
+    def stats(self):
+        return {
+            'requested': self.requested,
+            'frames': self.frames,
+            'steps': self.steps,
+        }
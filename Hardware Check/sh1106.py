@@ -71,6 +71,7 @@
 # display.text('Testing 1', 0, 0, 1)
 # display.show()
 
+import micropython
 from micropython import const
 import utime as time
 import framebuf
@@ -87,9 +88,31 @@ _HIGH_COLUMN_ADDRESS = const(0x10)
 _SET_PAGE_ADDRESS    = const(0xB0)
 
 
+@micropython.native
+def _remap_rotated(db, rb, page, pages, w, x0, x1):
+    # copy columns x0..x1-1 of one display page out of the HMSB render buffer:
+    # display column c of a page is byte number `page` of render row c
+    i = x0 * pages + page
+    for c in range(w * page + x0, w * page + x1):
+        db[c] = rb[i]
+        i += pages
+
+
+@micropython.native
+def _changed_span(db, sb, x0, x1):
+    # narrow [x0, x1) of db to the bytes that differ from sb, (0, 0) if none
+    while x0 < x1 and db[x0] == sb[x0]:
+        x0 += 1
+    if x0 == x1:
+        return (0, 0)
+    while db[x1 - 1] == sb[x1 - 1]:
+        x1 -= 1
+    return (x0, x1)
+
+
 class SH1106(framebuf.FrameBuffer):
 
-    def __init__(self, width, height, external_vcc, rotate=0):
+    def __init__(self, width, height, external_vcc, rotate=0, shadow=False):
         self.width = width
         self.height = height
         self.external_vcc = external_vcc
@@ -99,7 +122,14 @@ class SH1106(framebuf.FrameBuffer):
         self.bufsize = self.pages * self.width
         self.renderbuf = bytearray(self.bufsize)
         self.pages_to_update = 0
+        # dirty column span [x0, x1) per page, in display (not render) coordinates
+        self.dirty_x0 = bytearray([self.width] * self.pages)
+        self.dirty_x1 = bytearray(self.pages)
         self.delay = 0
+        # optional copy of what was last sent, so that redrawing identical
+        # content sends nothing; only valid once a full update was sent
+        self.shadowbuf = bytearray(self.bufsize) if shadow else None
+        self.shadow_valid = False
 
         if self.rotate90:
             self.displaybuf = bytearray(self.bufsize)
@@ -113,6 +143,8 @@ class SH1106(framebuf.FrameBuffer):
             super().__init__(self.renderbuf, self.width, self.height,
                              framebuf.MONO_VLSB)
 
+        self.display_mv = memoryview(self.displaybuf)
+
         # flip() was called rotate() once, provide backwards compatibility.
         self.rotate = self.flip
         self.init_display()
@@ -162,88 +194,148 @@ class SH1106(framebuf.FrameBuffer):
     def invert(self, invert):
         self.write_cmd(_SET_NORM_INV | (invert & 1))
 
-    def show(self, full_update = False):
+    def show(self, full_update = False, pages = None):
+        # pages is an optional bit mask; only those pages are sent and the
+        # other dirty pages stay dirty for a later call
         # self.* lookups in loops take significant time (~4fps).
         (w, p, db, rb) = (self.width, self.pages,
                           self.displaybuf, self.renderbuf)
-        if self.rotate90:
-            for i in range(self.bufsize):
-                db[w * (i % p) + (i // p)] = rb[i]
+        # page slices are sent through a memoryview to avoid copying them
+        dv = self.display_mv
+        sb = self.shadowbuf
+        # a page can only be compared with what the display already shows
+        compare = sb is not None and self.shadow_valid and not full_update
+        if sb is not None and not compare:
+            # the whole display has to be sent once before pages can be compared
+            (full_update, pages) = (True, None)
         if full_update:
             pages_to_update = (1 << self.pages) - 1
         else:
             pages_to_update = self.pages_to_update
+        if pages is not None:
+            pages_to_update &= pages
+        (x0s, x1s) = (self.dirty_x0, self.dirty_x1)
         #print("Updating pages: {:08b}".format(pages_to_update))
         for page in range(self.pages):
             if (pages_to_update & (1 << page)):
-                self.write_cmd(_SET_PAGE_ADDRESS | page)
-                self.write_cmd(_LOW_COLUMN_ADDRESS | 2)
-                self.write_cmd(_HIGH_COLUMN_ADDRESS | 0)
-                self.write_data(db[(w*page):(w*page+w)])
-        self.pages_to_update = 0
+                (x0, x1) = (x0s[page], x1s[page])
+                if full_update or x0 >= x1:
+                    # full update, or the page was flagged without a column span
+                    (x0, x1) = (0, w)
+                if self.rotate90:
+                    # only the part that is sent needs remapping
+                    _remap_rotated(db, rb, page, p, w, x0, x1)
+                (start, end) = (w*page+x0, w*page+x1)
+                if compare:
+                    (start, end) = _changed_span(db, sb, start, end)
+                if start < end:
+                    if sb is not None:
+                        sb[start:end] = dv[start:end]
+                    # the SH1106 RAM is 132 columns wide, the visible area starts at column 2
+                    self.write_page(page, start - w*page + 2, dv[start:end])
+                x0s[page] = w
+                x1s[page] = 0
+        self.pages_to_update &= ~pages_to_update
+        self.shadow_valid = sb is not None
+
+    def write_page(self, page, col, buf):
+        # set the page and column address, then send buf; the interfaces
+        # override this to send the three address commands in one transfer
+        self.write_cmd(_SET_PAGE_ADDRESS | page)
+        self.write_cmd(_LOW_COLUMN_ADDRESS | (col & 0x0f))
+        self.write_cmd(_HIGH_COLUMN_ADDRESS | (col >> 4))
+        self.write_data(buf)
 
     def pixel(self, x, y, color=None):
         if color is None:
             return super().pixel(x, y)
         else:
             super().pixel(x, y , color)
-            page = y // 8
-            self.pages_to_update |= 1 << page
+            self.register_updates(y, y, x, x)
 
     def text(self, text, x, y, color=1):
         super().text(text, x, y, color)
-        self.register_updates(y, y+7)
+        self.register_updates(y, y+7, x, x+8*len(text)-1)
 
     def line(self, x0, y0, x1, y1, color):
         super().line(x0, y0, x1, y1, color)
-        self.register_updates(y0, y1)
+        self.register_updates(y0, y1, x0, x1)
 
     def hline(self, x, y, w, color):
         super().hline(x, y, w, color)
-        self.register_updates(y)
+        self.register_updates(y, y, x, x+w-1)
 
     def vline(self, x, y, h, color):
         super().vline(x, y, h, color)
-        self.register_updates(y, y+h-1)
+        self.register_updates(y, y+h-1, x, x)
 
     def fill(self, color):
         super().fill(color)
-        self.pages_to_update = (1 << self.pages) - 1
+        self.register_all()
 
     def blit(self, fbuf, x, y, key=-1, palette=None):
         super().blit(fbuf, x, y, key, palette)
-        self.register_updates(y, y+self.height)
+        # the size of fbuf is unknown, assume it reaches the bottom right corner
+        self.register_updates(y, y+self.height, x, x+self.width)
 
     def scroll(self, x, y):
         # my understanding is that scroll() does a full screen change
         super().scroll(x, y)
-        self.pages_to_update =  (1 << self.pages) - 1
+        self.register_all()
 
     def fill_rect(self, x, y, w, h, color):
         super().fill_rect(x, y, w, h, color)
-        self.register_updates(y, y+h-1)
+        self.register_updates(y, y+h-1, x, x+w-1)
 
     def rect(self, x, y, w, h, color):
         super().rect(x, y, w, h, color)
-        self.register_updates(y, y+h-1)
+        self.register_updates(y, y+h-1, x, x+w-1)
 
     def ellipse(self, x, y, xr, yr, color):
         super().ellipse(x, y, xr, yr, color)
-        self.register_updates(y-yr, y+yr-1)
-
-    def register_updates(self, y0, y1=None):
-        # this function takes the top and optional bottom address of the changes made
-        # and updates the pages_to_change list with any changed pages
-        # that are not yet on the list
-        start_page = max(0, y0 // 8)
-        end_page = max(0, y1 // 8) if y1 is not None else start_page
-        # rearrange start_page and end_page if coordinates were given from bottom to top
-        if start_page > end_page:
-            start_page, end_page = end_page, start_page
-        for page in range(start_page, end_page+1):
+        self.register_updates(y-yr, y+yr, x-xr, x+xr)
+
+    def register_all(self):
+        self.pages_to_update = (1 << self.pages) - 1
+        for page in range(self.pages):
+            self.dirty_x0[page] = 0
+            self.dirty_x1[page] = self.width
+
+    def register_updates(self, y0, y1=None, x0=0, x1=None):
+        # this function takes the top and optional bottom address of the changes made,
+        # and optionally the left and right column (inclusive, default: the whole width),
+        # and widens the dirty column span of every page touched.
+        # Coordinates are those of the drawing methods; with rotate90 the rows
+        # of the render buffer are display columns and its columns are display pages.
+        if y1 is None:
+            y1 = y0
+        if self.rotate90:
+            if x1 is None:
+                x1 = self.height - 1
+            (row0, row1, col0, col1) = (x0, x1, y0, y1)
+        else:
+            if x1 is None:
+                x1 = self.width - 1
+            (row0, row1, col0, col1) = (y0, y1, x0, x1)
+        # rearrange the coordinates if they were given from bottom to top / right to left
+        if row0 > row1:
+            row0, row1 = row1, row0
+        if col0 > col1:
+            col0, col1 = col1, col0
+        if row1 < 0 or col1 < 0 or row0 >= self.height or col0 >= self.width:
+            return
+        col0 = max(0, col0)
+        col1 = min(self.width - 1, col1) + 1
+        for page in range(max(0, row0) // 8, min(self.height - 1, row1) // 8 + 1):
             self.pages_to_update |= 1 << page
+            if col0 < self.dirty_x0[page]:
+                self.dirty_x0[page] = col0
+            if col1 > self.dirty_x1[page]:
+                self.dirty_x1[page] = col1
 
     def reset(self, res=None):
+        # the display RAM can no longer be assumed to match the shadow copy
+        self.shadow_valid = False
         if res is not None:
             res(1)
             time.sleep_ms(1)
@@ -255,15 +347,17 @@ class SH1106(framebuf.FrameBuffer):
 
 class SH1106_I2C(SH1106):
     def __init__(self, width, height, i2c, res=None, addr=0x3c,
-                 rotate=0, external_vcc=False, delay=0):
+                 rotate=0, external_vcc=False, delay=0, shadow=False):
         self.i2c = i2c
         self.addr = addr
         self.res = res
         self.temp = bytearray(2)
+        # Co=1, D/C#=0 control byte before each of the page, low and high column commands
+        self.page_cmd = bytearray(b'\x80\xb0\x80\x00\x80\x10')
         self.delay = delay
         if res is not None:
             res.init(res.OUT, value=1)
-        super().__init__(width, height, external_vcc, rotate)
+        super().__init__(width, height, external_vcc, rotate, shadow)
 
     def write_cmd(self, cmd):
         self.temp[0] = 0x80  # Co=1, D/C#=0
@@ -273,13 +367,21 @@ class SH1106_I2C(SH1106):
     def write_data(self, buf):
         self.i2c.writeto(self.addr, b'\x40'+buf)
 
+    def write_page(self, page, col, buf):
+        pc = self.page_cmd
+        pc[1] = _SET_PAGE_ADDRESS | page
+        pc[3] = _LOW_COLUMN_ADDRESS | (col & 0x0f)
+        pc[5] = _HIGH_COLUMN_ADDRESS | (col >> 4)
+        self.i2c.writeto(self.addr, pc)
+        self.write_data(buf)
+
     def reset(self,res=None):
         super().reset(self.res)
 
 
 class SH1106_SPI(SH1106):
     def __init__(self, width, height, spi, dc, res=None, cs=None,
-                 rotate=0, external_vcc=False, delay=0):
+                 rotate=0, external_vcc=False, delay=0, shadow=False):
         dc.init(dc.OUT, value=0)
         if res is not None:
             res.init(res.OUT, value=0)
@@ -290,29 +392,50 @@ class SH1106_SPI(SH1106):
         self.res = res
         self.cs = cs
         self.delay = delay
-        super().__init__(width, height, external_vcc, rotate)
+        # preallocated command buffers, so show() does not allocate per command
+        self.cmd_buf = bytearray(1)
+        self.page_cmd = bytearray(3)
+        super().__init__(width, height, external_vcc, rotate, shadow)
+
+    # CS idles high (set in __init__ and after every transfer), so a transfer
+    # only needs cs(0) ... cs(1). D/C is sampled with the last bit of every
+    # byte, so it may change while CS stays low.
 
     def write_cmd(self, cmd):
+        self.cmd_buf[0] = cmd
+        self.dc(0)
         if self.cs is not None:
-            self.cs(1)
-            self.dc(0)
             self.cs(0)
-            self.spi.write(bytearray([cmd]))
+            self.spi.write(self.cmd_buf)
             self.cs(1)
         else:
-            self.dc(0)
-            self.spi.write(bytearray([cmd]))
+            self.spi.write(self.cmd_buf)
 
     def write_data(self, buf):
+        self.dc(1)
         if self.cs is not None:
-            self.cs(1)
-            self.dc(1)
             self.cs(0)
             self.spi.write(buf)
             self.cs(1)
         else:
-            self.dc(1)
             self.spi.write(buf)
 
+    def write_page(self, page, col, buf):
+        # page and column address commands in one write, followed by the
+        # data in the same CS frame
+        pc = self.page_cmd
+        pc[0] = _SET_PAGE_ADDRESS | page
+        pc[1] = _LOW_COLUMN_ADDRESS | (col & 0x0f)
+        pc[2] = _HIGH_COLUMN_ADDRESS | (col >> 4)
+        (cs, dc) = (self.cs, self.dc)
+        dc(0)
+        if cs is not None:
+            cs(0)
+        self.spi.write(pc)
+        dc(1)
+        self.spi.write(buf)
+        if cs is not None:
+            cs(1)
+
     def reset(self, res=None):
         super().reset(self.res)
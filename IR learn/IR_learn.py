@@ -2,23 +2,43 @@ from machine import Pin, Timer
 import time
 import array
 import utime
+try:
+    # 边记录边解码需要把 one_dragon/ir_stream.py 一起上传到板子上；没有时只记录原始时长
+    from ir_stream import StreamDecoder
+except ImportError:
+    StreamDecoder = None
+
+IDLE_TIMEOUT_MS = 20      # 收到信号后超过这么久没有新边沿，认为一帧已经结束
+MIN_FRAME_PULSES = 10     # 静默前少于这么多个边沿视为干扰，丢弃后继续等待
+POLL_INTERVAL_S = 0.01    # 等待记录结束时的轮询间隔
+RECORD_PAUSE_S = 0.3      # 两次记录之间的停顿
 
 class IRReceiver:
-    def __init__(self, pin_num):
+    def __init__(self, pin_num, decoder=None):
         self.ir_pin = Pin(pin_num, Pin.IN)
         self.timer = Timer(0)
+        self.idle_timer = Timer(1)
+        self.idle_timeout_us = 0
         self.pulse_buffer = array.array('i', [0] * 1000)  # 缓冲区支持999个脉冲
         self.buffer_index = 0
         self.recording = False
         self.start_time = 0
+        self.decoder = decoder  # 可选的 StreamDecoder，边记录边解码
         
-    def start_recording(self, timeout_ms=6000):  # 缩短为6秒
+    def start_recording(self, timeout_ms=6000, idle_timeout_ms=IDLE_TIMEOUT_MS):  # 缩短为6秒
         self.buffer_index = 0
         self.recording = True
         self.start_time = utime.ticks_us()
+        if self.decoder is not None:
+            self.decoder.reset()
         
         self.ir_pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._pulse_handler)
         self.timer.init(period=timeout_ms, mode=Timer.ONE_SHOT, callback=self._timeout_handler)
+        # 静默检测：信号结束后不用等满 timeout_ms
+        self.idle_timeout_us = idle_timeout_ms * 1000
+        if idle_timeout_ms:
+            self.idle_timer.init(period=max(1, idle_timeout_ms // 4), mode=Timer.PERIODIC,
+                                 callback=self._idle_handler)
         
     def _pulse_handler(self, pin):
         if not self.recording:
@@ -27,10 +47,11 @@ class IRReceiver:
         current_time = utime.ticks_us()
         if self.buffer_index > 0:
             duration = utime.ticks_diff(current_time, self.start_time)
-            if duration > 0:
-                self.pulse_buffer[self.buffer_index - 1] = duration
-            else:
-                self.pulse_buffer[self.buffer_index - 1] = 1  # 避免负值
+            if duration <= 0:
+                duration = 1  # 避免负值
+            self.pulse_buffer[self.buffer_index - 1] = duration
+            if self.decoder is not None:
+                self.decoder.feed(duration)
         self.buffer_index += 1
         self.start_time = current_time
             
@@ -38,10 +59,23 @@ class IRReceiver:
         if self.recording:
             self._stop_recording()
             
+    def _idle_handler(self, timer):
+        if not self.recording or self.buffer_index == 0:
+            return
+        if utime.ticks_diff(utime.ticks_us(), self.start_time) < self.idle_timeout_us:
+            return
+        if self.buffer_index > MIN_FRAME_PULSES:
+            self._stop_recording()
+        else:
+            self.buffer_index = 0  # 零星干扰，丢弃后继续等待遥控器信号
+            if self.decoder is not None:
+                self.decoder.reset()
+        
     def _stop_recording(self):
         self.recording = False
         self.ir_pin.irq(handler=None)
         self.timer.deinit()
+        self.idle_timer.deinit()
         
     def is_recording(self):
         return self.recording
@@ -51,6 +85,12 @@ class IRReceiver:
             return []  # 未记录有效数据时返回空列表
         return self.pulse_buffer[:self.buffer_index - 1]  # 返回有效脉冲数据
 
+    def get_decoded_hex(self):
+        """返回流式解码器在记录过程中已解出的帧（十六进制），没有解码器或未完成时返回 None"""
+        if self.decoder is None:
+            return None
+        return self.decoder.get_hex()
+
 def display_progress_bar(current, total, bar_length=20):
     """显示记录进度条"""
     percent = float(current) / total
@@ -64,12 +104,15 @@ def learn_single_ir_code(receiver):
     receiver.start_recording(timeout_ms=6000)  # 6秒超时
     
     start_time = time.time()
+    last_elapsed = -1
     while receiver.is_recording():
         elapsed = time.time() - start_time
         if elapsed > 6:
             break
-        display_progress_bar(elapsed, 6)  # 进度条为6秒
-        time.sleep(0.1)
+        if elapsed != last_elapsed:  # 只在进度变化时刷新，轮询间隔很短
+            display_progress_bar(elapsed, 6)  # 进度条为6秒
+            last_elapsed = elapsed
+        time.sleep(POLL_INTERVAL_S)
     
     print()  # 换行
     raw_data = receiver.get_raw_data()
@@ -82,7 +125,7 @@ def learn_ir_command(pin_num=23, command_name="未命名"):
     print(f"\n开始学习指令: {command_name}")
     print("=" * 40)
     
-    receiver = IRReceiver(pin_num)
+    receiver = IRReceiver(pin_num, StreamDecoder() if StreamDecoder is not None else None)
     recorded_data = []
     
     for attempt in range(3):
@@ -93,6 +136,9 @@ def learn_ir_command(pin_num=23, command_name="未命名"):
         if raw_data:
             recorded_data.append(raw_data)
             print(f"✓ 捕获信号: {len(raw_data)}个脉冲")
+            decoded_hex = receiver.get_decoded_hex()
+            if decoded_hex:
+                print(f"  即时解码: {decoded_hex}")
             print(f"  时序数据（前10个）：{raw_data[:10]}")
         else:
             print("✗ 未检测到有效信号")
@@ -100,7 +146,7 @@ def learn_ir_command(pin_num=23, command_name="未命名"):
         
         if attempt < 2:
             print("准备下一次记录...")
-            time.sleep(1)
+            time.sleep(RECORD_PAUSE_S)
     
     print(f"\n{command_name} - 学习结果分析:")
     print("-" * 30)
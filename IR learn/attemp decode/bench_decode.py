@@ -0,0 +1,85 @@
+"""
+对比逐个循环解码（步骤 2-4）与 batch_decode 批量解码的速度。
+
+用 rawdata 里的真实记录加上随机抖动，生成大量同一指令的脉冲数据，
+两种方式都要得到相同的共识字符串和十六进制结果。
+
+用法: python bench_decode.py [每个指令的记录数，默认2000]
+"""
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+import decode
+
+RAWDATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'rawdata')
+sys.path.insert(0, RAWDATA_DIR)
+
+from capture_pack import command_dirs, load_captures
+
+
+def load_rawdata():
+    """读取 rawdata 下每个指令目录中的原始记录，返回 {指令名: [记录, ...]}。"""
+    return {os.path.basename(command_dir): load_captures(command_dir)
+            for command_dir in command_dirs(RAWDATA_DIR)}
+
+
+def make_dataset(captures, count, jitter=60, seed=0):
+    """以真实记录为模板，加上 ±jitter 微秒的均匀抖动，生成 count 条记录。"""
+    rng = random.Random(seed)
+    data_dict = {}
+    for i in range(count):
+        template = captures[i % len(captures)]
+        data_dict[f"sample_{i}"] = [v + rng.randint(-jitter, jitter) for v in template]
+    return data_dict
+
+
+def loop_decode(data_dict, adaptive=False):
+    """当前的逐个循环版本：解包、逐个分类、逐位共识。"""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        unpack_dict = decode.unpack_and_filter_data(data_dict)
+        converted_dict = decode.convert_to_binary_string(unpack_dict, adaptive)
+        consensus = decode.get_consensus_string(converted_dict)
+    return consensus, decode.consensus_to_hex(consensus)[1]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    commands = load_rawdata()
+    if not commands:
+        print(f"未在 {os.path.abspath(RAWDATA_DIR)} 找到原始记录")
+        return 1
+
+    print(f"每个指令 {count} 条记录")
+    import numpy  # batch_decode 里才导入 numpy，先导入，不把导入时间算进第一组
+    mismatches = 0
+    for adaptive in (False, True):
+        print(f"\n分类方式: {'自适应聚类' if adaptive else '固定窗口'}")
+        print(f"{'指令':<10} {'循环(ms)':>10} {'批量(ms)':>10} {'加速比':>8}  十六进制结果")
+        for command, captures in commands.items():
+            data_dict = make_dataset(captures, count)
+            (loop_bits, loop_hex), loop_time = timed(loop_decode, data_dict, adaptive)
+            (batch_bits, batch_hex), batch_time = timed(decode.batch_decode, data_dict, adaptive)
+            same = loop_bits == batch_bits and loop_hex == batch_hex
+            if not same:
+                mismatches += 1
+            print(f"{command:<10} {loop_time * 1000:>10.1f} {batch_time * 1000:>10.1f} "
+                  f"{loop_time / batch_time:>7.1f}x  {batch_hex}{'' if same else '  ✗ 与循环版本不一致'}")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} 组结果不一致")
+        return 1
+    print("\n✓ 两种方式结果一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
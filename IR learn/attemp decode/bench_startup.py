@@ -0,0 +1,114 @@
+"""
+测量 decode.py 和 one_dragon/cut-hex-room/cut-hex.py 的冷启动时间。
+
+1. 用 python -X importtime 运行每个脚本，列出脚本导入最慢的模块；
+2. 在临时目录里完整运行每个脚本若干次，取中位数，超过 100ms 时返回非零退出码。
+
+用法: python bench_startup.py [运行次数，默认5]
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RAWDATA_DIR = os.path.join(HERE, '..', 'rawdata')
+CUT_HEX_DIR = os.path.join(HERE, '..', '..', 'one_dragon', 'cut-hex-room')
+LIMIT_MS = 100
+TOP_IMPORTS = 5
+
+
+def top_level_imports(args, cwd):
+    """用 -X importtime 运行，返回 {顶层模块名: 累计耗时µs}（不含被它们间接导入的模块）"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args,
+                            cwd=cwd, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # 缩进更深的是间接导入
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def import_times(args, cwd, startup):
+    """
+    脚本本身导入模块的耗时：去掉解释器启动时就会导入的模块（startup）。
+    返回 (总耗时µs, [(累计耗时µs, 模块名), ...] 中最慢的几个)
+    """
+    modules = top_level_imports(args, cwd)
+    entries = [(cumulative, name) for name, cumulative in modules.items() if name not in startup]
+    return sum(cumulative for cumulative, _ in entries), sorted(entries, reverse=True)[:TOP_IMPORTS]
+
+
+def run_times(args, cwd, runs):
+    """在 cwd 里运行 runs 次，返回每次的耗时(ms)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def prepare_workdirs(workdir):
+    """复制一组原始记录和 more code.csv 到临时目录，脚本的输出不会写进仓库"""
+    command = sorted(d for d in os.listdir(RAWDATA_DIR)
+                     if os.path.isdir(os.path.join(RAWDATA_DIR, d)) and not d.startswith('__'))[0]
+    decode_dir = os.path.join(workdir, command)
+    os.mkdir(decode_dir)
+    for name in os.listdir(os.path.join(RAWDATA_DIR, command)):
+        if name.startswith(command + '_') and name.endswith('.txt'):
+            shutil.copy(os.path.join(RAWDATA_DIR, command, name), decode_dir)
+
+    cut_dir = os.path.join(workdir, 'cut-hex-room')
+    os.mkdir(cut_dir)
+    shutil.copy(os.path.join(CUT_HEX_DIR, 'more code.csv'), cut_dir)
+    return decode_dir, cut_dir
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        decode_dir, cut_dir = prepare_workdirs(workdir)
+        targets = [
+            ("python -c pass（解释器本身）", ['-c', 'pass'], workdir),
+            ("decode.py", [os.path.join(HERE, 'decode.py')], decode_dir),
+            ("decode.py --batch", [os.path.join(HERE, 'decode.py'), '--batch'], decode_dir),
+            ("cut-hex.py", [os.path.join(CUT_HEX_DIR, 'cut-hex.py')], cut_dir),
+        ]
+
+        print("--- 脚本导入模块的耗时 (python -X importtime 运行脚本，不含解释器启动时的导入) ---")
+        startup = top_level_imports(['-c', 'pass'], workdir)
+        for name, args, cwd in targets[1:]:
+            total, top = import_times(args, cwd, startup)
+            print(f"{name}: {total / 1000:.1f}ms")
+            for cumulative, module in top:
+                print(f"    {cumulative / 1000:6.1f}ms {module}")
+
+        print(f"\n--- 完整运行，{runs} 次取中位数 ---")
+        over_limit = []
+        for name, args, cwd in targets:
+            median = statistics.median(run_times(args, cwd, runs))
+            print(f"{name:<28} {median:7.1f}ms")
+            # --batch 需要 numpy，不在 100ms 的要求之内
+            if median > LIMIT_MS and '--batch' not in args:
+                over_limit.append(name)
+    finally:
+        shutil.rmtree(workdir)
+
+    if over_limit:
+        print(f"\n❌ 超过 {LIMIT_MS}ms: {', '.join(over_limit)}")
+        return 1
+    print(f"\n✓ decode.py 和 cut-hex.py 冷启动都在 {LIMIT_MS}ms 以内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
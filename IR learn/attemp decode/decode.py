@@ -1,15 +1,51 @@
 import os
-import pandas as pd
 import sys
 from contextlib import redirect_stdout
 
-def read_data_from_txt(directory='.'):
+# 与 esp32 端共用 one_dragon 里的自适应脉宽聚类
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'one_dragon'))
+from pulse_cluster import (fit_clusters, classify_value, describe_clusters,
+                           ZERO_RANGE, ONE_RANGE, LOW_LIMIT_RATIO, HIGH_LIMIT_RATIO, MAX_ITERATIONS)
+from ir_frames import split_frames, FRAME_GAP_US, MIN_FRAME_DURATIONS
+from ir_stream import HEADER_US, HEADER_TOLERANCE_PCT
+
+def parse_number(field):
+    """把一个字段转换为 int，不是整数时转换为 float，空字段或无法转换时为 NaN（与 pandas.read_csv 相同）"""
+    try:
+        return int(field)
+    except ValueError:
+        try:
+            return float(field)
+        except ValueError:
+            return float('nan')
+
+def read_capture_file(file_path):
+    """
+    只用标准库读取一个以逗号分隔的记录文件，返回扁平列表，行尾多余的逗号被忽略。
+    文件为空时抛出 ValueError。
+    """
+    values = []
+    with open(file_path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.strip().rstrip(',').split(',')
+            if fields != ['']:
+                values.extend(parse_number(field.strip()) for field in fields)
+    if not values:
+        raise ValueError("No columns to parse from file")
+    return values
+
+def read_data_from_txt(directory='.', file_names=None):
     """
     从指定目录读取所有.txt文件到字典中。
     键是无扩展名的文件名，值是数据。
+    file_names 不为 None 时只读取其中列出的文件（例如跳过 result.txt）。
     """
     print("--- 步骤 1: 读取 .txt 文件 ---")
-    txt_files = [f for f in os.listdir(directory) if f.endswith('.txt')]
+    if file_names is None:
+        # result.txt 是本脚本自己的输出，不能当作输入
+        txt_files = [f for f in os.listdir(directory) if f.endswith('.txt') and f != 'result.txt']
+    else:
+        txt_files = list(file_names)
     
     if not txt_files:
         print(f"警告: 在目录 '{os.path.abspath(directory)}' 中未找到 .txt 文件。")
@@ -20,14 +56,8 @@ def read_data_from_txt(directory='.'):
         list_name = file_name.replace('.txt', '')
         file_path = os.path.join(directory, file_name)
         try:
-            # 读取以逗号分隔的文件
-            data = pd.read_csv(file_path, header=None, delimiter=',')
-            
-            # 将单行或单列数据转换为扁平列表
-            if data.shape[0] == 1:
-                data_dict[list_name] = data.iloc[0].tolist()
-            else:
-                data_dict[list_name] = data.values.flatten().tolist()
+            # 读取以逗号分隔的文件，单行或多行都转换为扁平列表
+            data_dict[list_name] = read_capture_file(file_path)
             print(f"成功读取文件: {file_name}")
 
         except Exception as e:
@@ -38,6 +68,7 @@ def read_data_from_txt(directory='.'):
 def unpack_and_filter_data(data_dict):
     """
     处理原始数据列表：移除前4个元素，并从剩余部分中选择偶数位置的元素。
+    一次记录里有多帧（长间隔或帧头分隔）时，每帧单独处理，命名为 unpack_<名称>#1、#2 ...
     """
     print("\n--- 步骤 2: 解包和过滤数据 ---")
     unpack_dict = {}
@@ -45,34 +76,52 @@ def unpack_and_filter_data(data_dict):
         if not isinstance(data, list):
             data = data.tolist()
         
-        # 裁剪前四个元素
         if len(data) > 4:
-            trimmed_data = data[4:]
-            
-            # 提取偶数位置的元素 (索引 1, 3, 5, ...)
-            even_position_elements = trimmed_data[1::2]
-            
-            unpack_name = "unpack_" + name
-            unpack_dict[unpack_name] = even_position_elements
-            print(f"已处理 '{name}', 创建了 '{unpack_name}'，包含 {len(even_position_elements)} 个元素。")
+            frames = split_frames(data)
+            for index, frame in enumerate(frames, 1):
+                # 裁剪前四个元素
+                trimmed_data = frame[4:]
+                
+                # 提取偶数位置的元素 (索引 1, 3, 5, ...)
+                even_position_elements = trimmed_data[1::2]
+                
+                unpack_name = "unpack_" + name + (f"#{index}" if len(frames) > 1 else "")
+                unpack_dict[unpack_name] = even_position_elements
+                print(f"已处理 '{name}', 创建了 '{unpack_name}'，包含 {len(even_position_elements)} 个元素。")
         else:
             print(f"警告: 列表 '{name}' 的元素少于或等于4个，已跳过。")
             
     return unpack_dict
 
-def convert_to_binary_string(unpack_dict):
+def convert_to_binary_string(unpack_dict, adaptive=False):
     """
     根据数值范围将数字列表转换为二进制字符串。
     400-700 -> 0, 1500-1900 -> 1, 其他 -> ?
+    adaptive=True 时改为按每个列表自身的短/长聚类分类（见 pulse_cluster），并打印聚类余量。
     """
     print("\n--- 步骤 3: 将数据转换为二进制表示 ---")
     converted_dict = {}
     for name, data in unpack_dict.items():
+        if adaptive:
+            numeric = []
+            for value in data:
+                try:
+                    num_value = float(value)
+                except (ValueError, TypeError):
+                    continue
+                if num_value == num_value:  # 排除 NaN
+                    numeric.append(num_value)
+            clusters = fit_clusters(numeric)
+            print(f"{name} 聚类: {describe_clusters(clusters)}")
+
         converted_list = []
         for value in data:
             try:
                 num_value = float(value)
-                if 400 <= num_value <= 700:
+                if adaptive:
+                    bit = classify_value(num_value, clusters) if num_value == num_value else '?'
+                    converted_list.append(int(bit) if bit != '?' else "?")
+                elif 400 <= num_value <= 700:
                     converted_list.append(0)
                 elif 1500 <= num_value <= 1900:
                     converted_list.append(1)
@@ -130,66 +179,234 @@ def format_number_with_separators(number_str, group_size, separator=' '):
     separated = separator.join(reversed_str[i:i+group_size] for i in range(0, len(reversed_str), group_size))
     return separated[::-1]
 
+def consensus_to_hex(binary_string):
+    """把共识二进制字符串（忽略 '?'）转换为 (十进制值, 十六进制字符串)，无有效位时返回 (None, None)。"""
+    clean_binary = ''.join(c for c in binary_string if c in '01')
+    if not clean_binary:
+        return None, None
+    decimal_value = int(clean_binary, 2)
+    return decimal_value, hex(decimal_value)[2:].upper()
+
 def perform_final_conversion(binary_string):
     """
     将最终的二进制字符串转换为十进制和十六进制格式。
+    返回十六进制字符串，无法转换时返回 None。
     """
     print("\n--- 步骤 5: 最终转换和输出 ---")
     
     print(f"最终共识二进制字符串: {binary_string}")
     print(f"共识字符串中的总位数: {len(binary_string)}")
     
-    clean_binary = ''.join(c for c in binary_string if c in '01')
-    
-    if not clean_binary:
-        print("十进制结果: 没有有效的二进制数据可供转换。")
-        print("十六进制结果: 没有有效的二进制数据可供转换。")
-        return
-
     try:
-        decimal_value = int(clean_binary, 2)
-        hex_value = hex(decimal_value)[2:].upper()
-        
-        # 格式化以便于阅读
-        decimal_formatted = format_number_with_separators(str(decimal_value), 3, ',')
-        hex_formatted = format_number_with_separators(hex_value, 4, ' ')
-        
-        print(f"十进制结果: {decimal_formatted}")
-        print(f"十六进制结果: {hex_formatted}")
-
+        decimal_value, hex_value = consensus_to_hex(binary_string)
     except ValueError:
         print("十进制结果: 转换期间出错。")
         print("十六进制结果: 转换期间出错。")
+        return None
 
-def main():
+    if hex_value is None:
+        print("十进制结果: 没有有效的二进制数据可供转换。")
+        print("十六进制结果: 没有有效的二进制数据可供转换。")
+        return None
+
+    # 格式化以便于阅读
+    decimal_formatted = format_number_with_separators(str(decimal_value), 3, ',')
+    hex_formatted = format_number_with_separators(hex_value, 4, ' ')
+    
+    print(f"十进制结果: {decimal_formatted}")
+    print(f"十六进制结果: {hex_formatted}")
+    return hex_value
+
+def header_errors(arr):
+    """
+    arr 最后一维上每个位置与帧头的偏差（与 ir_frames._header_error 相同），不是帧头时为 inf，NaN 不匹配。
+    结果的最后一维比 arr 短 len(HEADER_US) - 1。
+    """
+    import numpy as np
+    header = np.asarray(HEADER_US, dtype=float)
+    with np.errstate(invalid='ignore'):
+        deviation = np.abs(np.lib.stride_tricks.sliding_window_view(arr, len(header), axis=-1) - header) * 100
+        matches = (deviation <= header * HEADER_TOLERANCE_PCT).all(axis=-1)
+    return np.where(matches, (deviation // header).sum(axis=-1), np.inf)
+
+def split_frames_array(data):
+    """
+    与 ir_frames.split_frames 结果相同的 numpy 版本，返回一维数组的列表。
+    长间隔和帧头的位置用数组运算一次找出，只在这些候选位置上按 frame_spans 的规则走一遍。
+    """
+    import numpy as np
+    arr = np.asarray(data, dtype=float)
+    count = len(arr)
+    with np.errstate(invalid='ignore'):
+        gaps = arr > FRAME_GAP_US
+    errors = header_errors(arr) if count >= len(HEADER_US) else np.full(0, np.inf)
+    candidates = gaps.copy()
+    candidates[1:len(errors)] |= np.isfinite(errors[1:])
+
+    starts = [0]
+    ends = []
+    i = 0
+    for c in np.flatnonzero(candidates):
+        if c < i:
+            continue  # 在上一个帧头里面
+        if gaps[c]:
+            ends.append(c)
+            starts.append(c + 1)
+            i = c + 1
+        elif c > starts[-1]:
+            following = errors[c + 1] if c + 1 < len(errors) else np.inf
+            if np.isfinite(errors[c]) and following >= errors[c]:
+                ends.append(c - 1 if (c - starts[-1]) % 2 == 0 else c)
+                starts.append(c)
+                i = c + len(HEADER_US)
+    ends.append(count)
+
+    spans = [(start, end) for start, end in zip(starts, ends) if end - start >= MIN_FRAME_DURATIONS]
+    if not spans or (len(spans) == 1 and spans[0] == (0, count)):
+        return [arr]
+    return [arr[start:end] for start, end in spans]
+
+def load_capture_matrix(data_dict):
     """
-    运行整个数据处理流程的主函数。
+    把所有脉冲数据装入一个二维数组，每行一帧，长度不足的部分用 NaN 填充。
+    元素少于或等于4个的记录被跳过，多帧记录被切分，都与 unpack_and_filter_data 相同。
+    先把每条记录作为一行，用数组运算一次找出含有长间隔或（第一个位置之后的）帧头的行，
+    只有这些行才逐条切分，单帧记录不经过 Python 循环。
+    """
+    import numpy as np
+    records = [data for data in data_dict.values() if len(data) > 4]
+    if not records:
+        return np.empty((0, 0))
+    lengths = [len(data) for data in records]
+    matrix = np.full((len(records), max(lengths)), np.nan)
+    for i, data in enumerate(records):
+        matrix[i, :lengths[i]] = data
+
+    with np.errstate(invalid='ignore'):
+        multi = (matrix > FRAME_GAP_US).any(axis=1)
+        # 第 1 列以后出现帧头的行：四个时长依次与帧头比较，比 header_errors 省掉偏差求和
+        width = matrix.shape[1] - len(HEADER_US) + 1
+        if width > 1:
+            is_header = np.ones((len(records), width - 1), dtype=bool)
+            for k, expected in enumerate(HEADER_US):
+                is_header &= np.abs(matrix[:, 1 + k:width + k] - expected) * 100 <= expected * HEADER_TOLERANCE_PCT
+            multi |= is_header.any(axis=1)
+    if not multi.any():
+        return matrix
+
+    rows = []
+    for i, row in enumerate(matrix):
+        if multi[i]:
+            rows.extend(split_frames_array(row[:lengths[i]]))
+        else:
+            rows.append(row[:lengths[i]])
+    split = np.full((len(rows), max(len(row) for row in rows)), np.nan)
+    for i, row in enumerate(rows):
+        split[i, :len(row)] = row
+    return split
+
+def fit_thresholds(spaces):
     """
-    data_dict = read_data_from_txt('.')
+    逐行向量化的二均值聚类，迭代方式与 pulse_cluster.fit_clusters 完全相同。
+    返回 (能否聚类的布尔数组, 阈值, 下限, 上限)，每个都是一维数组。
+    """
+    import numpy as np
+    valid = ~np.isnan(spaces)
+    values = np.where(valid, spaces, 0.0)
+    has_data = valid.any(axis=1)
+    low = np.where(has_data, np.where(valid, spaces, np.inf).min(axis=1), 0.0)
+    high = np.where(has_data, np.where(valid, spaces, -np.inf).max(axis=1), 0.0)
+    ok = high > low
+
+    threshold = (low + high) / 2
+    short_center = np.zeros(len(spaces))
+    long_center = np.zeros(len(spaces))
+    active = ok.copy()
+    for _ in range(MAX_ITERATIONS):
+        is_short = valid & (spaces <= threshold[:, None])
+        is_long = valid & ~is_short
+        short_count = is_short.sum(axis=1)
+        long_count = is_long.sum(axis=1)
+        ok &= ~active | ((short_count > 0) & (long_count > 0))
+        active &= ok
+        if not active.any():
+            break
+        short_center = np.where(active, (values * is_short).sum(axis=1) / np.maximum(short_count, 1), short_center)
+        long_center = np.where(active, (values * is_long).sum(axis=1) / np.maximum(long_count, 1), long_center)
+        new_threshold = (short_center + long_center) / 2
+        converged = new_threshold == threshold
+        threshold = np.where(active & ~converged, new_threshold, threshold)
+        active &= ~converged
+
+    return ok, threshold, short_center * LOW_LIMIT_RATIO, long_center * HIGH_LIMIT_RATIO
+
+def batch_decode(data_dict, adaptive=False):
+    """
+    批量解码：与步骤 2-4 等价，但分类和逐列多数投票都用数组运算完成。
+    adaptive=True 时与 convert_to_binary_string(adaptive=True) 一样按每行聚类分类。
+    返回 (共识二进制字符串, 十六进制结果)，十六进制结果与 perform_final_conversion 相同。
+    """
+    import numpy as np  # numpy 只在批量模式才导入，逐个模式启动时不加载
+    matrix = load_capture_matrix(data_dict)
+    if matrix.size == 0:
+        return "", None
+
+    # 裁剪前四个元素后取偶数位置，即原始列 5, 7, 9, ...；NaN 填充位与任何范围比较都为 False
+    spaces = matrix[:, 5::2]
+    with np.errstate(invalid='ignore'):
+        is_zero = (spaces >= ZERO_RANGE[0]) & (spaces <= ZERO_RANGE[1])
+        is_one = (spaces >= ONE_RANGE[0]) & (spaces <= ONE_RANGE[1])
+        if adaptive:
+            ok, threshold, low_limit, high_limit = fit_thresholds(spaces)
+            in_range = (spaces >= low_limit[:, None]) & (spaces <= high_limit[:, None])
+            below = spaces <= threshold[:, None]
+            is_zero = np.where(ok[:, None], in_range & below, is_zero)
+            is_one = np.where(ok[:, None], in_range & ~below, is_one)
+        count_0 = is_zero.sum(axis=0)
+        count_1 = is_one.sum(axis=0)
+
+    # 0 -> '?', 1 -> '0', 2 -> '1'，数量相等（包括都为0）时为 '?'
+    codes = np.where(count_0 > count_1, 1, np.where(count_1 > count_0, 2, 0))
+    binary_string = ''.join(np.array(['?', '0', '1'])[codes])
+    return binary_string, consensus_to_hex(binary_string)[1]
+
+def main(batch=False, adaptive=False, directory='.', file_names=None):
+    """
+    运行整个数据处理流程的主函数，返回十六进制结果（失败时为 None）。
+    batch=True 时用 batch_decode 一次性完成步骤 2-4；
+    adaptive=True 时按每次记录的脉宽聚类分类，代替固定的 0/1 窗口。
+    directory、file_names 传给 read_data_from_txt。
+    """
+    data_dict = read_data_from_txt(directory, file_names)
     if not data_dict:
         print("\n流程已停止: 未读取到任何数据。")
-        return
+        return None
+
+    if batch:
+        print("\n--- 步骤 2-4: 批量解码 ---")
+        consensus_result, _ = batch_decode(data_dict, adaptive)
+        return perform_final_conversion(consensus_result)
 
     unpack_dict = unpack_and_filter_data(data_dict)
     if not unpack_dict:
         print("\n流程已停止: 解包后无可用数据。")
-        return
+        return None
 
-    converted_dict = convert_to_binary_string(unpack_dict)
+    converted_dict = convert_to_binary_string(unpack_dict, adaptive)
     if not converted_dict:
         print("\n流程已停止: 转换后无可用数据。")
-        return
+        return None
 
     consensus_result = get_consensus_string(converted_dict)
 
-    perform_final_conversion(consensus_result)
+    return perform_final_conversion(consensus_result)
 
 
 if __name__ == "__main__":
     # 将所有 print 输出重定向到 result.txt 文件
+    # 加 --batch 参数时使用批量解码模式，加 --adaptive 参数时使用自适应脉宽聚类
     with open('result.txt', 'w', encoding='utf-8') as f:
         with redirect_stdout(f):
             print("--- 开始处理 ---")
-            main()
+            main(batch='--batch' in sys.argv[1:], adaptive='--adaptive' in sys.argv[1:])
             print("\n--- 处理完成 ---")
-
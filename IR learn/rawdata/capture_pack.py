@@ -0,0 +1,326 @@
+"""
+rawdata 的紧凑二进制格式（.ircp）：把 <指令>/<指令>_N.txt 里的逗号分隔时长打包进一个文件，
+读取时用 mmap 直接映射，不需要逐个文件解析文本。
+这里的 find_capture_files / read_txt_capture / load_captures / command_dirs 也是读取 .txt 记录的共用函数，
+replay_*.py、emu_board、bench_decode.py、decode_all.py 都用它们，文件的筛选和排序方式保持一致。
+
+文件结构（全部小端）:
+  文件头  20 字节  b'IRCP', 版本(u8), 保留(u8), 指令名数(u16), 记录数(u32), 数据区偏移(u32), 数据区字数(u32)
+  指令名表        每个: 长度(u8) + utf-8 字节
+  记录索引        每条 16 字节: 指令名序号(u16), 记录编号N(u16), 标志(u16), 保留(u16), 数据起始字(u32), 字数(u32)
+  数据区          uint16 时长；>= 0xFFFF 的长间隔写成 0xFFFF, 高16位, 低16位 三个字
+
+用法:
+  python capture_pack.py pack [输出文件，默认 captures.ircp] [指令目录 ...]
+  python capture_pack.py info <文件>
+  python capture_pack.py bench [文件，默认 captures.ircp]
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+
+MAGIC = b'IRCP'
+VERSION = 1
+ESCAPE = 0xFFFF
+FLAG_ESCAPED = 0x0001  # 这条记录的数据里有转义的长间隔
+
+HEADER = struct.Struct('<4sBBHIII')
+ENTRY = struct.Struct('<HHHHII')
+
+RAWDATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PACK = 'captures.ircp'
+
+
+def find_capture_files(command_dir):
+    """返回目录中 <指令>_N.txt 的 [(N, 路径), ...]，按 N 排序；decode.py、result.txt 等其他文件被忽略"""
+    command = os.path.basename(os.path.normpath(command_dir))
+    found = []
+    for file_name in os.listdir(command_dir):
+        stem = file_name[:-4]
+        if file_name.endswith('.txt') and stem.startswith(command + '_') and stem[len(command) + 1:].isdigit():
+            found.append((int(stem[len(command) + 1:]), os.path.join(command_dir, file_name)))
+    return sorted(found)
+
+
+def parse_duration(field):
+    """把一个字段转成整数时长；空白、nan、inf 和其他不是数字的字段返回 None"""
+    try:
+        value = float(field)
+    except ValueError:
+        return None
+    if value != value or value in (float('inf'), float('-inf')):
+        return None
+    return int(value)
+
+
+def read_txt_capture(path):
+    """读取一个逗号分隔的 .txt 记录，返回整数列表；不是数字的字段被跳过"""
+    durations = []
+    with open(path) as f:
+        for field in f.read().replace('\n', ',').split(','):
+            value = parse_duration(field) if field.strip() else None
+            if value is not None:
+                durations.append(value)
+    return durations
+
+
+def load_captures(command_dir):
+    """读取一个指令目录下的全部记录，按编号 N 排序返回时长列表的列表，空记录被跳过"""
+    captures = []
+    for _, path in find_capture_files(command_dir):
+        durations = read_txt_capture(path)
+        if durations:
+            captures.append(durations)
+    return captures
+
+
+def command_dirs(rawdata_dir=RAWDATA_DIR):
+    """rawdata 下含有 <指令>_N.txt 记录的指令目录，按名称排序；__pycache__ 等被忽略"""
+    dirs = []
+    for name in sorted(os.listdir(rawdata_dir)):
+        path = os.path.join(rawdata_dir, name)
+        if os.path.isdir(path) and not name.startswith('__') and find_capture_files(path):
+            dirs.append(path)
+    return dirs
+
+
+def encode_durations(durations):
+    """把时长列表编码成 uint16 字列表，返回 (字列表, 是否有转义)"""
+    words = []
+    escaped = False
+    for value in durations:
+        value = max(int(value), 0)
+        if value >= ESCAPE:
+            if value > 0xFFFFFFFF:
+                raise ValueError(f"时长 {value} 超出 32 位")
+            words.extend((ESCAPE, value >> 16, value & 0xFFFF))
+            escaped = True
+        else:
+            words.append(value)
+    return words, escaped
+
+
+def decode_words(words):
+    """encode_durations 的逆操作"""
+    result = []
+    i = 0
+    count = len(words)
+    while i < count:
+        word = words[i]
+        if word == ESCAPE:
+            result.append((words[i + 1] << 16) | words[i + 2])
+            i += 3
+        else:
+            result.append(word)
+            i += 1
+    return result
+
+
+def write_pack(path, captures):
+    """
+    把记录写入 .ircp 文件。
+    captures 为 [(指令名, 编号N, 时长列表), ...]，返回写入的字节数。
+    """
+    labels = []
+    label_index = {}
+    entries = []
+    data = []
+    for label, number, durations in captures:
+        if label not in label_index:
+            label_index[label] = len(labels)
+            labels.append(label)
+        words, escaped = encode_durations(durations)
+        entries.append((label_index[label], number, FLAG_ESCAPED if escaped else 0, 0, len(data), len(words)))
+        data.extend(words)
+
+    label_table = b''.join(bytes([len(name.encode('utf-8'))]) + name.encode('utf-8') for name in labels)
+    data_offset = HEADER.size + len(label_table) + ENTRY.size * len(entries)
+    padding = (-data_offset) % 4  # 数据区按 4 字节对齐，方便 memoryview.cast
+    data_offset += padding
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(labels), len(entries), data_offset, len(data)))
+        f.write(label_table)
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+        f.write(b'\0' * padding)
+        f.write(struct.pack(f'<{len(data)}H', *data))
+    return data_offset + 2 * len(data)
+
+
+def collect_rawdata(dirs=None):
+    """读取各指令目录下的 .txt 记录，返回 write_pack 需要的列表"""
+    captures = []
+    for command_dir in dirs or command_dirs():
+        label = os.path.basename(os.path.normpath(command_dir))
+        for number, path in find_capture_files(command_dir):
+            durations = read_txt_capture(path)
+            if durations:
+                captures.append((label, number, durations))
+    return captures
+
+
+class CapturePack:
+    """
+    用 mmap 打开 .ircp 文件。没有转义的记录直接返回 memoryview 切片，不复制也不解析；
+    用完后调用 close()（或用 with），之前取得的切片在关闭后不能再用。
+    """
+
+    def __init__(self, path):
+        self._file = None
+        self._map = None
+        try:
+            self._file = open(path, 'rb')
+            # 空文件无法映射（mmap 抛 ValueError），出错时由下面的 close() 关闭文件
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, label_count, capture_count, data_offset, data_words = \
+                HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} 不是 .ircp 文件")
+            if version != VERSION:
+                raise ValueError(f"不支持的 .ircp 版本 {version}")
+
+            pos = HEADER.size
+            self.labels = []
+            for _ in range(label_count):
+                length = self._map[pos]
+                self.labels.append(self._map[pos + 1:pos + 1 + length].decode('utf-8'))
+                pos += 1 + length
+            self.entries = [ENTRY.unpack_from(self._map, pos + i * ENTRY.size) for i in range(capture_count)]
+
+            raw = memoryview(self._map)[data_offset:data_offset + 2 * data_words]
+            # 数据区是小端；大端主机上只能逐字解码
+            self._words = raw.cast('H') if sys.byteorder == 'little' else None
+            self._raw = raw
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for name in ('_words', '_raw'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def durations(self, index):
+        """第 index 条记录的时长：无转义时为 uint16 的 memoryview，否则为整数列表"""
+        _, _, flags, _, offset, count = self.entries[index]
+        if self._words is None:
+            words = struct.unpack_from(f'<{count}H', self._raw, 2 * offset)
+        else:
+            words = self._words[offset:offset + count]
+        if flags & FLAG_ESCAPED:
+            return decode_words(words)
+        return words
+
+    def captures(self, label=None):
+        """依次返回 (指令名, 编号N, 时长)，label 不为 None 时只返回该指令的记录"""
+        for index, (label_id, number, _, _, _, _) in enumerate(self.entries):
+            name = self.labels[label_id]
+            if label is None or name == label:
+                yield name, number, self.durations(index)
+
+    def to_data_dict(self, label):
+        """返回与 decode.read_data_from_txt 相同格式的 {'<指令>_N': [时长, ...]}"""
+        return {f"{name}_{number}": list(durations) for name, number, durations in self.captures(label)}
+
+
+def cmd_pack(args):
+    out_path = args[0] if args else DEFAULT_PACK
+    captures = collect_rawdata(args[1:])
+    if not captures:
+        print("未找到任何 <指令>_N.txt 记录")
+        return 1
+    size = write_pack(out_path, captures)
+
+    txt_size = 0
+    for command_dir in args[1:] or [os.path.join(RAWDATA_DIR, label) for label in sorted({c[0] for c in captures})]:
+        txt_size += sum(os.path.getsize(path) for _, path in find_capture_files(command_dir))
+
+    # 写完后读回校验
+    with CapturePack(out_path) as pack:
+        read_back = [(label, number, list(durations)) for label, number, durations in pack.captures()]
+    for (label, number, durations), read in zip(captures, read_back):
+        if read != (label, number, [max(v, 0) for v in durations]):
+            print(f"❌ 读回校验失败: {label}_{number}")
+            return 1
+
+    print(f"已写入 {out_path}: {len(captures)} 条记录，{len({c[0] for c in captures})} 个指令")
+    print(f"原始 .txt 共 {txt_size} 字节，.ircp {size} 字节，约为原来的 1/{txt_size / size:.1f}")
+    return 0
+
+
+def cmd_info(args):
+    with CapturePack(args[0]) as pack:
+        print(f"{args[0]}: {len(pack)} 条记录")
+        for label in pack.labels:
+            records = [(number, len(durations)) for _, number, durations in pack.captures(label)]
+            lengths = ', '.join(f"_{number}:{length}" for number, length in records)
+            print(f"  {label}: {len(records)} 条  ({lengths})")
+    return 0
+
+
+def cmd_bench(args):
+    """对比 decode.read_data_from_txt（逐个读取文本文件）与 mmap 读取全部记录的耗时"""
+    pack_path = args[0] if args else DEFAULT_PACK
+    if not os.path.exists(pack_path):
+        print(f"未找到 {pack_path}，请先运行: python capture_pack.py pack")
+        return 1
+
+    sys.path.insert(0, os.path.join(RAWDATA_DIR, '..', 'attemp decode'))
+    from contextlib import redirect_stdout
+    import decode
+
+    start = time.perf_counter()
+    with CapturePack(pack_path) as pack:
+        labels = list(pack.labels)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for label in labels:
+            decode.read_data_from_txt(os.path.join(RAWDATA_DIR, label))
+    txt_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with CapturePack(pack_path) as pack:
+        total = sum(len(durations) for _, _, durations in pack.captures())
+    map_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with CapturePack(pack_path) as pack:
+        for label in pack.labels:
+            pack.to_data_dict(label)
+    dict_time = time.perf_counter() - start
+
+    print(f"read_data_from_txt（逐个文本文件）:  {txt_time * 1000:.1f}ms")
+    print(f"mmap 打开并遍历 {total} 个时长:      {map_time * 1000:.2f}ms")
+    print(f"mmap 转成 decode 用的字典:          {dict_time * 1000:.2f}ms")
+    return 0
+
+
+def main(argv):
+    commands = {'pack': cmd_pack, 'info': cmd_info, 'bench': cmd_bench}
+    if not argv or argv[0] not in commands or (argv[0] == 'info' and len(argv) < 2):
+        print(__doc__)
+        return 1
+    return commands[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
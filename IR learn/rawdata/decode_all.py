@@ -0,0 +1,92 @@
+"""
+一次解码 rawdata 下所有指令目录：每个目录用一个进程并行运行 decode.py 的流程，
+只读取 <指令>_N.txt，不会把 result.txt 等输出当成输入。
+所有指令的结果和耗时汇总，连同每个指令的解码过程，写入一个文件（默认 rawdata/decode_results.txt，
+在指令目录之外、不会被当成记录读取，并已加入 .gitignore）；--out 可以换成别的文件。
+
+用法: python decode_all.py [rawdata目录] [--batch] [--adaptive] [--jobs 进程数] [--out 结果文件]
+"""
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+RAWDATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAWDATA_DIR, '..', 'attemp decode'))
+
+from capture_pack import command_dirs, find_capture_files
+
+DEFAULT_OUT = 'decode_results.txt'  # 写在 rawdata 目录下，command_dirs 只看子目录，不会读到它
+
+
+def parse_args(argv):
+    options = {'root': RAWDATA_DIR, 'batch': False, 'adaptive': False, 'jobs': None, 'out': None}
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg == '--batch':
+            options['batch'] = True
+        elif arg == '--adaptive':
+            options['adaptive'] = True
+        elif arg == '--jobs':
+            options['jobs'] = int(args.pop(0))
+        elif arg == '--out':
+            options['out'] = args.pop(0)
+        else:
+            options['root'] = arg
+    if options['out'] is None:
+        options['out'] = os.path.join(options['root'], DEFAULT_OUT)
+    return options
+
+
+def decode_command(command_dir, batch=False, adaptive=False):
+    """
+    在子进程里解码一个指令目录。
+    返回 (指令名, 记录数, 十六进制结果, 耗时秒, 解码过程输出)。
+    """
+    import decode
+
+    file_names = [os.path.basename(path) for _, path in find_capture_files(command_dir)]
+    log = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(log):
+        hex_value = decode.main(batch, adaptive, command_dir, file_names)
+    elapsed = time.perf_counter() - start
+    return os.path.basename(command_dir), len(file_names), hex_value, elapsed, log.getvalue()
+
+
+def main(argv):
+    options = parse_args(argv)
+    dirs = command_dirs(options['root'])
+    if not dirs:
+        print(f"在 '{os.path.abspath(options['root'])}' 下未找到 <指令>_N.txt 记录")
+        return 1
+
+    mode = ('批量' if options['batch'] else '逐个') + ('+自适应聚类' if options['adaptive'] else '')
+    print(f"解码 {len(dirs)} 个指令（{mode}）...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=options['jobs']) as pool:
+        futures = [pool.submit(decode_command, d, options['batch'], options['adaptive']) for d in dirs]
+        results = [future.result() for future in futures]
+    total = time.perf_counter() - start
+
+    lines = [f"解码模式: {mode}", "",
+             f"{'指令':<10} {'记录数':>6} {'耗时(ms)':>10}  十六进制结果"]
+    for command, count, hex_value, elapsed, _ in results:
+        lines.append(f"{command:<10} {count:>6} {elapsed * 1000:>10.1f}  {hex_value or '解码失败'}")
+    lines.append(f"\n总耗时 {total * 1000:.1f}ms（含进程启动）")
+    summary = '\n'.join(lines)
+
+    print(summary)
+    with open(options['out'], 'w', encoding='utf-8') as f:
+        f.write(summary + '\n')
+        for command, _, _, _, log in results:
+            f.write(f"\n\n===== {command} =====\n{log}")
+    print(f"\n汇总和详细过程已写入 {options['out']}")
+    return 0 if all(result[2] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
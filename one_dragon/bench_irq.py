@@ -0,0 +1,98 @@
+"""
+测量每个边沿的中断处理耗时：IRReceiver._pulse_handler（脉宽写入 'i' 数组）
+对比 EdgeRing.handler（只写时间戳）。
+
+在 micropython unix 版上运行: micropython bench_irq.py
+在电脑的 CPython 上运行（使用 emu/ 里的模拟模块）: python bench_irq.py
+"""
+import sys
+
+if sys.implementation.name != 'micropython':
+    sys.path.insert(0, __file__.rsplit('/', 1)[0] + '/emu' if '/' in __file__ else 'emu')
+
+import array
+import utime
+from ir_ring import EdgeRing
+
+EDGES = 229 + 1   # 一帧海尔信号的边沿数
+ROUNDS = 200
+
+
+class PulseHandlerBaseline:
+    """与 IRReceiver._pulse_handler 相同的处理逻辑（不依赖 machine.Pin）"""
+
+    def __init__(self):
+        self.pulse_buffer = array.array('i', [0] * 1000)
+        self.buffer_index = 0
+        self.recording = True
+        self.start_time = 0
+        self.decoder = None
+
+    def reset(self):
+        self.buffer_index = 0
+        self.start_time = utime.ticks_us()
+
+    def _pulse_handler(self, pin):
+        if not self.recording:
+            return
+
+        current_time = utime.ticks_us()
+        if self.buffer_index > 0:
+            duration = utime.ticks_diff(current_time, self.start_time)
+            if duration <= 0:
+                duration = 1
+            self.pulse_buffer[self.buffer_index - 1] = duration
+            if self.decoder is not None:
+                self.decoder.feed(duration)
+        self.buffer_index += 1
+        self.start_time = current_time
+
+
+def measure(handler, reset):
+    """返回 (每个边沿平均耗时µs, 最长一帧平均每边沿µs)"""
+    total = 0
+    worst = 0
+    for _ in range(ROUNDS):
+        reset()
+        start = utime.ticks_us()
+        for _ in range(EDGES):
+            handler(None)
+        elapsed = utime.ticks_diff(utime.ticks_us(), start)
+        total += elapsed
+        if elapsed > worst:
+            worst = elapsed
+    return total / (ROUNDS * EDGES), worst / EDGES
+
+
+def measure_loop_overhead():
+    """空函数调用的开销，用于扣除测量循环本身的时间"""
+    def noop(pin):
+        pass
+    return measure(noop, lambda: None)[0]
+
+
+def main():
+    print("实现: {} {}".format(sys.implementation.name, sys.version.split()[0]))
+    print("每轮 {} 个边沿，共 {} 轮".format(EDGES, ROUNDS))
+    overhead = measure_loop_overhead()
+
+    baseline = PulseHandlerBaseline()
+    ring = EdgeRing()
+    results = [
+        ("_pulse_handler", measure(baseline._pulse_handler, baseline.reset)),
+        ("EdgeRing.handler", measure(ring.handler, ring.reset)),
+    ]
+    for name, (mean, worst) in results:
+        print("{:<18} 平均 {:6.2f}µs/边沿（扣除调用开销 {:6.2f}µs），最慢一轮 {:6.2f}µs/边沿".format(
+            name, mean, mean - overhead, worst))
+
+    # 事后换算脉宽的开销，不在中断里
+    start = utime.ticks_us()
+    for _ in range(20):
+        ring.durations()
+    print("EdgeRing.durations() 换算一帧: {:.0f}µs（在中断之外）".format(
+        utime.ticks_diff(utime.ticks_us(), start) / 20))
+
+
+if __name__ == "__main__":
+    main()
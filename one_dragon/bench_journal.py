@@ -0,0 +1,87 @@
+"""
+比较保存学习结果的速度（条/秒）:
+  原来的写法   每条先试着以只读打开 result.txt 判断是否存在，再以追加方式打开写一行
+  Journal      缓冲后成块写入（每条带 CRC），最后 sync 一次；CommandStore.import_csv 批量导入走这种写法
+  Journal+sync 每条都立即 sync，只省掉判断文件是否存在的那次打开；
+               学习时 opt_specification.save_to_csv 每学到一条指令就 sync，走的是这种写法
+
+在 ESP32 上运行（结果才反映 flash 的情况）: mpremote run bench_journal.py
+在电脑的 CPython 上运行（使用 emu/ 里的模拟 utime）: python bench_journal.py
+"""
+import os
+import sys
+
+if sys.implementation.name != 'micropython':
+    sys.path.insert(0, __file__.rsplit('/', 1)[0] + '/emu' if '/' in __file__ else 'emu')
+
+import utime
+from command_store import CSV_HEADER
+from journal import Journal, unseal
+
+RECORDS = 200
+BENCH_FILE = 'bench_journal.txt'
+ROW = "2,1,2,2,1,{},1, ,A6A2000040600020000000000008,2025-06-18 12:47:40"
+
+
+def legacy_save(row):
+    """原来 save_to_csv 的文件操作"""
+    try:
+        with open(BENCH_FILE, 'r') as f:
+            pass
+    except:
+        with open(BENCH_FILE, 'w') as f:
+            f.write(CSV_HEADER + "\n")
+    with open(BENCH_FILE, 'a') as f:
+        f.write(row + "\n")
+
+
+def remove_bench_file():
+    try:
+        os.remove(BENCH_FILE)
+    except OSError:
+        pass
+
+
+def measure(name, save, finish=None):
+    remove_bench_file()
+    start = utime.ticks_us()
+    for i in range(RECORDS):
+        save(ROW.format(16 + i % 15))
+    if finish is not None:
+        finish()
+    elapsed_us = max(1, utime.ticks_diff(utime.ticks_us(), start))
+    rate = RECORDS * 1000000 / elapsed_us
+    print("{:<14} {:8.0f} 条/秒  ({:.1f}ms)".format(name, rate, elapsed_us / 1000))
+    return rate
+
+
+def check_file():
+    """读回文件：表头 + RECORDS 行，每行 CRC 都正确"""
+    with open(BENCH_FILE) as f:
+        lines = f.readlines()
+    return lines[0].strip() == CSV_HEADER and len(lines) == RECORDS + 1 and all(unseal(l)[1] for l in lines[1:])
+
+
+def main():
+    print("实现: {} {}，每次写 {} 条".format(sys.implementation.name, sys.version.split()[0], RECORDS))
+    legacy = measure("原来的写法", legacy_save)
+
+    journal = Journal(BENCH_FILE, CSV_HEADER)
+    buffered = measure("Journal", journal.append, journal.sync)
+    ok = check_file()
+    print("  块写入 {} 次，读回 {}".format(journal.flushes, "✓ CRC 全部正确" if ok else "❌ 内容不对"))
+
+    journal = Journal(BENCH_FILE, CSV_HEADER)
+
+    def append_and_sync(row):
+        journal.append(row)
+        journal.sync()
+    per_record = measure("Journal+sync", append_and_sync)
+    remove_bench_file()
+
+    print("学习时（每条 sync）约为原来的 {:.1f} 倍，批量导入约为 {:.1f} 倍".format(per_record / legacy, buffered / legacy))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
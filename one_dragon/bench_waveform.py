@@ -0,0 +1,71 @@
+"""
+测量 ir_waveform 的渲染耗时和缓存命中耗时，并检查渲染结果能被 StreamDecoder 解回原帧。
+
+在 micropython unix 版上运行: micropython bench_waveform.py
+在电脑的 CPython 上运行（使用 emu/ 里的模拟 utime）: python bench_waveform.py
+"""
+import sys
+
+if sys.implementation.name != 'micropython':
+    sys.path.insert(0, __file__.rsplit('/', 1)[0] + '/emu' if '/' in __file__ else 'emu')
+
+import utime
+from haier_codec import encode, to_hex
+from ir_stream import decode_durations
+from ir_waveform import render, new_waveform, WaveformCache, WAVEFORM_LEN
+
+ROUNDS = 500
+
+
+def sample_frames():
+    """几个不同的状态，模拟定时任务里轮流发送的指令"""
+    return [
+        encode('on', 'cool', 26, '1'),
+        encode('on', 'cool', 27, '2', 'swing', button='swing'),
+        encode('off', 'cool', 26, '1'),
+        encode('on', 'heat', 24, 'auto', aux_heat='on'),
+    ]
+
+
+def time_per_call(func, arg):
+    start = utime.ticks_us()
+    for _ in range(ROUNDS):
+        func(arg)
+    return utime.ticks_diff(utime.ticks_us(), start) / ROUNDS
+
+
+def main():
+    print("实现: {} {}".format(sys.implementation.name, sys.version.split()[0]))
+    frames = sample_frames()
+
+    for frame in frames:
+        waveform = render(frame)
+        decoded = decode_durations(waveform)
+        if len(waveform) != WAVEFORM_LEN or decoded != bytes(frame):
+            print("❌ 渲染结果无法解回原帧: {}".format(to_hex(frame)))
+            return 1
+    print("✓ {} 个帧渲染后都能解回原帧（每帧 {} 个时长）".format(len(frames), WAVEFORM_LEN))
+
+    frame = frames[0]
+    out = new_waveform()
+    cache = WaveformCache()
+    cache.get(frame)
+
+    render_new = time_per_call(render, frame)
+    render_into = time_per_call(lambda f: render(f, out), frame)
+    cached = time_per_call(cache.get, frame)
+    print("render() 新建数组:   {:8.1f}µs/帧".format(render_new))
+    print("render() 预分配数组: {:8.1f}µs/帧".format(render_into))
+    print("缓存命中:            {:8.1f}µs/帧（约为渲染的 1/{:.0f}）".format(cached, render_into / cached))
+
+    # 轮流发送比缓存容量少的几个状态，除第一轮外都应命中
+    cache = WaveformCache(size=len(frames))
+    for _ in range(ROUNDS // len(frames)):
+        for frame in frames:
+            cache.get(frame)
+    print("轮流发送 {} 个状态: 命中 {} 次，未命中 {} 次".format(len(frames), cache.hits, cache.misses))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+在电脑上检查 command_store（在临时目录里操作，不改动仓库里的文件）:
+1. 导入 cut-hex-room/more code.csv，按状态查找得到表中最后一条对应的 hex_code；
+2. 同一状态重复保存相同的指令不写入文件；同一 hex_code 换了状态时旧记录作废；
+3. 作废的行多了自动压缩，重新打开后索引不变；
+4. 导出的表与 result.txt 格式相同，能再导入。
+
+用法: python check_command_store.py
+"""
+import os
+import sys
+import tempfile
+
+if sys.implementation.name != 'micropython':
+    sys.path.insert(0, __file__.rsplit('/', 1)[0] + '/emu' if '/' in __file__ else 'emu')
+
+import command_store
+from command_store import CommandStore, CSV_HEADER
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MORE_CODE_CSV = os.path.join(HERE, 'cut-hex-room', 'more code.csv')
+
+
+def count_lines(path):
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    failures = 0
+
+    def check(ok, message):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✓' if ok else '❌'} {message}")
+
+    workdir = tempfile.mkdtemp(prefix='command_store_')
+    path = os.path.join(workdir, 'result.txt')
+
+    store = CommandStore(path)
+    added = store.import_csv(MORE_CODE_CSV)
+    store.sync()
+    check(len(store) + store.dead == added,
+          f"导入 more code.csv: 写入 {added} 条，索引 {len(store)} 条（{store.dead} 条被同一状态的新记录覆盖）")
+
+    hex_code = store.lookup_state('on', 'cool', 26, '2', type='switch')
+    check(hex_code == 'A6A20000404000200000000005ED', f"查找 开机 制冷 26°C 风速2: {hex_code}")
+    check(store.lookup_state('on', 'cool', 26, '2') is not None, "不指定操作类型也能找到")
+    check(store.lookup_state('on', 'cool', 30) is None, "没学过的状态返回 None")
+
+    params = {'type': 'switch', 'power': 'on', 'mode': 'cool', 'aux_heat': 'off', 'fan_speed': '2',
+              'temperature': '26', 'swing': 'fixed', 'specification': '重复学习'}
+    check(not store.put(params, hex_code) and store.journal.pending() == 0, "重复保存相同指令不写入文件")
+
+    moved = dict(params, temperature='25')
+    store.put(moved, hex_code)
+    check(store.get(params) is None and store.get(moved) == hex_code, "同一 hex_code 换了状态后旧记录作废")
+
+    before = count_lines(path)
+    for header_byte in (0xA6, 0xA7, 0xA8, 0xA9):
+        for temperature in range(16, 31):
+            store.put(dict(params, temperature=temperature), '{:02X}{:02X}'.format(header_byte, temperature))
+    store.sync()
+    reopened = CommandStore(path)
+    check(count_lines(path) < before + 60 and reopened.entries == store.entries,
+          f"自动压缩: 文件 {count_lines(path)} 行，重新打开后 {len(reopened)} 条与内存一致")
+
+    export_path = os.path.join(workdir, 'export.csv')
+    store.export_csv(export_path)
+    with open(export_path) as f:
+        header = f.readline().strip()
+    copy = CommandStore(os.path.join(workdir, 'copy.txt'))
+    copy.import_csv(export_path)
+    check(header == CSV_HEADER and copy.entries == store.entries, "导出后再导入得到相同的记录")
+
+    # 压缩时删掉旧文件后断电：下次打开从临时文件恢复
+    os.rename(path, path + '.tmp')
+    check(CommandStore(path).entries == store.entries, "压缩中断后能从临时文件恢复")
+
+    # 断电时写坏的记录：改掉一行中的一个字符，再在末尾留半行
+    with open(path) as f:
+        lines = f.readlines()
+    lines[3] = lines[3].replace('A6', 'A7', 1)
+    with open(path, 'w') as f:
+        f.write(''.join(lines) + lines[4][:20])
+    damaged = CommandStore(path)
+    check(damaged.corrupt == 2 and len(damaged) == len(store) - 1,
+          f"CRC 校验: 跳过 {damaged.corrupt} 行损坏的记录，其余 {len(damaged)} 条正常读取")
+    check(damaged.get(params) is None or damaged.get(params) == store.get(params), "损坏的行不会变成错误的指令")
+
+    print(f"{'✓ 全部通过' if not failures else f'❌ {failures} 项失败'}（临时目录 {workdir}，压缩阈值 {command_store.COMPACT_MIN_DEAD} 行）")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
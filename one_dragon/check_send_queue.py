@@ -0,0 +1,77 @@
+"""
+在电脑上检查 send_queue：用 RecordingBackend 代替 RMT，手动给出每次操作的时刻(ms)。
+1. 300 ms 内连按 升温、升温、风速，只发最后一帧；
+2. 再提交与上次发出的相同的状态，不发送；
+3. 两次变化相隔超过合并窗口但不到最短间隔时，第二帧要等到最短间隔之后才发；
+4. 发出的波形能解回最后提交的帧。
+
+用法: python check_send_queue.py
+"""
+import sys
+
+if sys.implementation.name != 'micropython':
+    sys.path.insert(0, __file__.rsplit('/', 1)[0] + '/emu' if '/' in __file__ else 'emu')
+
+from haier_codec import encode, to_hex
+from ir_stream import decode_durations
+from ir_transmit import IRTransmitter, RecordingBackend
+from send_queue import SendQueue, COALESCE_WINDOW_MS, MIN_SEND_GAP_MS
+
+
+def run_until(queue, start_ms, end_ms, step_ms=10):
+    """从 start_ms 到 end_ms 每隔 step_ms 调用一次 poll，返回发送的时刻列表"""
+    sent_at = []
+    for now in range(start_ms, end_ms + 1, step_ms):
+        if queue.poll(now):
+            sent_at.append(now)
+    return sent_at
+
+
+def main():
+    failures = 0
+    backend = RecordingBackend()
+    queue = SendQueue(IRTransmitter(backend=backend))
+
+    # 1. 连按三次，只发最后一帧
+    presses = [
+        (0, encode('on', 'cool', 25, '1', button='temp_up')),
+        (120, encode('on', 'cool', 26, '1', button='temp_up')),
+        (250, encode('on', 'cool', 26, '2', button='fan')),
+    ]
+    for now, frame in presses:
+        queue.submit_frame(frame, now)
+    sent_at = run_until(queue, 250, 1000)
+    last = presses[-1][1]
+    emitted = [int(d + 0.5) for d in backend.emitted_durations()]
+    ok = sent_at == [250 + COALESCE_WINDOW_MS] and decode_durations(emitted) == bytes(last)
+    failures += not ok
+    print(f"{'✓' if ok else '❌'} 连按 3 次: 在 {sent_at} ms 发出 {queue.sent} 帧 {to_hex(last)}")
+
+    # 2. 与上次发出的状态相同（按键码不同）时不发送
+    queue.submit_frame(encode('on', 'cool', 26, '2', button='power'), 2000)
+    sent_at = run_until(queue, 2000, 3000)
+    ok = not sent_at and queue.dropped == 1
+    failures += not ok
+    print(f"{'✓' if ok else '❌'} 重复状态: 丢弃 {queue.dropped} 帧")
+
+    # 3. 相隔超过合并窗口但不到最短间隔
+    queue.submit_frame(encode('on', 'cool', 27, '2', button='temp_up'), 4000)
+    first = run_until(queue, 4000, 4000 + COALESCE_WINDOW_MS)
+    queue.submit_frame(encode('on', 'cool', 28, '2', button='temp_up'), first[0] + 10 if first else 4000)
+    second = run_until(queue, (first[0] if first else 4000) + 10, 6000)
+    gap = second[0] - first[0] if first and second else None
+    ok = gap is not None and gap >= MIN_SEND_GAP_MS
+    failures += not ok
+    print(f"{'✓' if ok else '❌'} 最短间隔: 两帧在 {first + second} ms 发出，间隔 {gap} ms（至少 {MIN_SEND_GAP_MS} ms）")
+
+    stats = queue.stats()
+    print(f"计数: 提交 {stats['submitted']}，发送 {stats['sent']}，合并 {stats['coalesced']}，丢弃 {stats['dropped']}")
+    ok = stats == {'submitted': 6, 'sent': 3, 'coalesced': 2, 'dropped': 1}
+    failures += not ok
+
+    print(f"{'✓ 全部通过' if not failures else f'❌ {failures} 项失败'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+在电脑上用 RecordingBackend 检查发射引擎：
+1. 按 RMT 的几种时钟分频发送几个帧，测量输出波形与请求波形的时间误差；
+2. 把输出的时长交给 StreamDecoder，应解回原帧；重复发送时 ir_frames 应切出同样多的帧。
+
+用法: python check_transmit.py
+"""
+import sys
+
+from haier_codec import encode, to_hex
+from ir_frames import split_frames
+from ir_stream import decode_durations
+from ir_transmit import IRTransmitter, RecordingBackend, timing_error, tick_us, RMT_CLOCK_DIV
+
+CLOCK_DIVS = (RMT_CLOCK_DIV, 100, 255)
+MAX_ERROR_US = 5  # 单个时长允许的最大误差，远小于 0/1 间隔相差的 1100 µs
+
+
+def main():
+    frames = [
+        encode('on', 'cool', 26, '1'),
+        encode('off', 'cool', 27, '1'),
+        encode('on', 'heat', 24, 'auto', aux_heat='on'),
+    ]
+    failures = 0
+    for clock_div in CLOCK_DIVS:
+        backend = RecordingBackend(clock_div)
+        transmitter = IRTransmitter(backend=backend)
+        worst = (0, 0, 0)
+        for frame in frames:
+            backend.clear()
+            transmitter.send_frame(frame)
+            requested = transmitter.cache.get(frame)
+            emitted = backend.emitted_durations()
+            error = timing_error(requested, emitted)
+            if error[0] > worst[0]:
+                worst = error
+            if decode_durations([int(d + 0.5) for d in emitted]) != bytes(frame):
+                failures += 1
+                print(f"  ❌ clock_div={clock_div} {to_hex(frame)} 无法解回原帧")
+            if error[0] > MAX_ERROR_US:
+                failures += 1
+        print(f"clock_div={clock_div:<3}（{tick_us(clock_div):.4f}µs/tick）: 最大误差 {worst[0]:.2f}µs，"
+              f"平均 {worst[1]:.2f}µs，整帧累计漂移 {worst[2]:+.2f}µs")
+
+    backend = RecordingBackend()
+    transmitter = IRTransmitter(backend=backend)
+    transmitter.send_frame(frames[0], repeat=3)
+    emitted = [int(d + 0.5) for d in backend.emitted_durations()]
+    decoded = [decode_durations(f) for f in split_frames(emitted)]
+    ok = decoded == [bytes(frames[0])] * 3 and backend.writes == 3
+    if not ok:
+        failures += 1
+    print(f"重复发送 3 次: 切出 {len(decoded)} 帧 {'✓' if ok else '✗'}")
+
+    print(f"\n{'✓ 全部通过' if not failures else f'❌ {failures} 项失败'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
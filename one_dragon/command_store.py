@@ -0,0 +1,234 @@
+"""
+学到的指令按状态建索引保存，代替只追加、查找时要整文件扫描的 result.txt。
+
+文件仍是 result.txt 原来的 CSV 格式（表头 + 每条一行），后写的行覆盖同一状态的旧行；
+打开时读一遍建立内存索引，之后按状态查找是一次 dict 查询。
+  键      save_to_csv 使用的数字选项元组 (type, power, mode, aux_heat, fan_speed, temperature, swing)
+  去重    同一状态再学到相同的 hex_code 时不再写入；同一个 hex_code 出现在另一个状态下时，
+          以新的为准，旧状态的记录作废（同一帧不可能代表两个状态，旧的标错了）
+  压缩    作废的行多于有效的行时，把有效的记录重写到新文件再替换，也可以手动调用 compact()
+  写入    经 journal.Journal 追加，每行末尾多一列 CRC；读取时跳过 CRC 不对或没写完的行，
+          没有 CRC 列的旧记录照常读取。put 只放进缓冲，需要落盘时调用 sync()；
+          save_to_csv 每条都 sync，import_csv 成块写入后 sync 一次
+import_csv / export_csv 与其他同格式的表（如 more code.csv）互相导入导出，导出的表不带 CRC 列。
+"""
+import os
+import time
+
+from journal import Journal, seal, unseal
+
+STORE_FILE = 'result.txt'
+CSV_HEADER = "type(switch=1/modify=2),power(on=1/off=2),mode,aux_heat,fan_speed,temperature,swing,specification,hex_code,timestamp"
+COMPACT_MIN_DEAD = 16  # 作废的行少于这么多时不压缩
+
+TYPE_CODES = {'switch': '1', 'modify': '2'}
+POWER_CODES = {'on': '1', 'off': '2'}
+MODE_CODES = {'auto': '1', 'cool': '2', 'dry': '3', 'fan': '4', 'heat': '5'}
+AUX_HEAT_CODES = {'on': '1', 'off': '2'}
+FAN_SPEED_CODES = {'1': '1', '2': '2', '3': '3', 'auto': '4'}
+SWING_CODES = {'fixed': '1', 'swing': '2'}
+
+KEY_FIELDS = 7  # CSV 前 7 列组成键
+
+
+def _temperature_code(temperature):
+    temperature = str(temperature).strip()
+    try:
+        return str(int(temperature))
+    except ValueError:
+        return temperature
+
+
+def param_key(params):
+    """get_ac_parameters 格式的参数 -> 数字选项元组，未知取值记为 '0'"""
+    return (
+        TYPE_CODES.get(params.get('type'), '0'),
+        POWER_CODES.get(params['power'], '0'),
+        MODE_CODES.get(params['mode'], '0'),
+        AUX_HEAT_CODES.get(params['aux_heat'], '0'),
+        FAN_SPEED_CODES.get(params['fan_speed'], '0'),
+        _temperature_code(params['temperature']),
+        SWING_CODES.get(params['swing'], '0'),
+    )
+
+
+def clean_specification(text):
+    """处理备注中的特殊字符（避免CSV格式问题）"""
+    return text.replace(',', '，').replace('\n', ' ').replace('\r', ' ')
+
+
+def format_timestamp(timestamp=None):
+    if timestamp is None:
+        timestamp = time.localtime()
+    return "{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}".format(
+        timestamp[0], timestamp[1], timestamp[2], timestamp[3], timestamp[4], timestamp[5])
+
+
+def format_row(key, entry):
+    hex_code, specification, timestamp = entry
+    return ','.join(key) + f",{specification},{hex_code},{timestamp}"
+
+
+def parse_row(line):
+    """CSV 行 -> (键, (hex_code, 备注, 时间))；不是有效记录时返回 None"""
+    parts = line.rstrip('\r\n').split(',')
+    if len(parts) < KEY_FIELDS + 3 or parts[0].startswith('type'):
+        return None
+    hex_code = parts[-2].strip().upper()
+    if not hex_code:
+        return None
+    key = [p.strip() for p in parts[:KEY_FIELDS]]
+    key[5] = _temperature_code(key[5])
+    # 备注里的逗号已被替换；别处导出的表里仍可能有，这里取键和 hex_code 之间的全部内容
+    specification = ','.join(parts[KEY_FIELDS:-2])
+    return tuple(key), (hex_code, specification, parts[-1].strip())
+
+
+class CommandStore:
+    """按状态索引的指令表；put 只在文件末尾追加，压缩时才重写"""
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.entries = {}   # 键 -> (hex_code, 备注, 时间)
+        self.by_hex = {}    # hex_code -> 键
+        self.dead = 0       # 文件里已被覆盖、作废的行数
+        self.corrupt = 0    # 读取时跳过的损坏行数
+        self.journal = Journal(path, CSV_HEADER)
+        self.load()
+
+    def load(self):
+        self.entries = {}
+        self.by_hex = {}
+        self.dead = 0
+        self.corrupt = 0
+        self.journal.reset()
+        try:
+            f = open(self.path, 'r')
+        except OSError:
+            try:
+                # 压缩时删掉旧文件后、改名前断电，数据还在临时文件里
+                os.rename(self.path + '.tmp', self.path)
+                f = open(self.path, 'r')
+            except OSError:
+                return
+        with f:
+            for line in f:
+                row = self._read_line(line)
+                if row is not None:
+                    self._index(row[0], row[1])
+
+    def _read_line(self, line):
+        """检查换行和 CRC 后解析一行；写了一半或 CRC 不对的行计入 corrupt 并返回 None"""
+        if not line.endswith('\n'):
+            # 最后一行没有换行：断电时没写完
+            if line.strip():
+                self.corrupt += 1
+            return None
+        text, ok = unseal(line)
+        if not ok:
+            self.corrupt += 1
+            return None
+        return parse_row(text)
+
+    def _index(self, key, entry):
+        """更新内存索引，返回因此作废的记录数"""
+        removed = 0
+        old = self.entries.get(key)
+        if old is not None:
+            self.by_hex.pop(old[0], None)
+            removed += 1
+        owner = self.by_hex.get(entry[0])
+        if owner is not None and owner != key:
+            del self.entries[owner]
+            removed += 1
+        self.entries[key] = entry
+        self.by_hex[entry[0]] = key
+        self.dead += removed
+        return removed
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, params):
+        return param_key(params) in self.entries
+
+    def get(self, params):
+        """按参数查找 hex_code，没有时返回 None"""
+        entry = self.entries.get(param_key(params))
+        return entry[0] if entry is not None else None
+
+    def lookup_state(self, power, mode, temperature, fan_speed='1', swing='fixed', aux_heat='off', type=None):
+        """按状态查找 hex_code；type 为 None 时先找模式调节再找开关切换学到的"""
+        params = {'power': power, 'mode': mode, 'temperature': temperature,
+                  'fan_speed': fan_speed, 'swing': swing, 'aux_heat': aux_heat}
+        for kind in ((type,) if type is not None else ('modify', 'switch')):
+            params['type'] = kind
+            hex_code = self.get(params)
+            if hex_code is not None:
+                return hex_code
+        return None
+
+    def find_hex(self, hex_code):
+        """hex_code 对应的键（数字选项元组），没有时返回 None"""
+        return self.by_hex.get(hex_code.strip().upper())
+
+    def put(self, params, hex_code, specification=' ', timestamp=None):
+        """保存一条记录；同一状态已有相同的 hex_code 时不写入并返回 False"""
+        return self.put_key(param_key(params), hex_code, clean_specification(specification), timestamp)
+
+    def put_key(self, key, hex_code, specification=' ', timestamp=None):
+        hex_code = hex_code.strip().upper()
+        old = self.entries.get(key)
+        if old is not None and old[0] == hex_code:
+            return False
+        entry = (hex_code, specification, timestamp or format_timestamp())
+        self._index(key, entry)
+        self.journal.append(format_row(key, entry))
+        self.maybe_compact()
+        return True
+
+    def sync(self):
+        """把缓冲的记录写入文件"""
+        self.journal.sync()
+
+    def maybe_compact(self):
+        if self.dead >= COMPACT_MIN_DEAD and self.dead > len(self.entries):
+            self.compact()
+            return True
+        return False
+
+    def compact(self):
+        """只保留有效的记录；先写临时文件再替换，中途断电时下次 load() 会从临时文件恢复"""
+        temp_path = self.path + '.tmp'
+        self._write(temp_path, sealed=True)
+        self.journal.reset()  # 缓冲里的记录已包含在新文件中
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        os.rename(temp_path, self.path)
+        self.dead = 0
+
+    def import_csv(self, path):
+        """导入同格式的表，返回新写入的条数"""
+        added = 0
+        with open(path, 'r') as f:
+            for line in f:
+                text, ok = unseal(line)
+                row = parse_row(text) if ok else None
+                if row is not None and self.put_key(row[0], row[1][0], row[1][1], row[1][2]):
+                    added += 1
+        self.sync()
+        return added
+
+    def export_csv(self, path):
+        """按 result.txt 原来的格式导出全部有效记录"""
+        return self._write(path, sealed=False)
+
+    def _write(self, path, sealed):
+        with open(path, 'w') as f:
+            f.write(CSV_HEADER + "\n")
+            for key in self.entries:
+                row = format_row(key, self.entries[key])
+                f.write((seal(row) if sealed else row) + "\n")
+        return len(self.entries)
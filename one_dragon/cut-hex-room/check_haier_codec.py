@@ -0,0 +1,137 @@
+"""
+用 more code.csv 里学到的每一条指令检查 one_dragon/haier_codec.py:
+1. decode(帧) 得到的状态与表中记录的参数一致；
+2. encode(解出的状态和按键) 逐字节还原出原帧；
+3. 查找表 haier_table.bin 取出的帧与原帧相同，且表内容与 build_table() 一致；
+4. Byte1 温度位为 F（31°C，遥控器发不出的温度）且校验正确的帧，decode 和 is_known_frame 都要拒绝。
+
+吹风模式没有温度选项（帧里是上一次的设定温度），关机时帧里没有辅热位，这两项不比较。
+
+用法: python check_haier_codec.py [--write-table]   加 --write-table 时先重新生成 haier_table.bin
+"""
+import csv
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ONE_DRAGON_DIR = os.path.dirname(HERE)
+sys.path.insert(0, ONE_DRAGON_DIR)
+
+import haier_codec
+
+CSV_FILE = os.path.join(HERE, 'more code.csv')
+TABLE_PATH = os.path.join(ONE_DRAGON_DIR, haier_codec.TABLE_FILE)
+
+# 与 command_store 中的数字选项映射相反
+POWER_NAMES = {'1': 'on', '2': 'off'}
+MODE_NAMES = {'1': 'auto', '2': 'cool', '3': 'dry', '4': 'fan', '5': 'heat'}
+AUX_HEAT_NAMES = {'1': 'on', '2': 'off'}
+FAN_SPEED_NAMES = {'1': '1', '2': '2', '3': '3', '4': 'auto'}
+SWING_NAMES = {'1': 'fixed', '2': 'swing'}
+
+
+def row_params(row):
+    return {
+        'type': 'switch' if row[0] == '1' else 'modify',
+        'power': POWER_NAMES[row[1]],
+        'mode': MODE_NAMES[row[2]],
+        'aux_heat': AUX_HEAT_NAMES[row[3]],
+        'fan_speed': FAN_SPEED_NAMES[row[4]],
+        'temperature': row[5],
+        'swing': SWING_NAMES[row[6]],
+    }
+
+
+def compare_state(params, state):
+    """返回不一致的字段列表"""
+    diffs = []
+    for key in ('power', 'mode', 'fan_speed', 'swing', 'aux_heat', 'temperature'):
+        expected = params[key]
+        if key == 'temperature':
+            if params['mode'] == 'fan':
+                continue
+            expected = int(expected)
+        if key == 'aux_heat' and params['power'] == 'off':
+            continue
+        if state[key] != expected:
+            diffs.append(f"{key}: 表中 {expected}，解码 {state[key]}")
+    # 开关切换的指令一定是按了开关键
+    if params['type'] == 'switch' and state['button'] != 'power':
+        diffs.append(f"button: 开关切换应为 power，解码 {state['button']}")
+    return diffs
+
+
+def main():
+    if '--write-table' in sys.argv[1:]:
+        size = haier_codec.write_table(TABLE_PATH)
+        print(f"已生成 {TABLE_PATH}（{size} 字节，{haier_codec.TABLE_STATES} 个状态）")
+
+    failures = 0
+    with open(TABLE_PATH, 'rb') as f:
+        if f.read() != haier_codec.build_table():
+            print(f"❌ {TABLE_PATH} 与 build_table() 不一致，请加 --write-table 重新生成")
+            failures += 1
+    table = haier_codec.HaierTable(TABLE_PATH)
+    file_table = haier_codec.HaierTable(TABLE_PATH, in_memory=False)
+
+    with open(CSV_FILE, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        hex_index = header.index('hex_code')
+        rows = [row for row in reader if row]
+
+    for line, row in enumerate(rows, 2):
+        hex_code = row[hex_index].strip()
+        params = row_params(row)
+        problems = []
+        try:
+            state = haier_codec.decode(hex_code)
+        except ValueError as e:
+            print(f"第{line}行 {hex_code}: ✗ 解码失败: {e}")
+            failures += 1
+            continue
+        problems.extend(compare_state(params, state))
+
+        args = (state['power'], state['mode'], state['temperature'], state['fan_speed'],
+                state['swing'], state['aux_heat'], state['button'])
+        if haier_codec.to_hex(haier_codec.encode(*args)) != hex_code:
+            problems.append(f"encode 得到 {haier_codec.to_hex(haier_codec.encode(*args))}")
+        if haier_codec.to_hex(table.lookup(*args)) != hex_code:
+            problems.append(f"查找表得到 {haier_codec.to_hex(table.lookup(*args))}")
+        if haier_codec.to_hex(file_table.lookup(*args)) != hex_code:
+            problems.append(f"查找表(文件)得到 {haier_codec.to_hex(file_table.lookup(*args))}")
+
+        summary = (f"{state['power']:<3} {state['mode']:<4} {state['temperature']}°C 风速{state['fan_speed']:<4} "
+                   f"{state['swing']:<5} 辅热{state['aux_heat']:<3} 按键 {state['button']}")
+        if problems:
+            failures += 1
+            print(f"第{line}行 {hex_code}: ✗ {summary}")
+            for problem in problems:
+                print(f"    {problem}")
+        else:
+            print(f"第{line}行 {hex_code}: ✓ {summary}")
+
+    file_table.close()
+
+    frame = haier_codec.encode('on', 'cool', haier_codec.TEMP_MAX)
+    frame[1] |= 0xF0
+    frame[13] = haier_codec.checksum(frame)
+    try:
+        haier_codec.decode(frame)
+        rejected = False
+    except ValueError:
+        rejected = True
+    known = haier_codec.is_known_frame(frame)
+    if rejected and not known:
+        print(f"温度越界 {haier_codec.to_hex(frame)}: ✓ decode 和 is_known_frame 都拒绝")
+    else:
+        failures += 1
+        print(f"温度越界 {haier_codec.to_hex(frame)}: ✗ decode {'拒绝' if rejected else '接受'}，"
+              f"is_known_frame 返回 {known}")
+
+    print(f"\n共 {len(rows) + 1} 条，{'全部通过' if not failures else f'{failures} 条失败'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,132 @@
-import pandas as pd
+"""
+把 CSV 里的 hex_code 拆成逐字节的列，逐行读写，内存占用与文件大小无关。
+
+输出格式:
+  csv   output_<原文件名>.csv：原有各列后接 Byte0..Byte13，字节为 0-255 的整数（不是 "A6" 这样的字符串），
+        无法解析的 hex_code 对应的字节列留空
+  npy   output_<原文件名>.npy：(N, 14) 的 uint8 数组，可直接 numpy.load；
+        边读边写，写完再回填行数，不需要 numpy；长度不对或无法解析的 hex_code 跳过并计数
+
+用法: python cut-hex.py [CSV文件 ...] [--format csv|npy] [--width 14] [--out-dir 目录]
+不指定文件时处理当前文件夹中所有的 CSV 文件（跳过本脚本生成的 output_*.csv）。
+"""
+import argparse
+import csv
 import os
+import struct
+import sys
+
+FRAME_BYTES = 14
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_LEN = 118  # 魔数(8) + 长度(2) + 118 = 128，行数最多 20 位也放得下
+
+
+def parse_hex(hex_str):
+    """hex_code -> bytes；去掉空格，长度为奇数或含非十六进制字符时返回 None"""
+    hex_str = str(hex_str).replace(' ', '').strip()
+    if len(hex_str) % 2:
+        return None
+    try:
+        return bytes.fromhex(hex_str)
+    except ValueError:
+        return None
+
+
+def iter_rows(input_file):
+    """逐行读取 CSV，先产出含 hex_code 的表头，再产出其后的每一行；表头之前的行（如 guess.csv 的注释）丢弃"""
+    with open(input_file, newline='', encoding='utf-8') as f:
+        found_header = False
+        for row in csv.reader(f):
+            if not row:
+                continue
+            if not found_header:
+                if 'hex_code' not in row:
+                    continue
+                found_header = True
+            yield row
+
+
+def npy_header(rows, width):
+    """uint8 (rows, width) 数组的 .npy 1.0 文件头，长度固定，便于写完后回填行数"""
+    text = "{{'descr': '|u1', 'fortran_order': False, 'shape': ({}, {}), }}".format(rows, width)
+    text = text.ljust(NPY_HEADER_LEN - 1) + '\n'
+    return NPY_MAGIC + struct.pack('<H', NPY_HEADER_LEN) + text.encode('latin1')
+
+
+def split_to_csv(input_file, output_file, width):
+    rows = iter_rows(input_file)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError(f"{input_file} 中没有 hex_code 列")
+    hex_index = header.index('hex_code')
+    written = bad = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header + [f'Byte{i}' for i in range(width)])
+        for row in rows:
+            frame = parse_hex(row[hex_index]) if hex_index < len(row) else None
+            if frame is None:
+                bad += 1
+                values = [''] * width
+            else:
+                values = (list(frame) + [''] * width)[:width]
+            writer.writerow(row + values)
+            written += 1
+    return written, bad
 
-# 获取当前文件夹中的所有 CSV 文件
-csv_files = [f for f in os.listdir('.') if f.endswith('.csv')]
 
-if not csv_files:
-    print("当前文件夹中没有找到 CSV 文件！")
-else:
-    # 假设只处理第一个找到的 CSV 文件，如果有多个可以调整逻辑
-    input_file = csv_files[0]
-    print(f"找到 CSV 文件：{input_file}，开始处理...")
+def split_to_npy(input_file, output_file, width):
+    rows = iter_rows(input_file)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError(f"{input_file} 中没有 hex_code 列")
+    hex_index = header.index('hex_code')
+    written = bad = 0
+    with open(output_file, 'wb') as f:
+        f.write(npy_header(0, width))
+        for row in rows:
+            frame = parse_hex(row[hex_index]) if hex_index < len(row) else None
+            if frame is None or len(frame) != width:
+                bad += 1
+                continue
+            f.write(frame)
+            written += 1
+        f.seek(0)
+        f.write(npy_header(written, width))
+    return written, bad
 
-    # 读取 CSV 文件
-    df = pd.read_csv(input_file)
 
-    # 创建一个函数来拆分 hex_code 为单独的字节
-    def split_hex_code(hex_str):
-        # 去掉可能的空格并确保是字符串
-        hex_str = str(hex_str).strip()
-        # 每两个字符分割为一个字节
-        return [hex_str[i:i+2] for i in range(0, len(hex_str), 2)]
+def default_inputs():
+    return sorted(f for f in os.listdir('.') if f.endswith('.csv') and not f.startswith('output_'))
 
-    # 获取 hex_code 列的所有字节数（取最长的 hex_code 长度）
-    max_bytes = max(df['hex_code'].apply(lambda x: len(str(x).strip()) // 2))
 
-    # 创建新的列名，如 Byte0, Byte1, Byte2...
-    byte_columns = [f'Byte{i}' for i in range(max_bytes)]
+def main():
+    parser = argparse.ArgumentParser(description="把 CSV 里的 hex_code 拆成逐字节的列")
+    parser.add_argument('files', nargs='*', help="输入的 CSV 文件，默认为当前文件夹中所有的 CSV")
+    parser.add_argument('--format', choices=('csv', 'npy'), default='csv', help="输出格式（默认 csv）")
+    parser.add_argument('--width', type=int, default=FRAME_BYTES, help=f"每帧字节数（默认 {FRAME_BYTES}）")
+    parser.add_argument('--out-dir', default=None, help="输出目录，默认与输入文件相同")
+    args = parser.parse_args()
 
-    # 将 hex_code 拆分成多个列
-    split_hex = df['hex_code'].apply(split_hex_code)
-    hex_df = pd.DataFrame(split_hex.tolist(), columns=byte_columns, index=df.index)
+    input_files = args.files or default_inputs()
+    if not input_files:
+        print("当前文件夹中没有找到 CSV 文件！")
+        return 1
 
-    # 将拆分后的字节列与原数据合并
-    result_df = pd.concat([df, hex_df], axis=1)
+    split = split_to_npy if args.format == 'npy' else split_to_csv
+    for input_file in input_files:
+        directory, name = os.path.split(input_file)
+        output_file = os.path.join(args.out_dir or directory, 'output_' + os.path.splitext(name)[0] + '.' + args.format)
+        print(f"找到 CSV 文件：{input_file}，开始处理...")
+        try:
+            written, bad = split(input_file, output_file, args.width)
+        except ValueError as e:
+            print(f"  ⚠️ {e}，跳过")
+            continue
+        note = f"，{bad} 行的 hex_code 无法解析" + ("（已跳过）" if args.format == 'npy' else "（字节列留空）") if bad else ""
+        print(f"  {written} 行{note}，结果已保存到 {output_file}")
+    return 0
 
-    # 保存到新的 CSV 文件
-    output_file = 'output_' + input_file
-    result_df.to_csv(output_file, index=False)
 
-    print(f"处理完成，结果已保存到 {output_file}")
+if __name__ == "__main__":
+    sys.exit(main())
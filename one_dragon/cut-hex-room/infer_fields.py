@@ -0,0 +1,251 @@
+"""
+从带标签的学习记录自动推断帧里每一位的含义，代替对着表格手工比对。
+
+读入 more code.csv / guess.csv 这类表（前 7 列为 type, power, mode, aux_heat, fan_speed, temperature, swing，
+另有 hex_code 列），把所有帧展开成 N×位数 的 0/1 矩阵，对每个标签一次性算出
+它与每一位的互信息（numpy 矩阵运算，不逐行循环）：
+  位置信度 = I(位; 标签) / H(位)，即这一位的变化有多少能由该标签解释，1 表示完全由标签决定。
+每一位归给置信度最高的标签（并列时取取值种类少的标签），相邻且属于同一标签的位合并成字段，
+再给出字段取值与标签取值的对应表，以及字段对标签的解释程度 I(字段; 标签) / H(标签)。
+最后一字节若恰好等于前面各字节之和（或异或），直接标为校验。
+
+数据少时多个标签可能同样好地解释同一位（比如表里制热时总开着辅热），这类位会列出“也可能是”，
+需要补录能把它们区分开的指令。
+
+用法: python infer_fields.py [CSV文件 ...] [--min-confidence 0.8]   默认读取 more code.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(HERE, 'more code.csv')
+
+LABELS = ('type', 'power', 'mode', 'aux_heat', 'fan_speed', 'temperature', 'swing')
+MISSING_VALUES = ('', 'null', 'none')
+MIN_CONFIDENCE = 0.8
+TIE_TOLERANCE = 0.02  # 置信度相差不到这么多的标签一并列出
+
+
+def read_labeled_rows(path):
+    """读取一个表，返回 [(标签值元组, hex_code), ...]；表头可以不在第一行（guess.csv 前两行是注释）"""
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        hex_index = None
+        for row in reader:
+            if hex_index is None:
+                if 'hex_code' in row:
+                    hex_index = row.index('hex_code')
+                continue
+            if len(row) <= hex_index or not row[hex_index].strip():
+                continue
+            labels = tuple(value.strip().lower() for value in row[:len(LABELS)])
+            rows.append((labels, row[hex_index].strip().upper()))
+    if hex_index is None:
+        raise ValueError(f"{path} 中没有 hex_code 列")
+    return rows
+
+
+def load_dataset(paths):
+    """合并多个表并去掉重复的记录，返回 (标签值矩阵[N×7 的 str 数组], 字节矩阵[N×字节数 uint8])"""
+    seen = set()
+    labels = []
+    frames = []
+    for path in paths:
+        for row_labels, hex_code in read_labeled_rows(path):
+            if (row_labels, hex_code) in seen:
+                continue
+            seen.add((row_labels, hex_code))
+            labels.append(row_labels)
+            frames.append(hex_code)
+    if not frames:
+        raise ValueError("没有可用的记录")
+    length = max(len(h) for h in frames)
+    keep = [i for i, h in enumerate(frames) if len(h) == length]
+    if len(keep) < len(frames):
+        print(f"跳过 {len(frames) - len(keep)} 条长度不是 {length // 2} 字节的记录")
+    byte_matrix = np.array([list(bytes.fromhex(frames[i])) for i in keep], dtype=np.uint8)
+    return np.array([labels[i] for i in keep], dtype=object), byte_matrix
+
+
+def entropy(p):
+    """按最后一维求熵（bit），p 中的 0 不计"""
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(p > 0, -p * np.log2(p), 0.0)
+    return terms.sum(axis=-1)
+
+
+def mutual_information(bits, codes, classes):
+    """
+    bits 为 N×B 的 0/1 矩阵，codes 为 N 个标签编号(0..classes-1)。
+    返回每一位与标签的互信息 I(位; 标签)，形状 (B,)。
+    """
+    n = len(codes)
+    onehot = np.eye(classes)[codes]                 # N×K
+    ones = onehot.T @ bits                          # K×B：标签为 k 且该位为 1 的次数
+    zeros = onehot.sum(axis=0)[:, None] - ones      # K×B：标签为 k 且该位为 0 的次数
+    joint = np.stack([zeros, ones]) / n             # 2×K×B
+    p_label = onehot.mean(axis=0)[None, :, None]    # 1×K×1
+    p_bit = np.stack([1 - bits.mean(axis=0), bits.mean(axis=0)])[:, None, :]  # 2×1×B
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(joint > 0, joint * np.log2(joint / (p_label * p_bit)), 0.0)
+    return terms.sum(axis=(0, 1))
+
+
+def encode_label(values):
+    """去掉缺失值后把标签值编号，返回 (有效行的布尔掩码, 编号, 取值列表)"""
+    mask = np.array([v not in MISSING_VALUES for v in values])
+    names, codes = np.unique(values[mask].astype(str), return_inverse=True)
+    return mask, codes, list(names)
+
+
+def detect_checksum(byte_matrix):
+    """最后一字节是否为前面各字节之和或异或，返回说明文字或 None"""
+    body = byte_matrix[:, :-1].astype(np.uint32)
+    last = byte_matrix[:, -1]
+    if np.all((body.sum(axis=1) & 0xFF) == last):
+        return f"校验: Byte0..Byte{body.shape[1] - 1} 之和 & 0xFF"
+    if np.all(np.bitwise_xor.reduce(byte_matrix[:, :-1], axis=1) == last):
+        return f"校验: Byte0..Byte{body.shape[1] - 1} 异或"
+    return None
+
+
+def bit_confidences(label_matrix, bits):
+    """返回 {标签: (位置信度[B], 标签熵, 有效行掩码, 编号, 取值列表)}"""
+    result = {}
+    for column, name in enumerate(LABELS):
+        mask, codes, names = encode_label(label_matrix[:, column])
+        if len(names) < 2:
+            continue
+        sub = bits[mask]
+        bit_entropy = entropy(np.stack([1 - sub.mean(axis=0), sub.mean(axis=0)], axis=-1))
+        mi = mutual_information(sub, codes, len(names))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(bit_entropy > 0, mi / bit_entropy, 0.0)
+        label_entropy = entropy(np.bincount(codes) / len(codes))
+        result[name] = (confidence, label_entropy, mask, codes, names)
+    return result
+
+
+def assign_bits(scores, bit_count, skip, min_confidence):
+    """每一位归给置信度最高的标签，返回 [(标签或 None, 置信度, 也可能的标签列表)]"""
+    assignment = []
+    for bit in range(bit_count):
+        if bit in skip:
+            assignment.append((None, 0.0, []))
+            continue
+        ranked = sorted(scores, key=lambda name: (-round(float(scores[name][0][bit]), 3), scores[name][1]))
+        best = ranked[0] if ranked else None
+        confidence = float(scores[best][0][bit]) if best else 0.0
+        if best is None or confidence < min_confidence:
+            assignment.append((None, confidence, []))
+            continue
+        ties = [name for name in ranked[1:] if confidence - float(scores[name][0][bit]) <= TIE_TOLERANCE]
+        assignment.append((best, confidence, ties))
+    return assignment
+
+
+def group_fields(assignment, bits_per_byte=8):
+    """把同一字节里相邻且标签相同的位合并成字段，返回 [(标签, 起始位, 结束位)]"""
+    fields = []
+    for bit, (label, _, _) in enumerate(assignment):
+        if label is None:
+            continue
+        if fields and fields[-1][0] == label and fields[-1][2] == bit - 1 and bit % bits_per_byte != 0:
+            fields[-1] = (label, fields[-1][1], bit)
+        else:
+            fields.append((label, bit, bit))
+    return fields
+
+
+def field_values(bits, start, end):
+    """字段在每一行的取值（按字段内左对齐的位数换算，最高位在前）"""
+    weights = 1 << np.arange(end - start, -1, -1)
+    return (bits[:, start:end + 1] @ weights).astype(int)
+
+
+def describe_bits(start, end):
+    byte, first, last = start // 8, 7 - start % 8, 7 - end % 8
+    if first == last:
+        return f"Byte{byte} bit{first}"
+    return f"Byte{byte} bit{first}-{last}"
+
+
+def print_field(name, start, end, assignment, bits, scores):
+    confidence, label_entropy, mask, codes, names = scores[name]
+    values = field_values(bits[mask], start, end)
+    bit_conf = min(assignment[b][1] for b in range(start, end + 1))
+    # 字段对标签的解释程度：I(字段; 标签) / H(标签)
+    _, field_codes = np.unique(values, return_inverse=True)
+    pair_codes = field_codes * len(names) + codes
+    joint_entropy = entropy(np.bincount(pair_codes) / len(pair_codes))
+    field_entropy = entropy(np.bincount(field_codes) / len(field_codes))
+    explained = (field_entropy + label_entropy - joint_entropy) / label_entropy if label_entropy > 0 else 0.0
+
+    ties = sorted({t for b in range(start, end + 1) for t in assignment[b][2]})
+    if ties:
+        note = '  也可能是: ' + ', '.join(ties)
+    else:
+        # 其次的标签：置信度也不低时说明表里这两项总是一起变化，结论要再核实
+        others = [(min(float(scores[other][0][b]) for b in range(start, end + 1)), other)
+                  for other in scores if other != name]
+        runner_up = max(others) if others else (0.0, None)
+        note = f"  其次 {runner_up[1]} {runner_up[0]:.2f}" if runner_up[0] >= 0.5 else ''
+    print(f"{describe_bits(start, end):<16} {name:<12} 位置信度 {bit_conf:.2f}  解释标签 {explained:.2f}{note}")
+    for k, label_value in enumerate(names):
+        counts = np.bincount(values[codes == k])
+        best = int(np.argmax(counts))
+        shift = 7 - end % 8
+        print(f"    {name}={label_value:<4} -> 0x{best << shift:02X}（{counts[best]}/{counts.sum()} 条）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按标签推断帧里每一位的含义")
+    parser.add_argument('csv_files', nargs='*', default=[DEFAULT_CSV], help="带标签的 CSV 表")
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE,
+                        help=f"位置信度低于这个值时不归给任何标签（默认 {MIN_CONFIDENCE}）")
+    args = parser.parse_args()
+
+    start = time.time()
+    label_matrix, byte_matrix = load_dataset(args.csv_files)
+    bits = np.unpackbits(byte_matrix, axis=1).astype(float)
+    rows, bit_count = bits.shape
+    print(f"读取 {len(args.csv_files)} 个表，共 {rows} 条不重复的记录，每帧 {byte_matrix.shape[1]} 字节\n")
+
+    skip = set()
+    checksum = detect_checksum(byte_matrix)
+    if checksum:
+        skip.update(range(bit_count - 8, bit_count))
+
+    scores = bit_confidences(label_matrix, bits)
+    assignment = assign_bits(scores, bit_count, skip, args.min_confidence)
+
+    print("推断的字段:")
+    for name, first, last in group_fields(assignment):
+        print_field(name, first, last, assignment, bits, scores)
+    if checksum:
+        print(f"Byte{byte_matrix.shape[1] - 1:<12} {checksum}")
+
+    constant = [b for b in range(bit_count) if b not in skip and bits[:, b].min() == bits[:, b].max()]
+    constant_bytes = [i for i in range(byte_matrix.shape[1]) if all(b in constant for b in range(i * 8, i * 8 + 8))]
+    print("\n恒定不变的字节: " + (', '.join(f"Byte{i}={byte_matrix[0, i]:02X}" for i in constant_bytes) or "无"))
+
+    unexplained = [b for b in range(bit_count) if b not in skip and b not in constant and assignment[b][0] is None]
+    if unexplained:
+        print("会变化但没有标签能解释的位（可能是按键码等未记录的信息）:")
+        for b in unexplained:
+            best = max(scores, key=lambda name: scores[name][0][b]) if scores else '-'
+            print(f"    {describe_bits(b, b):<16} 最接近 {best}（置信度 {assignment[b][1]:.2f}）")
+
+    print(f"\n耗时 {time.time() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
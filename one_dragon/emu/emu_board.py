@@ -0,0 +1,186 @@
+"""
+电脑上模拟 esp32 的时钟、引脚中断和定时器，供 emu/machine.py、emu/utime.py 使用。
+
+所有中断（引脚边沿、定时器）都放进同一个按虚拟时间排序的事件队列，由一个后台线程依次触发。
+虚拟时间 = 实际经过的时间 × speed；speed 越大回放越快。
+触发某个事件时，回调里看到的 ticks_us() 被固定为事件发生的虚拟时刻，
+所以不管回放多快，中断处理函数测到的脉宽都和原始记录一致。
+"""
+import heapq
+import os
+import sys
+import threading
+import time
+
+RAWDATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'IR learn', 'rawdata')
+sys.path.insert(0, RAWDATA_DIR)
+
+from capture_pack import load_captures  # 读取 rawdata/<指令>/<指令>_N.txt，供 run_learn 等脚本使用
+
+TICKS_PERIOD = 1 << 30  # 与 micropython 的 ticks_us 一样在 2^30 处回绕
+
+
+class _Event:
+    __slots__ = ('at_us', 'callback', 'cancelled')
+
+    def __init__(self, at_us, callback):
+        self.at_us = at_us
+        self.callback = callback
+        self.cancelled = False
+
+
+class Board:
+    def __init__(self, speed=1.0):
+        self._cond = threading.Condition(threading.RLock())
+        self._events = []
+        self._seq = 0
+        self._thread = None
+        self._local = threading.local()
+        self.remotes = {}
+        self.configure(speed)
+
+    def configure(self, speed=1.0):
+        """重新设定回放速度并清空事件队列和统计"""
+        with self._cond:
+            self.speed = float(speed)
+            self._t0 = time.perf_counter()
+            for _, _, event in self._events:
+                event.cancelled = True
+            self._events = []
+            self.irq_count = 0
+            self.irq_time_s = 0.0
+            self.irq_max_s = 0.0
+            self._cond.notify_all()
+
+    # ---- 时钟 ----
+
+    def now_us(self):
+        """当前虚拟时间(µs)，不回绕；在中断回调里等于该事件的发生时刻"""
+        pinned = getattr(self._local, 'pinned', None)
+        if pinned is not None:
+            return pinned
+        return int((time.perf_counter() - self._t0) * 1e6 * self.speed)
+
+    def sleep_us(self, us):
+        """按虚拟时间休眠"""
+        if us > 0:
+            time.sleep(us / 1e6 / self.speed)
+
+    # ---- 事件队列 ----
+
+    def schedule(self, at_us, callback):
+        """在虚拟时刻 at_us 触发 callback()，返回可用于 cancel() 的事件"""
+        event = _Event(at_us, callback)
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._events, (at_us, self._seq, event))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='emu-irq', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return event
+
+    @staticmethod
+    def cancel(event):
+        if event is not None:
+            event.cancelled = True
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if not self._events:
+                    self._cond.wait()
+                    continue
+                at_us, _, event = self._events[0]
+                if event.cancelled:
+                    heapq.heappop(self._events)
+                    continue
+                wait_s = (at_us - self.now_us()) / 1e6 / self.speed
+                if wait_s > 0:
+                    self._cond.wait(min(wait_s, 0.05))
+                    continue
+                heapq.heappop(self._events)
+                self._local.pinned = at_us
+                try:
+                    event.callback()
+                finally:
+                    self._local.pinned = None
+
+    def run_irq(self, handler, arg):
+        """执行一次引脚中断处理函数，并统计耗时"""
+        start = time.perf_counter()
+        handler(arg)
+        cost = time.perf_counter() - start
+        self.irq_count += 1
+        self.irq_time_s += cost
+        if cost > self.irq_max_s:
+            self.irq_max_s = cost
+
+    def irq_stats(self):
+        """返回 (中断次数, 平均耗时µs, 最大耗时µs)"""
+        mean = self.irq_time_s / self.irq_count * 1e6 if self.irq_count else 0.0
+        return self.irq_count, mean, self.irq_max_s * 1e6
+
+    # ---- 遥控器 ----
+
+    def attach_remote(self, remote):
+        self.remotes[remote.pin_id] = remote
+
+    def irq_armed(self, pin):
+        """引脚注册了中断处理函数：如果这个引脚上有模拟遥控器，让它按下一次"""
+        remote = self.remotes.get(pin.id)
+        if remote is not None and pin.handler is not None:
+            remote.on_armed(pin)
+
+
+board = Board()
+
+
+class IRRemote:
+    """
+    模拟遥控器 + 红外接收头：把一组原始记录的时长依次变成引脚上的电平变化。
+    接收头空闲时为高电平，标记(mark)期间为低电平。
+    auto=True 时每次接收端开始记录（注册中断）都自动“按下”下一条记录。
+    """
+
+    def __init__(self, pin_id, captures, press_delay_ms=200, auto=True, repeat=False):
+        self.pin_id = pin_id
+        self.captures = list(captures)
+        self.press_delay_ms = press_delay_ms
+        self.auto = auto
+        self.repeat = repeat
+        self.presses = 0
+        self._busy = False
+        board.attach_remote(self)
+
+    def on_armed(self, pin):
+        if self.auto and not self._busy:
+            self.press(pin)
+
+    def press(self, pin, capture=None, delay_ms=None):
+        """安排一次按键：在 delay_ms 后开始依次产生 capture 里的各个边沿"""
+        if capture is None:
+            if not self.captures:
+                return False
+            capture = self.captures[self.presses % len(self.captures)]
+            if not self.repeat and self.presses >= len(self.captures):
+                return False
+        if delay_ms is None:
+            delay_ms = self.press_delay_ms
+        self.presses += 1
+        self._busy = True
+
+        at_us = board.now_us() + delay_ms * 1000
+        level = 0
+        board.schedule(at_us, lambda lv=level: pin.drive(lv))
+        for duration in capture:
+            at_us += duration
+            level ^= 1
+            board.schedule(at_us, lambda lv=level: pin.drive(lv))
+        if level == 0:
+            board.schedule(at_us + 550, lambda: pin.drive(1))
+        board.schedule(at_us + 1000, self._release)
+        return True
+
+    def _release(self):
+        self._busy = False
@@ -0,0 +1,113 @@
+"""
+电脑上代替 micropython 的 framebuf 模块，只实现 sh1106 驱动用到的部分：
+MONO_VLSB / MONO_HMSB 两种格式的 pixel、fill、hline、vline、line、rect、fill_rect、ellipse、text、blit、scroll。
+text 不带真正的 8×8 字库，每个字符画成由字符编码决定的 8×8 点阵，只用于检查刷新了哪些区域。
+"""
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+
+class FrameBuffer:
+
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (MONO_VLSB, MONO_HMSB):
+            raise ValueError("只支持 MONO_VLSB 和 MONO_HMSB")
+        # 真正的 FrameBuffer 不把宽高等放在实例属性里，子类（如 sh1106）自己的 width/height 不能被覆盖
+        self._buf = buffer
+        self._w = width
+        self._h = height
+        self._format = format
+        self._stride = width if stride is None else stride
+
+    def _locate(self, x, y):
+        if self._format == MONO_VLSB:
+            return (y >> 3) * self._stride + x, 1 << (y & 7)
+        return y * ((self._stride + 7) >> 3) + (x >> 3), 1 << (x & 7)
+
+    def pixel(self, x, y, color=None):
+        if not (0 <= x < self._w and 0 <= y < self._h):
+            return None
+        index, mask = self._locate(x, y)
+        if color is None:
+            return 1 if self._buf[index] & mask else 0
+        if color:
+            self._buf[index] |= mask
+        else:
+            self._buf[index] &= ~mask & 0xFF
+
+    def fill(self, color):
+        value = 0xFF if color else 0
+        for i in range(len(self._buf)):
+            self._buf[i] = value
+
+    def fill_rect(self, x, y, w, h, color):
+        for yy in range(max(0, y), min(self._h, y + h)):
+            for xx in range(max(0, x), min(self._w, x + w)):
+                FrameBuffer.pixel(self, xx, yy, color)
+
+    def hline(self, x, y, w, color):
+        self.fill_rect(x, y, w, 1, color)
+
+    def vline(self, x, y, h, color):
+        self.fill_rect(x, y, 1, h, color)
+
+    def rect(self, x, y, w, h, color, fill=False):
+        if fill:
+            self.fill_rect(x, y, w, h, color)
+            return
+        self.hline(x, y, w, color)
+        self.hline(x, y + h - 1, w, color)
+        self.vline(x, y, h, color)
+        self.vline(x + w - 1, y, h, color)
+
+    def line(self, x0, y0, x1, y1, color):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            FrameBuffer.pixel(self, x0, y0, color)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def ellipse(self, x, y, xr, yr, color, fill=False, m=0xF):
+        for yy in range(-yr, yr + 1):
+            for xx in range(-xr, xr + 1):
+                inside = (xx * xx * yr * yr + yy * yy * xr * xr) <= xr * xr * yr * yr
+                if inside and (fill or (xx * xx * yr * yr + yy * yy * xr * xr) > (xr - 1) * (xr - 1) * yr * yr):
+                    FrameBuffer.pixel(self, x + xx, y + yy, color)
+
+    def text(self, s, x, y, color=1):
+        for n, ch in enumerate(s):
+            code = ord(ch)
+            for col in range(8):
+                bits = (code * (col + 3) + col * 37) & 0xFF if ch != ' ' else 0
+                for row in range(8):
+                    if bits & (1 << row):
+                        FrameBuffer.pixel(self, x + n * 8 + col, y + row, color)
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for yy in range(fbuf._h):
+            for xx in range(fbuf._w):
+                color = FrameBuffer.pixel(fbuf, xx, yy)
+                if color != key:
+                    FrameBuffer.pixel(self, x + xx, y + yy, color)
+
+    def scroll(self, xstep, ystep):
+        copy = FrameBuffer(bytearray(self._buf), self._w, self._h, self._format, self._stride)
+        for yy in range(self._h):
+            for xx in range(self._w):
+                sx = xx - xstep
+                sy = yy - ystep
+                if 0 <= sx < self._w and 0 <= sy < self._h:
+                    FrameBuffer.pixel(self, xx, yy, FrameBuffer.pixel(copy, sx, sy))
@@ -0,0 +1,94 @@
+"""
+电脑上代替 micropython machine 模块的最小实现：Pin（含边沿中断）和 Timer。
+时钟和中断调度见 emu_board.py。
+"""
+from emu_board import board
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.level = 1  # 红外接收头空闲时为高电平
+        self.handler = None
+        self.trigger = 0
+        self.init(mode, pull, value)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.mode = mode
+        if value is not None:
+            self.level = 1 if value else 0
+
+    def value(self, value=None):
+        if value is None:
+            return self.level
+        self.level = 1 if value else 0
+
+    __call__ = value
+
+    def on(self):
+        self.level = 1
+
+    def off(self):
+        self.level = 0
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self.handler = handler
+        self.trigger = trigger
+        board.irq_armed(self)
+
+    def drive(self, level):
+        """由模拟的外部信号驱动电平，满足触发条件时调用中断处理函数"""
+        if level == self.level:
+            return
+        self.level = level
+        edge = Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+        handler = self.handler
+        if handler is not None and self.trigger & edge:
+            board.run_irq(handler, self)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self._event = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, callback=None, freq=-1):
+        self.deinit()
+        if freq > 0:
+            period_us = int(1e6 / freq)
+        else:
+            period_us = int(period) * 1000
+        self.mode = mode
+        self.period_us = max(1, period_us)
+        self.callback = callback
+        self._schedule(board.now_us() + self.period_us)
+
+    def _schedule(self, at_us):
+        self._event = board.schedule(at_us, lambda: self._fire(at_us))
+
+    def _fire(self, at_us):
+        if self.mode == Timer.PERIODIC:
+            self._schedule(at_us + self.period_us)
+        else:
+            self._event = None
+        if self.callback is not None:
+            self.callback(self)
+
+    def deinit(self):
+        board.cancel(self._event)
+        self._event = None
@@ -0,0 +1,23 @@
+"""
+电脑上代替 micropython 模块：const 原样返回，native/viper 装饰器不做任何事。
+"""
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
+
+
+def schedule(func, arg):
+    func(arg)
+
+
+def alloc_emergency_exception_buf(size):
+    pass
@@ -0,0 +1,112 @@
+"""
+在电脑上用模拟的 machine/utime 运行 opt_specification.learn_ir_command，
+由模拟遥控器回放 IR learn/rawdata/<指令> 里的原始记录，
+测量端到端学习耗时和引脚中断处理函数(EdgeRing.handler，只记时间戳)的耗时。
+
+用法: python run_learn.py [指令名，默认27pwon] [--speed 倍速，默认1] [--press-delay-ms 200] [--quiet] [--no-single-shot]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+EMU_DIR = os.path.dirname(os.path.abspath(__file__))
+ONE_DRAGON_DIR = os.path.dirname(EMU_DIR)
+RAWDATA_DIR = os.path.join(ONE_DRAGON_DIR, '..', 'IR learn', 'rawdata')
+sys.path.insert(0, ONE_DRAGON_DIR)
+sys.path.insert(0, EMU_DIR)
+
+import utime
+from emu_board import board, IRRemote, load_captures
+
+
+def parse_args(argv):
+    options = {'command': '27pwon', 'speed': 1.0, 'press_delay_ms': 200, 'quiet': False, 'single_shot': True}
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg == '--speed':
+            options['speed'] = float(args.pop(0))
+        elif arg == '--press-delay-ms':
+            options['press_delay_ms'] = int(args.pop(0))
+        elif arg == '--quiet':
+            options['quiet'] = True
+        elif arg == '--no-single-shot':
+            options['single_shot'] = False
+        else:
+            options['command'] = arg
+    return options
+
+
+def params_for(command):
+    """按指令目录名（如 27pwon）生成学习参数"""
+    return {
+        'type': 'switch',
+        'power': 'off' if 'off' in command else 'on',
+        'mode': 'cool',
+        'aux_heat': 'off',
+        'fan_speed': '1',
+        'temperature': command[:2],
+        'swing': 'fixed',
+        'specification': ' ',
+        'description': f"回放_{command}",
+    }
+
+
+def read_result_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def main():
+    options = parse_args(sys.argv[1:])
+    command = options['command']
+    captures = load_captures(os.path.join(RAWDATA_DIR, command))
+    if not captures:
+        print(f"未找到指令 {command} 的原始记录")
+        return 1
+
+    board.configure(options['speed'])
+    IRRemote(23, captures, press_delay_ms=options['press_delay_ms'])
+
+    import opt_specification
+    opt_specification.time = utime  # micropython 上 time 与 utime 是同一个模块
+
+    cwd = os.getcwd()
+    log = io.StringIO()
+    with tempfile.TemporaryDirectory(prefix='emu_learn_') as workdir:
+        os.chdir(workdir)  # save_to_csv 会在当前目录写 result.txt
+        start_wall = time.perf_counter()
+        start_virtual = board.now_us()
+        try:
+            args = (23, params_for(command), len(captures), options['single_shot'])
+            if options['quiet']:
+                with redirect_stdout(log):
+                    hex_result = opt_specification.learn_ir_command(*args)
+            else:
+                hex_result = opt_specification.learn_ir_command(*args)
+            opt_specification.sync_results()  # 在切回原目录前把缓冲的结果写入 result.txt
+            result_lines = read_result_lines(os.path.join(workdir, 'result.txt'))
+        finally:
+            os.chdir(cwd)
+    virtual_s = (board.now_us() - start_virtual) / 1e6
+    wall_s = time.perf_counter() - start_wall
+
+    count, mean_us, max_us = board.irq_stats()
+    print("\n=== 模拟运行结果 ===")
+    print(f"指令: {command}，记录 {len(captures)} 次，回放速度 {options['speed']}x")
+    print(f"解码结果: {hex_result}")
+    print(f"学习耗时: 虚拟时间 {virtual_s:.2f}s，实际 {wall_s:.2f}s（含每次按键前 {options['press_delay_ms']}ms 延迟）")
+    print(f"中断处理(EdgeRing.handler): {count} 次，平均 {mean_us:.1f}µs，最长 {max_us:.1f}µs（电脑上测得）")
+    print(f"result.txt: {len(result_lines)} 行（临时目录已删除）")
+    for line in result_lines[1:]:
+        print(f"  {line}")
+    return 0 if hex_result else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+电脑上代替 micropython utime/time 模块：ticks 系列函数和休眠都使用 emu_board 的虚拟时钟。
+"""
+from emu_board import board, TICKS_PERIOD
+
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+def ticks_us():
+    return board.now_us() & _TICKS_MAX
+
+
+def ticks_ms():
+    return (board.now_us() // 1000) & _TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def sleep(seconds):
+    board.sleep_us(seconds * 1e6)
+
+
+def sleep_ms(ms):
+    board.sleep_us(ms * 1000)
+
+
+def sleep_us(us):
+    board.sleep_us(us)
+
+
+def time():
+    """与 micropython 一样返回整数秒"""
+    return board.now_us() // 1000000
+
+
+def localtime(secs=None):
+    import time as _time
+    return _time.localtime(secs)[:8]
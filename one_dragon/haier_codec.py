@@ -0,0 +1,278 @@
+"""
+海尔空调 14 字节红外帧的编码/解码，以及预先算好的“状态 -> 帧”查找表。
+
+字节布局（由 more code.csv 里学到的帧整理，与 IRremoteESP8266 的 Haier YRW02/176 位协议一致）:
+  Byte0   固定 A6
+  Byte1   高 4 位 = 温度 - 16；低 4 位 = 风向：关机 0，定向 2（制热时为 A），摆动 C
+  Byte4   0x40 = 开机，0x80 = 辅热（只在开机时出现）
+  Byte5   风速：低 60，中 40，高 20，自动 A0
+  Byte7   模式：循环 00，制冷 20，除湿 40，制热 80，吹风 C0
+  Byte12  这次按下的按键（O3hint.md 里猜的“序号”其实是按键码）：
+          升温 00，降温 01，风向 02，风速 04，开关 05
+  Byte13  校验 = Byte0..Byte12 之和 & 0xFF
+  其余字节恒为 0。
+吹风模式没有温度选项，遥控器仍会发送上一次设定的温度。
+
+参数取值与 opt_specification.get_ac_parameters 相同:
+  power 'on'/'off'，mode 'auto'/'cool'/'dry'/'fan'/'heat'，temperature 16-30，
+  fan_speed '1'/'2'/'3'/'auto'，swing 'fixed'/'swing'，aux_heat 'on'/'off'。
+
+查找表 haier_table.bin 每个状态 5 字节 (Byte1, Byte4, Byte5, Byte7, 按键为 00 时的校验)，
+发送时按下标直接取出，换上按键码并把它加到校验上即可，不用逐字节求和。
+"""
+
+FRAME_LEN = 14
+HEADER_BYTE = 0xA6
+TEMP_MIN = 16
+TEMP_MAX = 30
+
+POWERS = ('off', 'on')
+MODES = ('auto', 'cool', 'dry', 'fan', 'heat')
+FAN_SPEEDS = ('1', '2', '3', 'auto')
+SWINGS = ('fixed', 'swing')
+AUX_HEATS = ('off', 'on')
+
+MODE_CODES = {'auto': 0x00, 'cool': 0x20, 'dry': 0x40, 'heat': 0x80, 'fan': 0xC0}
+FAN_CODES = {'1': 0x60, '2': 0x40, '3': 0x20, 'auto': 0xA0}
+BUTTON_CODES = {'temp_up': 0x00, 'temp_down': 0x01, 'swing': 0x02, 'fan': 0x04, 'power': 0x05}
+
+SWING_OFF = 0x0
+SWING_FIXED = 0x2
+SWING_FIXED_HEAT = 0xA
+SWING_AUTO = 0xC
+
+POWER_BIT = 0x40
+AUX_HEAT_BIT = 0x80
+
+TABLE_FILE = 'haier_table.bin'
+TABLE_ENTRY_SIZE = 5
+TABLE_STATES = len(POWERS) * len(MODES) * (TEMP_MAX - TEMP_MIN + 1) * len(FAN_SPEEDS) * len(SWINGS) * len(AUX_HEATS)
+
+
+def _lookup(mapping, value):
+    """dict 的反查，找不到时返回 None"""
+    for key in mapping:
+        if mapping[key] == value:
+            return key
+    return None
+
+
+def checksum(frame):
+    """Byte0..Byte12 之和 & 0xFF"""
+    total = 0
+    for i in range(FRAME_LEN - 1):
+        total += frame[i]
+    return total & 0xFF
+
+
+def verify_frame(frame):
+    """长度、帧头 A6 和 Byte13 校验都正确时返回 True"""
+    return len(frame) == FRAME_LEN and frame[0] == HEADER_BYTE and checksum(frame) == frame[13]
+
+
+def to_hex(frame):
+    return ''.join('{:02X}'.format(b) for b in frame)
+
+
+def from_hex(hex_code):
+    """十六进制字符串 -> bytes，忽略空格"""
+    hex_code = hex_code.replace(' ', '').strip()
+    return bytes(int(hex_code[i:i + 2], 16) for i in range(0, len(hex_code), 2))
+
+
+def _check_state(power, mode, temperature, fan_speed, swing, aux_heat, button):
+    if power not in POWERS:
+        raise ValueError("power 应为 'on' 或 'off'")
+    if mode not in MODE_CODES:
+        raise ValueError("未知模式: {}".format(mode))
+    if not TEMP_MIN <= temperature <= TEMP_MAX:
+        raise ValueError("温度范围应在 {}-{}°C 之间".format(TEMP_MIN, TEMP_MAX))
+    if fan_speed not in FAN_CODES:
+        raise ValueError("未知风速: {}".format(fan_speed))
+    if swing not in SWINGS:
+        raise ValueError("swing 应为 'fixed' 或 'swing'")
+    if aux_heat not in AUX_HEATS:
+        raise ValueError("aux_heat 应为 'on' 或 'off'")
+    if button not in BUTTON_CODES:
+        raise ValueError("未知按键: {}".format(button))
+
+
+def _state_bytes(power, mode, temperature, fan_speed, swing, aux_heat):
+    """返回随状态变化的 (Byte1, Byte4, Byte5, Byte7)"""
+    if power == 'off':
+        swing_code = SWING_OFF
+    elif swing == 'swing':
+        swing_code = SWING_AUTO
+    elif mode == 'heat':
+        swing_code = SWING_FIXED_HEAT
+    else:
+        swing_code = SWING_FIXED
+    byte4 = 0
+    if power == 'on':
+        byte4 = POWER_BIT
+        if aux_heat == 'on':
+            byte4 |= AUX_HEAT_BIT
+    return ((temperature - TEMP_MIN) << 4) | swing_code, byte4, FAN_CODES[fan_speed], MODE_CODES[mode]
+
+
+def encode(power, mode, temperature, fan_speed='1', swing='fixed', aux_heat='off', button='power'):
+    """把空调状态和按键编码成 14 字节的帧(bytearray)"""
+    temperature = int(temperature)
+    _check_state(power, mode, temperature, fan_speed, swing, aux_heat, button)
+    frame = bytearray(FRAME_LEN)
+    frame[0] = HEADER_BYTE
+    frame[1], frame[4], frame[5], frame[7] = _state_bytes(power, mode, temperature, fan_speed, swing, aux_heat)
+    frame[12] = BUTTON_CODES[button]
+    frame[13] = checksum(frame)
+    return frame
+
+
+def encode_params(params, button='power'):
+    """用 get_ac_parameters 返回的参数字典编码"""
+    return encode(params['power'], params['mode'], params['temperature'], params['fan_speed'],
+                  params['swing'], params['aux_heat'], button)
+
+
+def decode(frame):
+    """
+    把 14 字节的帧（bytes 或十六进制字符串）解码成状态字典，格式与 get_ac_parameters 相同，另含 'button'。
+    帧头、长度、校验或字段取值不对时抛出 ValueError。
+    """
+    if isinstance(frame, str):
+        frame = from_hex(frame)
+    if len(frame) != FRAME_LEN:
+        raise ValueError("帧长度应为 {} 字节，实际 {}".format(FRAME_LEN, len(frame)))
+    if frame[0] != HEADER_BYTE:
+        raise ValueError("帧头应为 A6，实际 {:02X}".format(frame[0]))
+    if checksum(frame) != frame[13]:
+        raise ValueError("校验错误: 应为 {:02X}，实际 {:02X}".format(checksum(frame), frame[13]))
+
+    mode = _lookup(MODE_CODES, frame[7])
+    fan_speed = _lookup(FAN_CODES, frame[5])
+    button = _lookup(BUTTON_CODES, frame[12])
+    if mode is None or fan_speed is None or button is None:
+        raise ValueError("未知的模式/风速/按键: {:02X}/{:02X}/{:02X}".format(frame[7], frame[5], frame[12]))
+
+    # Byte1 高 4 位能表示 16-31°C，遥控器只发 16-30
+    temperature = (frame[1] >> 4) + TEMP_MIN
+    if temperature > TEMP_MAX:
+        raise ValueError("温度 {}°C 超出 {}-{}°C".format(temperature, TEMP_MIN, TEMP_MAX))
+
+    power = 'on' if frame[4] & POWER_BIT else 'off'
+    return {
+        'power': power,
+        'mode': mode,
+        'temperature': temperature,
+        'fan_speed': fan_speed,
+        'swing': 'swing' if (frame[1] & 0x0F) == SWING_AUTO else 'fixed',
+        'aux_heat': 'on' if frame[4] & AUX_HEAT_BIT else 'off',
+        'button': button,
+    }
+
+
+RESERVED_BYTES = (2, 3, 6, 8, 9, 10, 11)
+SWING_NIBBLES = (SWING_OFF, SWING_FIXED, SWING_FIXED_HEAT, SWING_AUTO)
+
+
+def is_known_frame(frame):
+    """
+    比 verify_frame 更严格：保留字节为 0，温度在 TEMP_MIN-TEMP_MAX 之内，风向、模式、风速、按键都是已知取值。
+    纠错时用它代替单独的 8 位校验，避免偶然凑对校验和。
+    """
+    if not verify_frame(frame):
+        return False
+    for i in RESERVED_BYTES:
+        if frame[i]:
+            return False
+    if (frame[1] & 0x0F) not in SWING_NIBBLES or (frame[4] & ~(POWER_BIT | AUX_HEAT_BIT)):
+        return False
+    if (frame[1] >> 4) > TEMP_MAX - TEMP_MIN:
+        return False
+    try:
+        decode(frame)
+    except ValueError:
+        return False
+    return True
+
+
+def state_index(power, mode, temperature, fan_speed, swing, aux_heat):
+    """状态在查找表中的下标"""
+    index = POWERS.index(power)
+    index = index * len(MODES) + MODES.index(mode)
+    index = index * (TEMP_MAX - TEMP_MIN + 1) + int(temperature) - TEMP_MIN
+    index = index * len(FAN_SPEEDS) + FAN_SPEEDS.index(fan_speed)
+    index = index * len(SWINGS) + SWINGS.index(swing)
+    return index * len(AUX_HEATS) + AUX_HEATS.index(aux_heat)
+
+
+def build_table():
+    """按 state_index 的顺序生成全部状态的查找表(bytes)"""
+    table = bytearray(TABLE_STATES * TABLE_ENTRY_SIZE)
+    for power in POWERS:
+        for mode in MODES:
+            for temperature in range(TEMP_MIN, TEMP_MAX + 1):
+                for fan_speed in FAN_SPEEDS:
+                    for swing in SWINGS:
+                        for aux_heat in AUX_HEATS:
+                            frame = encode(power, mode, temperature, fan_speed, swing, aux_heat, 'temp_up')
+                            offset = state_index(power, mode, temperature, fan_speed, swing, aux_heat) * TABLE_ENTRY_SIZE
+                            table[offset:offset + TABLE_ENTRY_SIZE] = bytes((frame[1], frame[4], frame[5], frame[7], frame[13]))
+    return bytes(table)
+
+
+def write_table(path=TABLE_FILE):
+    table = build_table()
+    with open(path, 'wb') as f:
+        f.write(table)
+    return len(table)
+
+
+class HaierTable:
+    """
+    读取 haier_table.bin，按状态直接取帧。
+    in_memory=False 时不把整张表读进内存，每次查找只 seek 并读 5 个字节。
+    """
+
+    def __init__(self, path=TABLE_FILE, in_memory=True):
+        self.path = path
+        self.table = None
+        self.file = None
+        if in_memory:
+            with open(path, 'rb') as f:
+                self.table = f.read()
+            if len(self.table) != TABLE_STATES * TABLE_ENTRY_SIZE:
+                raise ValueError("{} 大小不对，请重新生成".format(path))
+        else:
+            self.file = open(path, 'rb')
+        self.frame = bytearray(FRAME_LEN)
+        self.frame[0] = HEADER_BYTE
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def lookup(self, power, mode, temperature, fan_speed='1', swing='fixed', aux_heat='off', button='power'):
+        """
+        返回该状态的 14 字节帧。返回的是内部复用的 bytearray，
+        下次查找会被覆盖，需要保存时请复制。
+        """
+        offset = state_index(power, mode, temperature, fan_speed, swing, aux_heat) * TABLE_ENTRY_SIZE
+        if self.table is not None:
+            entry = self.table[offset:offset + TABLE_ENTRY_SIZE]
+        else:
+            self.file.seek(offset)
+            entry = self.file.read(TABLE_ENTRY_SIZE)
+        button_code = BUTTON_CODES[button]
+        frame = self.frame
+        frame[1] = entry[0]
+        frame[4] = entry[1]
+        frame[5] = entry[2]
+        frame[7] = entry[3]
+        frame[12] = button_code
+        frame[13] = (entry[4] + button_code) & 0xFF
+        return frame
+
+    def lookup_params(self, params, button='power'):
+        return self.lookup(params['power'], params['mode'], params['temperature'], params['fan_speed'],
+                           params['swing'], params['aux_heat'], button)
@@ -0,0 +1,97 @@
+"""
+把一次记录切分成多帧：遥控器按住或重复发送时，一次记录里会有几帧完整的信号。
+
+切分点有两种：
+1. 长间隔（超过 FRAME_GAP_US）——帧与帧之间的静默；
+2. 帧头 3000/3000/3000/4400 µs——帧之间没有明显静默时也能分开。
+每帧都按原来的方式解码（跳过4个帧头时长、取偶数位置的间隔），各帧作为独立样本参与投票，
+这样按一次键就能得到多份样本。
+只用列表和整数运算，在 micropython 上也能运行。
+"""
+from ir_stream import HEADER_US, HEADER_TOLERANCE_PCT
+
+FRAME_GAP_US = 10000       # 比帧头里最长的 4400 µs 长得多，数据里不会出现
+MIN_FRAME_DURATIONS = 20   # 帧头 + 至少 8 位；更短的片段视为干扰丢弃
+
+
+def _header_error(durations, index, header=HEADER_US, tolerance_pct=HEADER_TOLERANCE_PCT):
+    """
+    durations[index:] 与帧头的偏差（各时长偏差百分比之和），不是帧头时返回 None。
+    写成 not <= 是为了让 NaN 也不匹配。
+    """
+    if index + len(header) > len(durations):
+        return None
+    error = 0
+    for i, expected in enumerate(header):
+        deviation = abs(durations[index + i] - expected) * 100
+        if not deviation <= expected * tolerance_pct:
+            return None
+        error += deviation // expected
+    return error
+
+
+def _header_at(durations, index):
+    """durations[index:] 是否以帧头开始。
+    帧间间隔接近 3000 µs 时，前一个位置也可能在容差内，这时取偏差更小的位置"""
+    error = _header_error(durations, index)
+    if error is None:
+        return False
+    following = _header_error(durations, index + 1)
+    return following is None or following >= error
+
+
+def frame_spans(durations, gap_us=FRAME_GAP_US, min_durations=MIN_FRAME_DURATIONS):
+    """
+    返回每帧在 durations 中的 (起点, 终点) 下标，终点不含。
+    记录开头和每个长间隔之后都视为可能的帧起点（与原来“前4个是帧头”的假设一致），
+    帧头出现的位置也是帧起点；长间隔和帧头前的帧间间隔都不属于任何一帧。
+    """
+    count = len(durations)
+    starts = [0]
+    ends = []
+    i = 0
+    while i < count:
+        duration = durations[i]
+        if duration > gap_us:
+            ends.append(i)
+            starts.append(i + 1)
+            i += 1
+        elif i > starts[-1] and _header_at(durations, i):
+            # 帧以标记结束，帧头前的那个时长是帧间间隔，不属于前一帧
+            ends.append(i - 1 if (i - starts[-1]) % 2 == 0 else i)
+            starts.append(i)
+            i += len(HEADER_US)
+        else:
+            i += 1
+    ends.append(count)
+
+    spans = []
+    for start, end in zip(starts, ends):
+        if end - start >= min_durations:
+            spans.append((start, end))
+    return spans
+
+
+def split_frames(durations, gap_us=FRAME_GAP_US, min_durations=MIN_FRAME_DURATIONS):
+    """
+    把一次记录切分成帧，返回时长列表的列表。
+    只有一帧，或找不到任何完整的帧时（按原来的方式处理），返回 [原记录]。
+    """
+    spans = frame_spans(durations, gap_us, min_durations)
+    if not spans or (len(spans) == 1 and spans[0] == (0, len(durations))):
+        return [durations]
+    return [list(durations[start:end]) for start, end in spans]
+
+
+def count_frames(durations):
+    return len(frame_spans(durations))
+
+
+def frame_spaces(frame):
+    """一帧中代表数据位的间隔：跳过4个帧头时长后取偶数位置（索引 1, 3, 5, ...）"""
+    return frame[4:][1::2]
+
+
+def frame_marks(frame):
+    """一帧中每个数据间隔之前的标记：跳过4个帧头时长后取奇数位置（索引 0, 2, 4, ...）"""
+    return frame[4:][0::2]
@@ -0,0 +1,70 @@
+"""
+只记录时间戳的红外边沿中断处理：中断里把 ticks_us() 写进预分配的环形数组，
+脉宽（相邻时间戳之差）等记录结束或在软中断/定时器回调里再算。
+
+和 IRReceiver._pulse_handler 相比，中断里没有 ticks_diff、没有判断分支、
+不分配内存，并用 @micropython.native 编译，减少每个边沿的处理时间和测量抖动。
+注册时要用 Pin.irq(..., hard=True)：ESP32 上默认是软中断，时间戳要等调度器运行回调才读取，抖动仍在。
+"""
+import array
+import micropython
+from utime import ticks_us, ticks_diff
+
+RING_SIZE = 1024  # 必须是 2 的幂
+
+
+class EdgeRing:
+    def __init__(self, size=RING_SIZE):
+        if size & (size - 1):
+            raise ValueError("size 必须是 2 的幂")
+        self.stamps = array.array('I', [0] * size)
+        self.mask = size - 1
+        self.count = 0  # 已记录的边沿数（不回绕）
+        self.fed = 0    # 已交给解码器的边沿数
+
+    def reset(self):
+        self.count = 0
+        self.fed = 0
+
+    @micropython.native
+    def handler(self, pin):
+        """引脚中断处理函数：只记录时间戳"""
+        n = self.count
+        self.stamps[n & self.mask] = ticks_us()
+        self.count = n + 1
+
+    def overflowed(self):
+        """边沿数超过环形数组容量，最早的时间戳已被覆盖"""
+        return self.count > self.mask + 1
+
+    def last_stamp(self):
+        """最后一个边沿的时间戳，没有边沿时返回 None"""
+        if self.count == 0:
+            return None
+        return self.stamps[(self.count - 1) & self.mask]
+
+    def durations(self):
+        """把时间戳换算成脉宽列表（与 IRReceiver.get_raw_data 格式相同）"""
+        count = self.count
+        start = count - (self.mask + 1) if count > self.mask + 1 else 0
+        stamps = self.stamps
+        mask = self.mask
+        result = []
+        for i in range(start + 1, count):
+            duration = ticks_diff(stamps[i & mask], stamps[(i - 1) & mask])
+            result.append(duration if duration > 0 else 1)
+        return result
+
+    def feed(self, decoder):
+        """把新到的脉宽交给流式解码器，供定时器或 micropython.schedule 的回调调用"""
+        count = self.count
+        stamps = self.stamps
+        mask = self.mask
+        i = self.fed if self.fed > 0 else 1
+        if count - i > mask:
+            i = count - mask  # 被覆盖的部分已无法恢复
+        while i < count:
+            duration = ticks_diff(stamps[i & mask], stamps[(i - 1) & mask])
+            decoder.feed(duration if duration > 0 else 1)
+            i += 1
+        self.fed = count
@@ -0,0 +1,129 @@
+"""
+逐个脉冲时长解码的红外状态机：帧头 -> 标记(mark) -> 间隔(space) -> 位。
+
+每来一个时长调用一次 feed()，最后一个间隔结束时整帧字节就已经就绪，
+不需要等记录超时后再整体裁剪、切片、分类。
+和离线解码一样按标记/间隔交替取间隔分类；范围外的间隔（毛刺）记为不确定位，
+记录在 uncertain 位图里，留给后续的投票或校验和修复处理。
+feed() 只做整数比较和写入预分配的 bytearray，不分配内存，
+可以直接在 IRReceiver._pulse_handler（或 micropython.schedule 的软中断回调）里调用。
+"""
+
+# 海尔遥控器帧头: 3000 / 3000 / 3000 / 4400 µs
+HEADER_US = (3000, 3000, 3000, 4400)
+HEADER_TOLERANCE_PCT = 40
+
+# 标记约 550 µs；间隔 400-700 µs 为 0，1500-1900 µs 为 1（与离线解码相同）
+MARK_MAX_US = 2500  # 超过这个长度的标记说明帧已断开
+ZERO_MIN_US = 400
+ZERO_MAX_US = 700
+ONE_MIN_US = 1500
+ONE_MAX_US = 1900
+
+FRAME_BITS = 112  # 14 字节
+
+# 状态
+STATE_HEADER = 0
+STATE_MARK = 1
+STATE_SPACE = 2
+STATE_DONE = 3
+
+
+class StreamDecoder:
+    def __init__(self, nbits=FRAME_BITS, header=HEADER_US, header_tolerance_pct=HEADER_TOLERANCE_PCT):
+        self.nbits = nbits
+        self.header = header
+        self.header_tolerance_pct = header_tolerance_pct
+        self.frame = bytearray((nbits + 7) // 8)
+        self.uncertain = bytearray((nbits + 7) // 8)  # 范围外间隔对应的位
+        self.errors = 0
+        self.reset()
+
+    def reset(self):
+        """回到等待帧头的状态，清空已解码的位"""
+        self.state = STATE_HEADER
+        self.header_index = 0
+        self.bit_count = 0
+        self.uncertain_count = 0
+
+    def _header_match(self, index, duration):
+        expected = self.header[index]
+        return abs(duration - expected) * 100 <= expected * self.header_tolerance_pct
+
+    def feed(self, duration):
+        """喂入一个脉冲时长(µs)，整帧解码完成时返回 True"""
+        state = self.state
+        if state == STATE_SPACE:
+            bit_count = self.bit_count
+            mask = 0x80 >> (bit_count & 7)
+            if ONE_MIN_US <= duration <= ONE_MAX_US:
+                self.frame[bit_count >> 3] |= mask
+            elif not ZERO_MIN_US <= duration <= ZERO_MAX_US:
+                self.uncertain[bit_count >> 3] |= mask
+                self.uncertain_count += 1
+            bit_count += 1
+            self.bit_count = bit_count
+            if bit_count >= self.nbits:
+                self.state = STATE_DONE
+                return True
+            self.state = STATE_MARK
+            return False
+
+        if state == STATE_MARK:
+            if duration > MARK_MAX_US:
+                # 帧中断：计一次错误，并把这个时长当作可能的新帧头
+                self.errors += 1
+                self.reset()
+                if self._header_match(0, duration):
+                    self.header_index = 1
+            else:
+                self.state = STATE_SPACE
+            return False
+
+        if state == STATE_HEADER:
+            if self._header_match(self.header_index, duration):
+                self.header_index += 1
+                if self.header_index == len(self.header):
+                    frame = self.frame
+                    uncertain = self.uncertain
+                    for i in range(len(frame)):
+                        frame[i] = 0
+                        uncertain[i] = 0
+                    self.state = STATE_MARK
+            elif self._header_match(0, duration):
+                self.header_index = 1
+            else:
+                self.header_index = 0
+            return False
+
+        # STATE_DONE: 帧已完成，忽略帧尾标记和后续脉冲，直到 reset()
+        return False
+
+    def is_done(self):
+        return self.state == STATE_DONE
+
+    def is_clean(self):
+        """帧已完成且没有不确定位"""
+        return self.state == STATE_DONE and self.uncertain_count == 0
+
+    def get_frame(self):
+        """返回解码完成的帧(bytes)，未完成时返回 None（会分配内存，不要在中断里调用）
+        不确定位按 0 填入，可用 uncertain / uncertain_count 判断"""
+        if self.state != STATE_DONE:
+            return None
+        return bytes(self.frame)
+
+    def get_hex(self):
+        frame = self.get_frame()
+        if frame is None:
+            return None
+        return ''.join('{:02X}'.format(b) for b in frame)
+
+
+def decode_durations(durations, nbits=FRAME_BITS):
+    """把一整段时长序列一次性喂给状态机，返回解码完成的帧(bytes)或 None"""
+    decoder = StreamDecoder(nbits)
+    for duration in durations:
+        if decoder.feed(duration):
+            return decoder.get_frame()
+    return None
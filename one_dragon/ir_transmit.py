@@ -0,0 +1,150 @@
+"""
+红外发射：把一整个时长数组交给硬件定时的后端一次性发出，Python 里不逐位翻转引脚。
+
+RMTBackend    esp32 的 RMT 外设：clock_div=80 时 1 tick = 1 µs，
+              tx_carrier 让标记期间自动叠加 38 kHz 载波，write_pulses 之后由硬件按时输出。
+RecordingBackend  电脑上用的后端，按 RMT 的时钟分频对时长做量化，记录输出的每个边沿，
+              用于测量实际发出的波形和请求的波形之间的时间误差。
+
+时长数组格式与学习到的原始记录相同：从标记开始，标记/间隔交替，以标记结束。
+"""
+from ir_waveform import WaveformCache
+
+IR_TRANSMIT_PIN = 21       # 见 Hardware Check/Hardware Hookup.py
+CARRIER_HZ = 38000
+CARRIER_DUTY_PERCENT = 33
+RMT_CHANNEL = 0
+RMT_SOURCE_HZ = 80000000   # RMT 的 APB 时钟
+RMT_CLOCK_DIV = 80         # 80 MHz / 80 = 1 µs 一个 tick
+RMT_MAX_TICKS = 32767      # RMT 每个时长最多 15 位
+FRAME_REPEAT_GAP_US = 20000  # 重复发送同一帧时两帧之间的静默
+
+
+def tick_us(clock_div=RMT_CLOCK_DIV):
+    return clock_div * 1000000 / RMT_SOURCE_HZ
+
+
+def to_ticks(durations, clock_div=RMT_CLOCK_DIV):
+    """把 µs 时长换算成 RMT tick，超出范围时抛出 ValueError"""
+    if clock_div == RMT_CLOCK_DIV:
+        ticks = durations
+    else:
+        scale = RMT_SOURCE_HZ / 1000000 / clock_div
+        ticks = [int(d * scale + 0.5) for d in durations]
+    for t in ticks:
+        if not 0 < t <= RMT_MAX_TICKS:
+            raise ValueError("时长 {} tick 超出 RMT 范围 1-{}".format(t, RMT_MAX_TICKS))
+    return ticks
+
+
+class RMTBackend:
+    """esp32 RMT 硬件发射，带 38 kHz 载波"""
+
+    def __init__(self, pin_num=IR_TRANSMIT_PIN, channel=RMT_CHANNEL, clock_div=RMT_CLOCK_DIV,
+                 carrier_hz=CARRIER_HZ, duty_percent=CARRIER_DUTY_PERCENT):
+        import esp32
+        from machine import Pin
+        self.clock_div = clock_div
+        self.rmt = esp32.RMT(channel, pin=Pin(pin_num), clock_div=clock_div, idle_level=False,
+                             tx_carrier=(carrier_hz, duty_percent, 1))
+
+    def write(self, durations):
+        """开始发送，不等待完成"""
+        ticks = to_ticks(durations, self.clock_div)
+        # write_pulses 只接受 list/tuple；从标记（高电平，叠加载波）开始
+        self.rmt.write_pulses(tuple(ticks), 1)
+
+    def wait_done(self, timeout_ms=0):
+        """发送完成时返回 True；timeout_ms 为最长等待时间"""
+        return self.rmt.wait_done(timeout=timeout_ms)
+
+    def deinit(self):
+        self.rmt.deinit()
+
+
+class RecordingBackend:
+    """
+    电脑上的发射后端：不发送，只记录边沿 (时刻µs, 电平)。
+    时长按 clock_div 对应的 tick 量化，与 RMTBackend 实际输出的一致。
+    """
+
+    def __init__(self, clock_div=RMT_CLOCK_DIV):
+        self.clock_div = clock_div
+        self.edges = []
+        self.now_us = 0.0
+        self.writes = 0
+
+    def write(self, durations):
+        ticks = to_ticks(durations, self.clock_div)
+        step = tick_us(self.clock_div)
+        level = 1
+        for t in ticks:
+            self.edges.append((self.now_us, level))
+            self.now_us += t * step
+            level ^= 1
+        self.edges.append((self.now_us, 0))
+        self.writes += 1
+
+    def wait_done(self, timeout_ms=0):
+        return True
+
+    def deinit(self):
+        pass
+
+    def gap(self, duration_us):
+        """两次发送之间的静默"""
+        self.now_us += duration_us
+
+    def emitted_durations(self):
+        """从边沿还原出实际输出的时长（µs），帧之间的静默也作为一个间隔"""
+        return [self.edges[i + 1][0] - self.edges[i][0] for i in range(len(self.edges) - 1)]
+
+    def clear(self):
+        self.edges = []
+        self.now_us = 0.0
+        self.writes = 0
+
+
+def timing_error(requested, emitted):
+    """逐个比较请求的时长和实际输出的时长，返回 (最大误差µs, 平均误差µs, 累计漂移µs)"""
+    if len(requested) > len(emitted):
+        raise ValueError("输出的时长少于请求的时长")
+    errors = [emitted[i] - requested[i] for i in range(len(requested))]
+    drift = sum(errors)
+    abs_errors = [abs(e) for e in errors]
+    return max(abs_errors), sum(abs_errors) / len(abs_errors), drift
+
+
+class IRTransmitter:
+    """发送帧或时长数组；渲染好的波形按帧缓存"""
+
+    def __init__(self, pin_num=IR_TRANSMIT_PIN, backend=None, cache=None):
+        self.backend = backend if backend is not None else RMTBackend(pin_num)
+        self.cache = cache if cache is not None else WaveformCache()
+        self.sent_frames = 0
+
+    def send_durations(self, durations, wait=True):
+        """交给后端发送；wait=True 时等到整段时长发完"""
+        self.backend.write(durations)
+        if wait:
+            self.backend.wait_done(sum(durations) // 1000 + 10)
+
+    def send_frame(self, frame, repeat=1, gap_us=FRAME_REPEAT_GAP_US):
+        """发送 14 字节的帧，repeat > 1 时每两帧之间静默 gap_us"""
+        waveform = self.cache.get(frame)
+        for i in range(repeat):
+            if i:
+                self._pause(gap_us)
+            self.send_durations(waveform)
+            self.sent_frames += 1
+
+    def _pause(self, gap_us):
+        pause = getattr(self.backend, 'gap', None)
+        if pause is not None:
+            pause(gap_us)
+            return
+        import utime
+        utime.sleep_us(gap_us)
+
+    def deinit(self):
+        self.backend.deinit()
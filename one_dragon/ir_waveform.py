@@ -0,0 +1,85 @@
+"""
+把 14 字节的帧渲染成发送用的时长数组(array('H'))：
+帧头 3000/3000/3000/4400 µs，然后每一位一个 550 µs 标记加一个间隔（0 为 550 µs，1 为 1650 µs），
+最后再加一个结束标记，共 4 + 112×2 + 1 = 229 个时长，格式与学习到的原始记录相同。
+
+WaveformCache 按帧内容缓存渲染结果（最近最少使用淘汰），
+定时任务或重复发送同一个状态时直接取缓存，不用重新渲染。
+"""
+import array
+from collections import OrderedDict
+
+from ir_stream import HEADER_US, FRAME_BITS
+
+MARK_US = 550
+ZERO_SPACE_US = 550
+ONE_SPACE_US = 1650
+
+WAVEFORM_LEN = len(HEADER_US) + 2 * FRAME_BITS + 1
+CACHE_SIZE = 8
+
+
+def new_waveform():
+    """预分配一个可以放下一整帧的时长数组"""
+    return array.array('H', [0] * WAVEFORM_LEN)
+
+
+def render(frame, out=None):
+    """
+    把帧(bytes/bytearray，按 MSB 先发)渲染成时长数组。
+    out 为预分配的 array('H')（长度至少 WAVEFORM_LEN）时写入 out 并返回它，否则新建一个。
+    """
+    if len(frame) * 8 != FRAME_BITS:
+        raise ValueError("帧长度应为 {} 字节".format(FRAME_BITS // 8))
+    if out is None:
+        out = new_waveform()
+    i = 0
+    for duration in HEADER_US:
+        out[i] = duration
+        i += 1
+    for byte in frame:
+        mask = 0x80
+        while mask:
+            out[i] = MARK_US
+            out[i + 1] = ONE_SPACE_US if byte & mask else ZERO_SPACE_US
+            i += 2
+            mask >>= 1
+    out[i] = MARK_US
+    return out
+
+
+class WaveformCache:
+    """按帧内容缓存渲染好的时长数组，超过 size 个时淘汰最久未用的一个"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, frame):
+        """
+        返回该帧的时长数组。返回的数组归缓存所有，不要修改；
+        frame 可以是 HaierTable.lookup 复用的 bytearray，键会另存一份。
+        """
+        key = bytes(frame)
+        waveform = self.cache.pop(key, None)
+        if waveform is not None:
+            self.hits += 1
+            self.cache[key] = waveform  # 重新插入，成为最近使用的一个
+            return waveform
+
+        self.misses += 1
+        if len(self.cache) >= self.size:
+            # 淘汰最久未用的，并复用它的数组
+            oldest = next(iter(self.cache))
+            waveform = render(key, self.cache.pop(oldest))
+        else:
+            waveform = render(key)
+        self.cache[key] = waveform
+        return waveform
+
+    def clear(self):
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,101 @@
+"""
+给 flash 用的日志文件：记录先放在内存里，sync() 或攒够一块时才追加到文件，一次打开只写一次。
+
+原来每保存一条都要打开两次文件（先试读判断是否存在，再追加一行），
+在 ESP32 的 littlefs/FAT 上又慢又磨损 flash。这里：
+  - append() 只放进缓冲；缓冲达到 block_size 字节时写入，用于 CommandStore.import_csv 这类批量写入
+  - sync() 立即写入。学习时每学到一条指令都调用一次（opt_specification.save_to_csv），
+    所以每条记录的代价是一次打开 + 一次追加；学一条要几十秒，不值得为攒块冒断电丢失的风险
+  - 文件是否存在只在第一次写入前用 os.stat 查一次
+  - 每条记录末尾加一列 CRC32（8 位十六进制），断电时写了一半的行读取时能被识别并跳过
+"""
+import os
+import binascii
+
+JOURNAL_BLOCK_SIZE = 512      # 缓冲达到这么多字节就写入，接近 flash 的一页
+CRC_LEN = 8
+
+
+def record_crc(text):
+    return '{:08X}'.format(binascii.crc32(text.encode()) & 0xFFFFFFFF)
+
+
+def seal(text):
+    """给一条记录加上 CRC 列"""
+    return text + ',' + record_crc(text)
+
+
+def unseal(line):
+    """
+    检查一行记录的 CRC，返回 (去掉 CRC 列的记录, 是否可信)。
+    没有 CRC 列的旧记录原样返回并视为可信；CRC 不对（断电时写坏的行）返回 (None, False)。
+    """
+    line = line.rstrip('\r\n')
+    text, sep, crc = line.rpartition(',')
+    if not sep or len(crc) != CRC_LEN or not _is_hex(crc):
+        return line, True
+    if record_crc(text) != crc.upper():
+        return None, False
+    return text, True
+
+
+def _is_hex(text):
+    for c in text:
+        if c not in '0123456789abcdefABCDEF':
+            return False
+    return True
+
+
+class Journal:
+    """只追加的日志文件，header 为新建文件时写在第一行的表头（不加 CRC）"""
+
+    def __init__(self, path, header=None, block_size=JOURNAL_BLOCK_SIZE):
+        self.path = path
+        self.header = header
+        self.block_size = block_size
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.exists = None          # 第一次写入前才检查文件是否存在
+        self.records_written = 0
+        self.flushes = 0
+
+    def append(self, text):
+        """加一条记录（不含换行），到阈值时写入文件"""
+        line = seal(text) + '\n'
+        self.buffer.append(line)
+        self.buffered_bytes += len(line)
+        if self.buffered_bytes >= self.block_size:
+            self.sync()
+
+    def pending(self):
+        return len(self.buffer)
+
+    def sync(self):
+        """把缓冲的记录一次写入文件"""
+        if not self.buffer:
+            return
+        if self.exists is None:
+            try:
+                os.stat(self.path)
+                self.exists = True
+            except OSError:
+                self.exists = False
+        with open(self.path, 'a') as f:
+            if not self.exists and self.header is not None:
+                f.write(self.header + '\n')
+            f.write(''.join(self.buffer))
+        self.exists = True
+        self.records_written += len(self.buffer)
+        self.flushes += 1
+        self.buffer = []
+        self.buffered_bytes = 0
+
+    def discard(self):
+        """丢掉还没写入的记录（文件被整体重写后，缓冲里的内容已经包含在新文件中）"""
+        self.buffer = []
+        self.buffered_bytes = 0
+
+    def reset(self):
+        """文件被替换或删除后调用，下次写入前重新检查是否存在"""
+        self.discard()
+        self.exists = None
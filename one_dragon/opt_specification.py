@@ -2,23 +2,58 @@ from machine import Pin, Timer
 import time
 import array
 import utime
+from ir_stream import StreamDecoder
+from ir_ring import EdgeRing
+from ir_frames import split_frames, frame_spaces, frame_marks, count_frames
+from haier_codec import verify_frame, to_hex
+from pulse_cluster import fit_clusters, classify_value, describe_clusters
+from soft_decode import soft_decode
+from command_store import CommandStore
+
+IDLE_TIMEOUT_MS = 20      # 收到信号后超过这么久没有新边沿，认为一帧已经结束
+MIN_FRAME_PULSES = 10     # 静默前少于这么多个边沿视为干扰，丢弃后继续等待
+REPEAT_WINDOW_MS = 150    # 一帧结束后再等这么久才停止记录，比遥控器重复发送时的帧间隔（几十毫秒）长，
+                          # 按一次键发出的后几帧也记在同一次记录里，由 ir_frames 切分
+POLL_INTERVAL_S = 0.01    # 等待记录结束时的轮询间隔
+RECORD_PAUSE_S = 0.3      # 两次记录之间的停顿
+SINGLE_SHOT_LEARN = True  # 有一帧通过帧头和校验检查就结束学习，否则继续记录并投票
+SINGLE_SHOT_MAX_UNCERTAIN = 1  # 只有1个不确定位时猜错必然改变校验和，多了可能恰好抵消
 
 class IRReceiver:
-    def __init__(self, pin_num):
+    def __init__(self, pin_num, decoder=None, ring=None):
         self.ir_pin = Pin(pin_num, Pin.IN)
         self.timer = Timer(0)
-        self.pulse_buffer = array.array('i', [0] * 1000)
+        self.idle_timer = Timer(1)
+        self.idle_timeout_us = 0
+        self.repeat_window_us = 0
+        # 可选的 EdgeRing：中断里只记时间戳，脉宽在定时器回调和记录结束后再算
+        self.ring = ring
+        self.pulse_buffer = array.array('i', [0] * 1000) if ring is None else None
         self.buffer_index = 0
         self.recording = False
         self.start_time = 0
+        self.decoder = decoder  # 可选的 StreamDecoder，边记录边解码
       
-    def start_recording(self, timeout_ms=6000):
+    def start_recording(self, timeout_ms=6000, idle_timeout_ms=IDLE_TIMEOUT_MS, repeat_window_ms=REPEAT_WINDOW_MS):
         self.buffer_index = 0
         self.recording = True
         self.start_time = utime.ticks_us()
-      
-        self.ir_pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._pulse_handler)
+        if self.decoder is not None:
+            self.decoder.reset()
+        if self.ring is not None:
+            self.ring.reset()
+            # EdgeRing.handler 不分配内存，可以作为硬中断在边沿发生时立即记时间戳
+            self.ir_pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self.ring.handler, hard=True)
+        else:
+            # 旧的处理函数会分配内存（解码器、整数运算），只能用软中断
+            self.ir_pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._pulse_handler)
         self.timer.init(period=timeout_ms, mode=Timer.ONE_SHOT, callback=self._timeout_handler)
+        # 静默检测：信号结束后不用等满 timeout_ms
+        self.idle_timeout_us = idle_timeout_ms * 1000
+        self.repeat_window_us = max(repeat_window_ms, idle_timeout_ms) * 1000
+        if idle_timeout_ms:
+            self.idle_timer.init(period=max(1, idle_timeout_ms // 4), mode=Timer.PERIODIC,
+                                 callback=self._idle_handler)
       
     def _pulse_handler(self, pin):
         if not self.recording:
@@ -27,10 +62,11 @@ class IRReceiver:
         current_time = utime.ticks_us()
         if self.buffer_index > 0:
             duration = utime.ticks_diff(current_time, self.start_time)
-            if duration > 0:
-                self.pulse_buffer[self.buffer_index - 1] = duration
-            else:
-                self.pulse_buffer[self.buffer_index - 1] = 1
+            if duration <= 0:
+                duration = 1
+            self.pulse_buffer[self.buffer_index - 1] = duration
+            if self.decoder is not None:
+                self.decoder.feed(duration)
         self.buffer_index += 1
         self.start_time = current_time
           
@@ -38,10 +74,43 @@ class IRReceiver:
         if self.recording:
             self._stop_recording()
           
+    def _idle_handler(self, timer):
+        if not self.recording:
+            return
+        ring = self.ring
+        if ring is not None:
+            if self.decoder is not None:
+                ring.feed(self.decoder)  # 在定时器回调里补算脉宽并交给解码器
+            edge_count = ring.count
+            last_edge = ring.last_stamp()
+        else:
+            edge_count = self.buffer_index
+            last_edge = self.start_time
+        if edge_count == 0:
+            return
+        silence = utime.ticks_diff(utime.ticks_us(), last_edge)
+        if silence < self.idle_timeout_us:
+            return
+        if edge_count > MIN_FRAME_PULSES:
+            # 已收到一帧：静默超过重复窗口才结束，期间遥控器重复发送的帧继续记录
+            if silence >= self.repeat_window_us:
+                self._stop_recording()
+        else:
+            # 零星干扰，丢弃后继续等待遥控器信号
+            if ring is not None:
+                ring.reset()
+            else:
+                self.buffer_index = 0
+            if self.decoder is not None:
+                self.decoder.reset()
+      
     def _stop_recording(self):
         self.recording = False
         self.ir_pin.irq(handler=None)
         self.timer.deinit()
+        self.idle_timer.deinit()
+        if self.ring is not None and self.decoder is not None:
+            self.ring.feed(self.decoder)
       
     def stop_recording_immediately(self):
         """立即停止记录"""
@@ -52,9 +121,17 @@ class IRReceiver:
         return self.recording
       
     def get_raw_data(self):
+        if self.ring is not None:
+            return self.ring.durations()
         if self.buffer_index <= 1:
             return []
         return list(self.pulse_buffer[:self.buffer_index - 1])
+      
+    def get_decoded_hex(self):
+        """返回流式解码器在记录过程中已解出的帧（十六进制），没有解码器或未完成时返回 None"""
+        if self.decoder is None:
+            return None
+        return self.decoder.get_hex()
 
 def display_progress_bar(current, total, bar_length=20):
     """显示记录进度条"""
@@ -163,46 +240,33 @@ def get_ac_parameters():
         'description': description
     }
 
-def save_to_csv(params, hex_code):
-    """将结果保存到CSV文件，使用数字选项表示参数"""
+_command_store = None
+
+def get_command_store():
+    """学习结果共用的指令表，第一次使用时才读取 result.txt"""
+    global _command_store
+    if _command_store is None:
+        _command_store = CommandStore()
+    return _command_store
+
+def sync_results():
+    """把缓冲中的学习结果写入 result.txt"""
+    if _command_store is not None:
+        _command_store.sync()
+
+def save_to_csv(params, hex_code, store=None):
+    """
+    将结果保存到按状态索引的指令表（result.txt，格式不变），同一状态重复学到相同的指令时不再追加。
+    每条指令学到后立即写入 flash（一次打开 + 一次追加），写入后才提示已保存。
+    """
     try:
-        # 定义映射字典
-        type_map = {'switch': '1', 'modify': '2'}
-        power_map = {'on': '1', 'off': '2'}
-        mode_map = {'auto': '1', 'cool': '2', 'dry': '3', 'fan': '4', 'heat': '5'}
-        aux_heat_map = {'on': '1', 'off': '2'}
-        fan_speed_map = {'1': '1', '2': '2', '3': '3', 'auto': '4'}
-        swing_map = {'fixed': '1', 'swing': '2'}
-      
-        # 将参数转换为数字选项
-        type_num = type_map.get(params['type'], '0')
-        power_num = power_map.get(params['power'], '0')
-        mode_num = mode_map.get(params['mode'], '0')
-        aux_heat_num = aux_heat_map.get(params['aux_heat'], '0')
-        fan_speed_num = fan_speed_map.get(params['fan_speed'], '0')
-        swing_num = swing_map.get(params['swing'], '0')
-        
-        # 处理备注中的特殊字符（避免CSV格式问题）
-        specification = params['specification'].replace(',', '，').replace('\n', ' ').replace('\r', ' ')
-      
-        # 检查文件是否存在，如果不存在则创建并写入标题
-        try:
-            with open('result.txt', 'r') as f:
-                pass
-        except:
-            with open('result.txt', 'w') as f:
-                f.write("type(switch=1/modify=2),power(on=1/off=2),mode,aux_heat,fan_speed,temperature,swing,specification,hex_code,timestamp\n")
-      
-        # 追加数据
-        with open('result.txt', 'a') as f:
-            # 获取当前时间
-            timestamp = time.localtime()
-            time_str = "{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}".format(
-                timestamp[0], timestamp[1], timestamp[2],
-                timestamp[3], timestamp[4], timestamp[5]
-            )
-            f.write(f"{type_num},{power_num},{mode_num},{aux_heat_num},{fan_speed_num},{params['temperature']},{swing_num},{specification},{hex_code},{time_str}\n")
-        print(f"✓ 已保存到result.txt")
+        if store is None:
+            store = get_command_store()
+        if store.put(params, hex_code, params['specification']):
+            store.sync()  # 学一条指令要花几十秒，不能只留在内存里等复位或断电
+            print(f"✓ 已保存到{store.path}（共 {len(store)} 条指令）")
+        else:
+            print(f"✓ {store.path} 中已有相同的指令，未重复保存")
     except Exception as e:
         print(f"⚠️  保存失败: {e}")
 
@@ -231,37 +295,51 @@ def check_pulse_consistency(recorded_data):
     return True, ""
 
 def analyze_pulse_widths(data):
-    """分析脉冲宽度分布"""
+    """分析脉冲宽度分布：按本次记录自适应聚类，返回 (短, 长, 未知, 聚类结果)"""
     if not data:
-        return 0, 0, 0
-  
-    short_count = sum(1 for v in data if 400 <= v <= 700)
-    long_count = sum(1 for v in data if 1500 <= v <= 1900)
+        return 0, 0, 0, None
+  
+    clusters = fit_clusters(data)
+    short_count = long_count = 0
+    for v in data:
+        bit = classify_value(v, clusters)
+        if bit == '0':
+            short_count += 1
+        elif bit == '1':
+            long_count += 1
     unknown_count = len(data) - short_count - long_count
   
-    return short_count, long_count, unknown_count
+    return short_count, long_count, unknown_count, clusters
 
 def decode_ir_data(recorded_data_list):
-    """解码红外数据 - 带详细错误检查"""
-    # 步骤1：检查数据一致性
-    consistency_ok, error_msg = check_pulse_consistency(recorded_data_list)
+    """解码红外数据 - 带详细错误检查；一次记录里有多帧时，每帧都作为一份样本参与投票"""
+    # 步骤0：把每次记录切分成帧
+    frame_list = []
+    for data in recorded_data_list:
+        if data:
+            frame_list.extend(split_frames(data))
+  
+    # 步骤1：检查数据一致性（按帧比较，重复发送的记录不会被当成按错键）
+    consistency_ok, error_msg = check_pulse_consistency(frame_list)
     if not consistency_ok:
         return None, error_msg
   
-    # 步骤2：处理每组数据
+    # 步骤2：处理每帧数据
     processed_data_list = []
+    marks_list = []
     pulse_quality_info = []
+    cluster_list = []
   
-    for i, data in enumerate(recorded_data_list):
-        if data and len(data) > 4:
-            # 移除前4个元素
-            trimmed_data = data[4:]
-            # 提取偶数位置的元素
-            even_position_elements = trimmed_data[1::2]
+    for i, data in enumerate(frame_list):
+        if len(data) > 4:
+            # 移除前4个元素，提取偶数位置的元素
+            even_position_elements = frame_spaces(data)
             processed_data_list.append(even_position_elements)
+            marks_list.append(frame_marks(data))
           
             # 分析脉冲质量
-            short, long, unknown = analyze_pulse_widths(even_position_elements)
+            short, long, unknown, clusters = analyze_pulse_widths(even_position_elements)
+            cluster_list.append(clusters)
             total = len(even_position_elements)
             quality = (short + long) / total if total > 0 else 0
             pulse_quality_info.append((i+1, quality))
@@ -269,6 +347,13 @@ def decode_ir_data(recorded_data_list):
     if not processed_data_list:
         return None, "没有有效数据可供解码"
   
+    # 软判决加权投票，再在低置信度的位里按校验修复；得到已知的海尔帧时直接采用
+    frame, flipped, _ = soft_decode(processed_data_list, cluster_list, marks_list)
+    if frame is not None:
+        if flipped:
+            print(f"按校验修复了第 {flipped} 位")
+        return to_hex(frame), None
+  
     # 检查脉冲质量
     avg_quality = sum(q[1] for q in pulse_quality_info) / len(pulse_quality_info)
     if avg_quality < 0.7:  # 70%的脉冲应该在预期范围内
@@ -276,16 +361,8 @@ def decode_ir_data(recorded_data_list):
   
     # 步骤3：转换为二进制
     binary_lists = []
-    for data in processed_data_list:
-        binary_list = []
-        for value in data:
-            if 400 <= value <= 700:
-                binary_list.append('0')
-            elif 1500 <= value <= 1900:
-                binary_list.append('1')
-            else:
-                binary_list.append('?')
-        binary_lists.append(binary_list)
+    for data, clusters in zip(processed_data_list, cluster_list):
+        binary_lists.append([classify_value(value, clusters) for value in data])
   
     # 步骤4：生成共识字符串并检查一致性
     max_length = max(len(lst) for lst in binary_lists)
@@ -350,6 +427,35 @@ def decode_ir_data(recorded_data_list):
     except:
         return None, "转换为十六进制时出错"
 
+def checksum_verified_hex(raw_data, decoder=None):
+    """
+    在单次记录里找一帧帧头为 A6、Byte13 校验正确、不确定位不超过 SINGLE_SHOT_MAX_UNCERTAIN 个的帧，
+    返回其十六进制，找不到时返回 None。
+    先看记录过程中流式解码器已解出的帧，再逐帧重新解码，最后逐帧软判决并按校验修复。
+    """
+    if decoder is not None and passes_single_shot(decoder):
+        return to_hex(decoder.frame)
+    frame_decoder = StreamDecoder()
+    for frame in split_frames(raw_data):
+        frame_decoder.reset()
+        for duration in frame:
+            if frame_decoder.feed(duration):
+                break
+        if passes_single_shot(frame_decoder):
+            return to_hex(frame_decoder.frame)
+    for frame in split_frames(raw_data):
+        spaces = frame_spaces(frame)
+        repaired, flipped, _ = soft_decode([spaces], [fit_clusters(spaces)], [frame_marks(frame)])
+        if repaired is not None:
+            if flipped:
+                print(f"按校验修复了第 {flipped} 位")
+            return to_hex(repaired)
+    return None
+
+def passes_single_shot(decoder):
+    return (decoder.is_done() and decoder.uncertain_count <= SINGLE_SHOT_MAX_UNCERTAIN
+            and verify_frame(decoder.frame))
+
 def record_single_signal(receiver, attempt_num, first_pulse_count=None, max_retries=3):
     """记录单次信号，支持重试"""
     retry_count = 0
@@ -364,12 +470,15 @@ def record_single_signal(receiver, attempt_num, first_pulse_count=None, max_retr
         receiver.start_recording(timeout_ms=6000)
       
         start_time = time.time()
+        last_elapsed = -1
         while receiver.is_recording():
             elapsed = time.time() - start_time
             if elapsed > 6:
                 break
-            display_progress_bar(elapsed, 6)
-            time.sleep(0.1)
+            if elapsed != last_elapsed:  # 只在进度变化时刷新，轮询间隔很短
+                display_progress_bar(elapsed, 6)
+                last_elapsed = elapsed
+            time.sleep(POLL_INTERVAL_S)
       
         print()  # 换行
         raw_data = receiver.get_raw_data()
@@ -386,8 +495,18 @@ def record_single_signal(receiver, attempt_num, first_pulse_count=None, max_retr
                 print("❌ 多次尝试后仍未接收到信号")
                 return None, "未接收到信号"
       
-        current_pulse_count = len(raw_data)
-        print(f"✓ 捕获信号: {current_pulse_count}个脉冲")
+        # 多帧记录按每帧的平均脉冲数检查
+        frame_count = max(count_frames(raw_data), 1)
+        current_pulse_count = len(raw_data) // frame_count
+        if frame_count > 1:
+            print(f"✓ 捕获信号: {len(raw_data)}个脉冲，{frame_count}帧")
+        else:
+            print(f"✓ 捕获信号: {current_pulse_count}个脉冲")
+        decoded_hex = receiver.get_decoded_hex()
+        if decoded_hex:
+            print(f"  即时解码: {decoded_hex}")
+        if current_pulse_count > 4:
+            print(f"  脉宽聚类: {describe_clusters(fit_clusters(frame_spaces(split_frames(raw_data)[0])))}")
       
         # 检查脉冲数是否在合理范围
         if current_pulse_count < 10:
@@ -427,25 +546,43 @@ def record_single_signal(receiver, attempt_num, first_pulse_count=None, max_retr
   
     return None, "达到最大重试次数"
 
-def learn_ir_command(pin_num=23, params=None, num_recordings=6):
-    """学习一个红外指令，记录6次"""
+def learn_ir_command(pin_num=23, params=None, num_recordings=6, single_shot=SINGLE_SHOT_LEARN):
+    """
+    学习一个红外指令，记录6次；一次按键包含多帧时，凑够 num_recordings 帧即可提前结束。
+    single_shot=True 时每次记录后立即解码，有一帧通过校验就直接保存，不再继续记录。
+    """
     print(f"\n开始学习指令: {params['description']}")
     if params['specification'] != "无":
         print(f"备注: {params['specification']}")
     print("=" * 40)
   
-    receiver = IRReceiver(pin_num)
+    receiver = IRReceiver(pin_num, StreamDecoder(), EdgeRing())
     recorded_data = []
     first_pulse_count = None
+    frame_total = 0
   
     for attempt in range(1, num_recordings + 1):
         # 记录单次信号，支持重试
         raw_data, error = record_single_signal(receiver, attempt, first_pulse_count)
       
         if raw_data:
+            if single_shot:
+                hex_result = checksum_verified_hex(raw_data, receiver.decoder)
+                if hex_result:
+                    print(f"\n✓ 第{attempt}次记录通过校验，无需再记录")
+                    print(f"十六进制结果: {hex_result}")
+                    save_to_csv(params, hex_result)
+                    return hex_result
+                print("  校验未通过，继续记录用于投票解码")
             recorded_data.append(raw_data)
+            frames = max(count_frames(raw_data), 1)
+            frame_total += frames
             if first_pulse_count is None:
-                first_pulse_count = len(raw_data)
+                first_pulse_count = len(raw_data) // frames
+            if frame_total >= num_recordings:
+                if attempt < num_recordings:
+                    print(f"\n已收集 {frame_total} 帧，提前结束记录")
+                break
         else:
             print(f"\n❌ 第{attempt}次记录失败: {error}")
             abandon = input("是否放弃整个学习过程? (y/n) [默认n]: ").strip().lower()
@@ -457,17 +594,18 @@ def learn_ir_command(pin_num=23, params=None, num_recordings=6):
       
         if attempt < num_recordings:
             print("\n准备下一次记录...")
-            time.sleep(1)
+            time.sleep(RECORD_PAUSE_S)
   
     # 检查有效记录数
     valid_data = [data for data in recorded_data if data is not None]
   
     print(f"\n{params['description']} - 学习结果:")
     print("-" * 30)
-    print(f"有效记录: {len(valid_data)}/{num_recordings}")
+    valid_frames = sum(max(count_frames(data), 1) for data in valid_data)
+    print(f"有效记录: {len(valid_data)}/{num_recordings}，共 {valid_frames} 帧")
   
-    if len(valid_data) < 3:
-        print("❌ 有效记录太少(至少需要3次)，无法进行可靠解码")
+    if valid_frames < 3:
+        print("❌ 有效帧太少(至少需要3帧)，无法进行可靠解码")
         return None
   
     # 开始解码
@@ -485,7 +623,19 @@ def learn_ir_command(pin_num=23, params=None, num_recordings=6):
         return None
 
 def main():
-    """主程序"""
+    """主程序：退出（包括 Ctrl-C 和异常）前把还没写入的结果写入 flash"""
+    try:
+        learned_count = learn_loop()
+    finally:
+        sync_results()
+    if learned_count > 0:
+        print(f"\n学习完成! 共成功学习 {learned_count} 个指令")
+        print("所有结果已保存在 result.txt 文件中")
+    else:
+        print("\n未学习任何指令")
+
+def learn_loop():
+    """交互式学习，返回成功学习的指令数"""
     print("空调IR遥控器学习和解码系统")
     print("=" * 50)
     print("提示: 请确保遥控器对准接收器")
@@ -534,12 +684,7 @@ def main():
                 if hex_result:
                     learned_count += 1
                     print(f"\n✓ 重试成功，指令学习完成")
-  
-    if learned_count > 0:
-        print(f"\n学习完成! 共成功学习 {learned_count} 个指令")
-        print("所有结果已保存在 result.txt 文件中")
-    else:
-        print("\n未学习任何指令")
+    return learned_count
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+按每次记录自适应地区分短/长间隔（0/1），代替写死的 400-700 / 1500-1900 µs 窗口。
+
+对一次记录的所有数据间隔做一维二均值（1-D two-means）聚类：
+阈值取两簇中心的中点，反复迭代直到不再变化。
+短于短簇中心一半的视为毛刺，长于长簇中心 1.5 倍的视为异常，都记为 '?'。
+只用列表和整数/浮点运算，在 micropython 上也能运行。
+"""
+
+# 聚类失败（比如全是同一种间隔）时退回的固定窗口
+ZERO_RANGE = (400, 700)
+ONE_RANGE = (1500, 1900)
+
+LOW_LIMIT_RATIO = 0.5    # 小于短簇中心的这个倍数视为毛刺
+HIGH_LIMIT_RATIO = 1.5   # 大于长簇中心的这个倍数视为异常
+MAX_ITERATIONS = 20
+
+
+def fit_clusters(values, max_iterations=MAX_ITERATIONS):
+    """
+    对间隔时长做二均值聚类，返回包含聚类结果和边界余量的字典；
+    数据不足以分成两簇时返回 None。
+    """
+    if not values:
+        return None
+    low = min(values)
+    high = max(values)
+    if high == low:
+        return None
+
+    threshold = (low + high) / 2
+    short_center = long_center = 0
+    for _ in range(max_iterations):
+        short_sum = short_count = long_sum = long_count = 0
+        for v in values:
+            if v <= threshold:
+                short_sum += v
+                short_count += 1
+            else:
+                long_sum += v
+                long_count += 1
+        if short_count == 0 or long_count == 0:
+            return None
+        short_center = short_sum / short_count
+        long_center = long_sum / long_count
+        new_threshold = (short_center + long_center) / 2
+        if new_threshold == threshold:
+            break
+        threshold = new_threshold
+
+    low_limit = short_center * LOW_LIMIT_RATIO
+    high_limit = long_center * HIGH_LIMIT_RATIO
+
+    # 两簇内点之间的空隙：越大说明 0/1 分得越开
+    short_max = None
+    long_min = None
+    for v in values:
+        if low_limit <= v <= threshold:
+            if short_max is None or v > short_max:
+                short_max = v
+        elif threshold < v <= high_limit:
+            if long_min is None or v < long_min:
+                long_min = v
+    gap = (long_min - short_max) if short_max is not None and long_min is not None else 0
+
+    return {
+        'short': short_center,
+        'long': long_center,
+        'threshold': threshold,
+        'low_limit': low_limit,
+        'high_limit': high_limit,
+        'gap': gap,
+        'margin_pct': int(gap * 100 / (long_center - short_center)),
+    }
+
+
+def classify_value(value, clusters):
+    """按聚类结果把一个间隔分类为 '0' / '1' / '?'；clusters 为 None 时使用固定窗口"""
+    if clusters is None:
+        if ZERO_RANGE[0] <= value <= ZERO_RANGE[1]:
+            return '0'
+        if ONE_RANGE[0] <= value <= ONE_RANGE[1]:
+            return '1'
+        return '?'
+    if value < clusters['low_limit'] or value > clusters['high_limit']:
+        return '?'
+    return '0' if value <= clusters['threshold'] else '1'
+
+
+def classify_pulses(values):
+    """对一次记录的间隔先聚类再分类，返回 (0/1/? 列表, 聚类结果或 None)"""
+    clusters = fit_clusters(values)
+    return [classify_value(v, clusters) for v in values], clusters
+
+
+def describe_clusters(clusters):
+    """聚类结果的简短说明，用于打印"""
+    if clusters is None:
+        return "无法聚类，使用固定窗口 {}-{} / {}-{}µs".format(
+            ZERO_RANGE[0], ZERO_RANGE[1], ONE_RANGE[0], ONE_RANGE[1])
+    return "0≈{}µs 1≈{}µs 阈值 {}µs 间隙 {}µs（余量 {}%）".format(
+        int(clusters['short']), int(clusters['long']), int(clusters['threshold']),
+        int(clusters['gap']), clusters['margin_pct'])
@@ -0,0 +1,105 @@
+"""
+检查多帧切分：把 IR learn/rawdata 里同一指令的记录拼成“按一次键收到多帧”的长记录，
+再交给 ir_frames 和 opt_specification.decode_ir_data。
+
+每个指令拼出两条长记录：
+1. 第 1-3 次记录之间插入 40ms 静默（按长间隔切分）；
+2. 第 4-6 次记录之间只插入 2ms 间隔（只能按帧头切分）。
+检查每条长记录都切出 3 帧且与原记录相同，两条长记录一起解码的结果与离线结果相同。
+
+另外在 emu/ 的模拟器里让遥控器按一次键连发第 1-3 次记录（帧间 40ms 静默），
+经 IRReceiver（EdgeRing + StreamDecoder）实际记录：记下的时长要与拼接的长记录完全相同，
+count_frames 为 3，即时解码与离线解码第一帧的结果相同，3 帧投票与离线结果相同——帧间静默比 IDLE_TIMEOUT_MS 长，
+靠 REPEAT_WINDOW_MS 才不会在第一帧后就停止记录。
+
+用法: python replay_frames.py
+"""
+import os
+import sys
+
+ONE_DRAGON_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ONE_DRAGON_DIR, 'emu'))  # opt_specification 需要 machine/utime
+
+import utime
+from emu_board import board, IRRemote
+from ir_frames import split_frames, count_frames
+from ir_ring import EdgeRing
+from ir_stream import StreamDecoder, decode_durations
+from haier_codec import to_hex
+from replay_stream import RAWDATA_DIR, read_expected_hex
+from capture_pack import command_dirs, load_captures
+from opt_specification import IRReceiver, decode_ir_data, POLL_INTERVAL_S
+
+LONG_GAP_US = 40000
+SHORT_GAP_US = 2000
+EMU_SPEED = 4      # 模拟器回放倍速；中断里的时间戳固定为边沿发生的虚拟时刻，倍速不影响记下的时长
+IR_PIN = 23
+
+
+def join_captures(captures, gap_us):
+    """把多次记录拼成一条：每次记录以标记结束，中间插入 gap_us 的间隔"""
+    joined = []
+    for capture in captures:
+        if joined:
+            joined.append(gap_us)
+        joined.extend(capture)
+    return joined
+
+
+def record_press(durations):
+    """在模拟器里按一次键发出 durations，用 IRReceiver 记录，返回 (记下的时长, 流式解码的十六进制)"""
+    board.configure(EMU_SPEED)
+    IRRemote(IR_PIN, [durations], press_delay_ms=10)
+    receiver = IRReceiver(IR_PIN, StreamDecoder(), EdgeRing())
+    receiver.start_recording()
+    while receiver.is_recording():
+        utime.sleep_ms(int(POLL_INTERVAL_S * 1000))
+    return receiver.get_raw_data(), receiver.get_decoded_hex()
+
+
+def main():
+    failures = 0
+    for command_dir in command_dirs(RAWDATA_DIR):
+        command = os.path.basename(command_dir)
+        captures = load_captures(command_dir)
+        if len(captures) < 6:
+            continue
+        expected = read_expected_hex(command)
+        print(f"\n指令 {command}（离线结果: {expected}）")
+
+        presses = [
+            ("40ms 静默分隔", captures[0:3], join_captures(captures[0:3], LONG_GAP_US)),
+            ("2ms 间隔，按帧头分隔", captures[3:6], join_captures(captures[3:6], SHORT_GAP_US)),
+        ]
+        for label, originals, joined in presses:
+            frames = split_frames(joined)
+            same = frames == originals
+            if not same:
+                failures += 1
+            print(f"  {label}: {len(joined)} 个时长 -> {len(frames)} 帧 {'✓' if same else '✗ 切分错误'}")
+
+        hex_result, error = decode_ir_data([joined for _, _, joined in presses])
+        ok = hex_result is not None and (expected is None or hex_result == expected)
+        if not ok:
+            failures += 1
+        print(f"  两次按键共 6 帧投票: {hex_result or error} {'✓' if ok else '✗'}")
+
+        joined = presses[0][2]
+        recorded, streamed_hex = record_press(joined)
+        frames = count_frames(recorded)
+        hex_result, error = decode_ir_data([recorded])
+        first_frame = decode_durations(captures[0])
+        ok = (recorded == joined and frames == 3 and hex_result is not None
+              and streamed_hex == (to_hex(first_frame) if first_frame is not None else None)
+              and (expected is None or hex_result == expected))
+        if not ok:
+            failures += 1
+        print(f"  模拟器按一次键连发 3 帧: 记下 {len(recorded)}/{len(joined)} 个时长，{frames} 帧，"
+              f"即时解码 {streamed_hex}，投票 {hex_result or error} {'✓' if ok else '✗'}")
+
+    print(f"\n{'✓ 全部通过' if not failures else f'❌ {failures} 项失败'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+在电脑上回放 IR learn/rawdata，检查 soft_decode：
+1. 每次记录单独软判决+校验修复，结果应与离线结果相同；
+2. 每个指令全部记录加权投票后修复，结果应与离线结果相同；
+3. 压力测试：给每次记录随机加几个毛刺（间隔改成 0/1 之间、过短或过长的值），
+   统计修复正确、无法修复、修复错误的次数——修复错误必须为 0。
+   毛刺都落在正常的 0/1 范围之外：恰好变成另一种正常间隔的错误只靠 8 位校验是查不出来的。
+
+用法: python replay_soft.py [每次记录的压力测试次数，默认50] [随机种子，默认0]
+"""
+import os
+import random
+import sys
+
+from ir_frames import frame_spaces, frame_marks
+from pulse_cluster import fit_clusters
+from haier_codec import to_hex
+from soft_decode import soft_decode
+from replay_stream import RAWDATA_DIR, read_expected_hex
+from capture_pack import command_dirs, find_capture_files, read_txt_capture
+
+GLITCH_VALUES = ((800, 1400), (2200, 3000), (80, 300))
+
+
+def decode_single(spaces, marks):
+    frame, flipped, _ = soft_decode([spaces], [fit_clusters(spaces)], [marks])
+    return (to_hex(frame) if frame is not None else None), flipped
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rng = random.Random(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    failures = 0
+    stress = {'ok': 0, 'unrepaired': 0, 'wrong': 0}
+
+    for command_dir in command_dirs(RAWDATA_DIR):
+        command = os.path.basename(command_dir)
+        expected = read_expected_hex(command)
+        if expected is None:
+            continue
+        print(f"\n指令 {command}（离线结果: {expected}）")
+
+        spaces_list = []
+        marks_list = []
+        for _, path in find_capture_files(command_dir):
+            file_name = os.path.basename(path)
+            data = read_txt_capture(path)
+            spaces = frame_spaces(data)
+            marks = frame_marks(data)
+            spaces_list.append(spaces)
+            marks_list.append(marks)
+            result, flipped = decode_single(spaces, marks)
+            ok = result == expected
+            if not ok:
+                failures += 1
+            print(f"  {file_name}: {result or '无法修复'} {'✓' if ok else '✗'}"
+                  f"{f'（翻转第 {flipped} 位）' if flipped else ''}")
+
+            for _ in range(trials):
+                glitched = list(spaces)
+                for _ in range(rng.randint(1, 3)):
+                    low, high = rng.choice(GLITCH_VALUES)
+                    glitched[rng.randrange(len(glitched))] = rng.randint(low, high)
+                result, _ = decode_single(glitched, marks)
+                if result is None:
+                    stress['unrepaired'] += 1
+                elif result == expected:
+                    stress['ok'] += 1
+                else:
+                    stress['wrong'] += 1
+
+        frame, flipped, _ = soft_decode(spaces_list, [fit_clusters(s) for s in spaces_list], marks_list)
+        ok = frame is not None and to_hex(frame) == expected
+        if not ok:
+            failures += 1
+        print(f"  {len(spaces_list)} 次加权投票: {to_hex(frame) if frame else '无法修复'} {'✓' if ok else '✗'}")
+
+    total = sum(stress.values())
+    print(f"\n压力测试 {total} 次（每次 1-3 个随机毛刺）: 修复正确 {stress['ok']}，"
+          f"无法修复 {stress['unrepaired']}，修复错误 {stress['wrong']}")
+    if stress['wrong']:
+        failures += 1
+    print(f"{'✓ 全部通过' if not failures else f'❌ {failures} 项失败'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
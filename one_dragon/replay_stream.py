@@ -0,0 +1,116 @@
+"""
+在电脑上回放 IR learn/rawdata 里的原始记录，逐个时长喂给 StreamDecoder。
+
+检查两件事：
+1. 每次记录流式解出的 0/1/? 与离线解码（裁剪4个、取偶数位置、按范围分类）逐位相同；
+2. 同一指令各次流式结果按位投票后，与 attemp decode/result 中的十六进制结果相同。
+
+用法: python replay_stream.py
+"""
+import os
+import sys
+
+from ir_stream import StreamDecoder, ZERO_MIN_US, ZERO_MAX_US, ONE_MIN_US, ONE_MAX_US
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RAWDATA_DIR = os.path.join(REPO_DIR, 'IR learn', 'rawdata')
+RESULT_DIR = os.path.join(REPO_DIR, 'IR learn', 'attemp decode', 'result')
+sys.path.insert(0, RAWDATA_DIR)
+
+from capture_pack import command_dirs, find_capture_files, read_txt_capture
+
+
+def read_expected_hex(command):
+    """从离线解码结果中取出“十六进制结果”一行"""
+    path = os.path.join(RESULT_DIR, command + '.txt')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('十六进制结果:'):
+                return line.split(':', 1)[1].replace(' ', '').strip()
+    return None
+
+
+def offline_symbols(data):
+    """离线解码对单次记录的分类结果"""
+    symbols = []
+    for value in data[4:][1::2]:
+        if ZERO_MIN_US <= value <= ZERO_MAX_US:
+            symbols.append('0')
+        elif ONE_MIN_US <= value <= ONE_MAX_US:
+            symbols.append('1')
+        else:
+            symbols.append('?')
+    return ''.join(symbols)
+
+
+def stream_symbols(decoder):
+    """把流式解码器的帧和不确定位图还原成 0/1/? 字符串"""
+    symbols = []
+    for i in range(decoder.bit_count):
+        mask = 0x80 >> (i & 7)
+        if decoder.uncertain[i >> 3] & mask:
+            symbols.append('?')
+        else:
+            symbols.append('1' if decoder.frame[i >> 3] & mask else '0')
+    return ''.join(symbols)
+
+
+def vote(symbol_strings):
+    """按位多数投票，返回十六进制字符串"""
+    bits = []
+    for column in zip(*symbol_strings):
+        bits.append('1' if column.count('1') > column.count('0') else '0')
+    return '{:X}'.format(int(''.join(bits), 2))
+
+
+def main():
+    decoder = StreamDecoder()
+    total = decoded = mismatched = 0
+    failed_commands = 0
+
+    for command_dir in command_dirs(RAWDATA_DIR):
+        command = os.path.basename(command_dir)
+        expected = read_expected_hex(command)
+        print(f"\n指令 {command}（离线结果: {expected}）")
+
+        streamed = []
+        for _, path in find_capture_files(command_dir):
+            file_name = os.path.basename(path)
+            total += 1
+            data = read_txt_capture(path)
+            decoder.reset()
+            done_at = None
+            for i, duration in enumerate(data):
+                if decoder.feed(duration):
+                    done_at = i + 1
+                    break
+
+            if done_at is None:
+                print(f"  {file_name}: 未解出完整帧")
+                continue
+            decoded += 1
+            symbols = stream_symbols(decoder)
+            streamed.append(symbols)
+            if symbols != offline_symbols(data):
+                mismatched += 1
+                print(f"  {file_name}: ✗ 与离线分类不一致")
+            else:
+                print(f"  {file_name}: ✓ {decoder.get_hex()}（{decoder.uncertain_count} 个不确定位，"
+                      f"第 {done_at}/{len(data)} 个时长时完成）")
+
+        if streamed:
+            result = vote(streamed)
+            ok = expected is None or result == expected
+            if not ok:
+                failed_commands += 1
+            print(f"  投票结果: {result} {'✓' if ok else '✗ 与离线结果不一致'}")
+
+    print(f"\n共 {total} 次记录，流式解出 {decoded} 次，与离线分类不一致 {mismatched} 次，"
+          f"投票结果错误的指令 {failed_commands} 个")
+    return 1 if mismatched or failed_commands or not decoded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+发送队列：合并短时间内的多次状态变化，只发最后一帧。
+
+海尔的每一帧都带着完整的空调状态，连按 升温、升温、风速 只需要发最后一帧；
+连续发三帧反而可能有几帧被室内机忽略。
+  - 提交后等 window_ms 没有新的变化才发送，期间的新状态替换待发的帧（计入 coalesced）
+  - 待发的状态与上一次发出的状态相同时不发送（计入 dropped），按键码不同也算相同状态
+  - 两次发送之间至少间隔 min_gap_ms
+
+不用线程或定时器：主循环里定期调用 poll()，需要马上发完时调用 flush()。
+时间都用 utime.ticks_ms；submit/poll 可以传入 now_ms，便于在电脑上检查。
+"""
+import utime
+
+from haier_codec import FRAME_LEN, encode_params
+
+COALESCE_WINDOW_MS = 300  # 最后一次变化后这么久没有新变化才发送
+MIN_SEND_GAP_MS = 500     # 两帧之间的最短间隔，太密时室内机可能忽略后一帧
+STATE_LEN = FRAME_LEN - 2  # Byte12 按键码和 Byte13 校验之前的字节才代表状态
+
+
+class SendQueue:
+    """放在 IRTransmitter 前面的合并发送队列；table 为 HaierTable 时用查找表代替逐字节编码"""
+
+    def __init__(self, transmitter, table=None, window_ms=COALESCE_WINDOW_MS, min_gap_ms=MIN_SEND_GAP_MS):
+        self.transmitter = transmitter
+        self.table = table
+        self.window_ms = window_ms
+        self.min_gap_ms = min_gap_ms
+        self.pending = None
+        self.pending_ms = 0
+        self.last_state = None
+        self.last_sent_ms = None
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def submit_frame(self, frame, now_ms=None):
+        """提交一帧（会复制一份），有待发的帧时替换它"""
+        if now_ms is None:
+            now_ms = utime.ticks_ms()
+        self.submitted += 1
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = bytes(frame)
+        self.pending_ms = now_ms
+
+    def submit(self, params, button='power', now_ms=None):
+        """按 get_ac_parameters 格式的参数提交"""
+        if self.table is not None:
+            frame = self.table.lookup_params(params, button)
+        else:
+            frame = encode_params(params, button)
+        self.submit_frame(frame, now_ms)
+
+    def has_pending(self):
+        return self.pending is not None
+
+    def due_in_ms(self, now_ms=None):
+        """距离待发帧可以发送还有多少毫秒；没有待发帧时返回 None"""
+        if self.pending is None:
+            return None
+        if now_ms is None:
+            now_ms = utime.ticks_ms()
+        wait = self.window_ms - utime.ticks_diff(now_ms, self.pending_ms)
+        if self.last_sent_ms is not None:
+            wait = max(wait, self.min_gap_ms - utime.ticks_diff(now_ms, self.last_sent_ms))
+        return max(0, wait)
+
+    def poll(self, now_ms=None):
+        """到时间时发出（或丢弃）待发的帧；真正发送了一帧时返回 True"""
+        if now_ms is None:
+            now_ms = utime.ticks_ms()
+        if self.due_in_ms(now_ms) != 0:
+            return False
+        frame = self.pending
+        self.pending = None
+        if self.last_state is not None and frame[:STATE_LEN] == self.last_state:
+            self.dropped += 1
+            return False
+        self.transmitter.send_frame(frame)
+        self.last_state = frame[:STATE_LEN]
+        self.last_sent_ms = now_ms
+        self.sent += 1
+        return True
+
+    def flush(self):
+        """等到待发的帧发出（或被丢弃）为止"""
+        while self.pending is not None:
+            utime.sleep_ms(self.due_in_ms())
+            self.poll()
+
+    def forget_state(self):
+        """空调被原装遥控器改过状态时调用，下一帧即使与上次相同也会发送"""
+        self.last_state = None
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+        }
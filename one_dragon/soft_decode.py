@@ -0,0 +1,156 @@
+"""
+软判决解码：每个间隔除了判成 0/1，还记下离所属簇中心多近作为置信度（0-1），
+越界的毛刺按它落在阈值哪一侧判位，但置信度很低。
+
+1. soft_bits     一帧的间隔 -> (位列表, 置信度列表)
+2. weighted_vote 多帧按置信度加权投票（0 记负、1 记正），得到每位的结果和置信度
+3. repair        在置信度低的几位里尝试翻转 0-MAX_FLIPS 位，找出能通过 haier_codec.is_known_frame 的帧；
+                 多试一位检查歧义，只有唯一解时才采用，有多个不同的解时视为无法修复
+只用列表和浮点运算，在 micropython 上也能运行。
+"""
+from pulse_cluster import ZERO_RANGE, ONE_RANGE
+from haier_codec import FRAME_LEN, is_known_frame
+
+OUTLIER_CONFIDENCE = 0.1   # 超出聚类上下限（或固定窗口）的间隔的置信度
+NEIGHBOR_CONFIDENCE = 0.4  # 越界间隔两侧、异常标记前后的间隔最多只有这个置信度
+MARK_RANGE = (250, 1000)   # 标记约 550 µs，超出这个范围说明有边沿丢失或多出
+LOW_CONFIDENCE = 0.7       # 只有置信度低于这个值的位才可能被翻转
+MAX_FLIPS = 3
+MAX_CANDIDATES = 16        # 可疑的位多于这个数时不修复
+FRAME_BITS = FRAME_LEN * 8
+
+
+def soft_bits(spaces, clusters=None, marks=None):
+    """
+    把一帧的数据间隔判成位并给出置信度。
+    clusters 为 pulse_cluster.fit_clusters 的结果；为 None 时按固定窗口的中心和中点判断。
+    marks 为每个间隔之前的标记（ir_frames.frame_marks），标记长度异常时前后两个间隔都不可信。
+    """
+    if clusters is None:
+        short = (ZERO_RANGE[0] + ZERO_RANGE[1]) / 2
+        long = (ONE_RANGE[0] + ONE_RANGE[1]) / 2
+        threshold = (ZERO_RANGE[1] + ONE_RANGE[0]) / 2
+        low_limit = ZERO_RANGE[0]
+        high_limit = ONE_RANGE[1]
+    else:
+        short = clusters['short']
+        long = clusters['long']
+        threshold = clusters['threshold']
+        low_limit = clusters['low_limit']
+        high_limit = clusters['high_limit']
+    half_gap = max((long - short) / 2, 1)
+
+    bits = []
+    confidences = []
+    for value in spaces:
+        if value != value:  # NaN
+            bits.append(0)
+            confidences.append(0.0)
+            continue
+        bits.append(1 if value > threshold else 0)
+        if value < low_limit or value > high_limit:
+            confidences.append(OUTLIER_CONFIDENCE)
+        else:
+            # 离最近的簇中心越远越不可信：两中心之间等于离阈值的距离，中心以外同样递减
+            distance = min(abs(value - short), abs(value - long))
+            confidences.append(max(OUTLIER_CONFIDENCE, 1.0 - distance / half_gap))
+
+    # 毛刺多出或吞掉的边沿常让相邻的间隔也跟着错（看起来却很正常），降低它们的置信度
+    suspects = []
+    for i in range(len(spaces)):
+        if confidences[i] <= OUTLIER_CONFIDENCE:
+            suspects.append(i - 1)
+            suspects.append(i + 1)
+        if marks is not None and i < len(marks) and not MARK_RANGE[0] <= marks[i] <= MARK_RANGE[1]:
+            suspects.append(i - 1)
+            suspects.append(i)
+    for j in suspects:
+        if 0 <= j < len(spaces) and confidences[j] > NEIGHBOR_CONFIDENCE:
+            confidences[j] = NEIGHBOR_CONFIDENCE
+    return bits, confidences
+
+
+def weighted_vote(soft_frames):
+    """
+    soft_frames 为 [(位列表, 置信度列表), ...]。
+    返回 (位列表, 置信度列表)，每位的置信度 = |加权票数之和| / 帧数。
+    """
+    if not soft_frames:
+        return [], []
+    length = max(len(bits) for bits, _ in soft_frames)
+    bits = []
+    confidences = []
+    for i in range(length):
+        score = 0.0
+        for frame_bits, frame_confidences in soft_frames:
+            if i < len(frame_bits):
+                score += frame_confidences[i] if frame_bits[i] else -frame_confidences[i]
+        bits.append(1 if score > 0 else 0)
+        confidences.append(abs(score) / len(soft_frames))
+    return bits, confidences
+
+
+def bits_to_frame(bits):
+    frame = bytearray(len(bits) // 8)
+    for i in range(len(frame) * 8):
+        if bits[i]:
+            frame[i >> 3] |= 0x80 >> (i & 7)
+    return frame
+
+
+def _combinations(items, count, start=0):
+    """items 中 count 个元素的所有组合（按下标递增），micropython 没有 itertools.combinations"""
+    if count == 0:
+        yield []
+        return
+    for i in range(start, len(items) - count + 1):
+        for rest in _combinations(items, count - 1, i + 1):
+            yield [items[i]] + rest
+
+
+def repair(bits, confidences, max_flips=MAX_FLIPS, max_candidates=MAX_CANDIDATES):
+    """
+    返回 (帧, 翻转的位下标列表)；无法修复或有歧义时返回 (None, None)。
+    只在置信度低于 LOW_CONFIDENCE 的位里翻转，最多翻转 max_flips 位；
+    检查歧义时多试一位（max_flips + 1）：错的位比 max_flips 多时，真正的帧常在这一层出现，
+    此时有两个不同的有效帧，视为无法修复，而不是采用较近的那个错误结果。
+    只看前 FRAME_BITS 位。
+    """
+    if len(bits) < FRAME_BITS:
+        return None, None
+    frame = bits_to_frame(bits[:FRAME_BITS])
+    candidates = [i for i in range(FRAME_BITS) if confidences[i] < LOW_CONFIDENCE]
+    if len(candidates) > max_candidates:
+        return None, None  # 可疑的位太多，漏掉的位里可能藏着另一个解
+
+    found = None
+    for flips in range(0, min(max_flips + 1, len(candidates)) + 1):
+        for positions in _combinations(candidates, flips):
+            for i in positions:
+                frame[i >> 3] ^= 0x80 >> (i & 7)
+            if is_known_frame(frame):
+                if found is not None and bytes(frame) != found[0]:
+                    return None, None  # 有两个不同的解
+                if found is None and flips <= max_flips:
+                    found = (bytes(frame), sorted(positions))
+            for i in positions:
+                frame[i >> 3] ^= 0x80 >> (i & 7)
+    if found is None:
+        return None, None
+    return bytearray(found[0]), found[1]
+
+
+def soft_decode(spaces_list, clusters_list=None, marks_list=None, max_flips=MAX_FLIPS):
+    """
+    多帧（每帧一个间隔列表）加权投票后再按校验修复。
+    clusters_list、marks_list 与 spaces_list 一一对应，可以为 None。
+    返回 (帧, 翻转的位下标列表, 每位置信度)；无法得到有效帧时帧为 None。
+    """
+    if clusters_list is None:
+        clusters_list = [None] * len(spaces_list)
+    if marks_list is None:
+        marks_list = [None] * len(spaces_list)
+    soft_frames = [soft_bits(spaces_list[i], clusters_list[i], marks_list[i]) for i in range(len(spaces_list))]
+    bits, confidences = weighted_vote(soft_frames)
+    frame, flipped = repair(bits, confidences, max_flips)
+    return frame, flipped, confidences